@@ -3,12 +3,20 @@
 """Provide basic caching services to avoid extraneous queries over
 multiple policies on the same resource type.
 """
+import hashlib
+import json
 import pickle  # nosec nosemgrep
 
+from collections import Counter
+from contextlib import contextmanager
+from copy import deepcopy
 from datetime import datetime, timedelta
 import os
 import logging
 import sqlite3
+import threading
+import time
+import zlib
 
 log = logging.getLogger('custodian.cache')
 
@@ -32,6 +40,8 @@ def factory(config):
             log.debug("Using in-memory cache")
             CACHE_NOTIFY = True
         return InMemoryCache(config)
+    elif isinstance(config.cache, str) and config.cache.startswith(SqlRecordCache.prefix):
+        return SqlRecordCache(config)
     return SqlKvCache(config)
 
 
@@ -52,6 +62,14 @@ class Cache:
     def size(self):
         return 0
 
+    def select(self, key, id_key, ids):
+        """Return the cached resources for key having one of the given ids."""
+        resources = self.get(key)
+        if resources is None:
+            return None
+        id_set = set(ids)
+        return [r for r in resources if r[id_key] in id_set]
+
     def close(self):
         pass
 
@@ -89,6 +107,147 @@ class InMemoryCache(Cache):
         return sum(map(len, self.data.values()))
 
 
+class ResourceSnapshot:
+    """Run scoped, in-process snapshot of augmented resource sets.
+
+    Policies in a collection that share a resource query (provider,
+    account, region, resource type, source and query) fetch and
+    augment it once per run. Consumers receive their own copy of the
+    resources, so filter annotations and action side effects on one
+    policy's resources are not visible to another policy.
+
+    Entries for queries used by pull mode policies are released once
+    the last policy needing them has executed, other entries are kept
+    for the lifetime of the snapshot.
+
+    The snapshot also holds the run's relationship graph, values derived
+    from an entry (such as an index of its resources by id) and edges
+    from resources to the ids of their related resources, so related
+    resource filters resolve them once per run.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.derived = {}
+        self.edges = {}
+        self.consumers = Counter()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_policy_key(policy):
+        if policy.execution_mode != 'pull':
+            return None
+        rm = policy.resource_manager
+        if not hasattr(rm, 'get_snapshot_key'):
+            return None
+        return encode(rm.get_snapshot_key(rm.source.get_query_params(None)))
+
+    def add_policies(self, policies):
+        for p in policies:
+            key = self.get_policy_key(p)
+            if key is not None:
+                self.consumers[key] += 1
+
+    def release(self, policy):
+        key = self.get_policy_key(policy)
+        if key is None or key not in self.consumers:
+            return
+        with self.lock:
+            self.consumers[key] -= 1
+            if self.consumers[key] < 1:
+                del self.consumers[key]
+                self.data.pop(key, None)
+                self.derived.pop(key, None)
+                self.edges.pop(key, None)
+
+    def get(self, key):
+        with self.lock:
+            resources = self.data.get(encode(key))
+            if resources is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return deepcopy(resources)
+
+    def select(self, key, id_key, ids):
+        """Copy only the resources with the given ids."""
+        with self.lock:
+            resources = self.data.get(encode(key))
+            if resources is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        id_set = set(ids)
+        return deepcopy([r for r in resources if r[id_key] in id_set])
+
+    def save(self, key, resources):
+        resources = deepcopy(resources)
+        key = encode(key)
+        with self.lock:
+            self.data[key] = resources
+            self.derived.pop(key, None)
+
+    def derive(self, key, name, func):
+        """Compute a value from an entry's resources once per entry.
+
+        Derived values share the snapshot's resources, callers must copy
+        any resource they modify.
+        """
+        key = encode(key)
+        with self.lock:
+            resources = self.data.get(key)
+            if resources is None:
+                return None
+            derived = self.derived.setdefault(key, {})
+            if name not in derived:
+                derived[name] = func(resources)
+            return derived[name]
+
+    def get_index(self, key, id_key):
+        """Map of resource id to resource for an entry."""
+        return self.derive(
+            key, ('index', id_key), lambda resources: {r[id_key]: r for r in resources})
+
+    def get_edges(self, key, expression):
+        """Map of resource id to related resource ids for a resource query.
+
+        Edges are filled in by related resource filters as they extract
+        them and do not require the entry itself to be present.
+        """
+        with self.lock:
+            return self.edges.setdefault(encode(key), {}).setdefault(expression, {})
+
+    def size(self):
+        return len(self.data)
+
+
+_snapshot = None
+
+
+def get_snapshot():
+    """Return the active run snapshot, if any."""
+    return _snapshot
+
+
+@contextmanager
+def snapshot(policies=()):
+    """Activate a resource snapshot shared by the given policies."""
+    global _snapshot
+
+    previous = _snapshot
+    _snapshot = ResourceSnapshot()
+    _snapshot.add_policies(policies)
+    try:
+        yield _snapshot
+    finally:
+        log.debug(
+            "resource snapshot hits:%d misses:%d",
+            _snapshot.hits, _snapshot.misses)
+        _snapshot = previous
+
+
 def encode(key):
     return pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)  # nosemgrep
 
@@ -169,3 +328,189 @@ class SqlKvCache(Cache):
         if self.conn:
             self.conn.close()
             self.conn = None
+
+
+class SqlRecordCache(Cache):
+    """Per record sqlite cache, selected with a ``records:`` cache path.
+
+    ie. ``--cache records:~/.cache/cloud-custodian.db``
+
+    Resource lists are stored a record per row, compressed individually,
+    so lookups of a few resources by id don't need to load the whole set.
+    The database uses write ahead logging so concurrent readers and
+    writers (ie. c7n-org workers) don't serialize on the file lock,
+    expiry is indexed by creation time, and the least recently used
+    entries are evicted once the total size exceeds ``--cache-max-size``
+    megabytes.
+    """
+
+    prefix = 'records:'
+    max_size = 512 * 1024 * 1024
+
+    schema = (
+        """
+        create table if not exists c7n_entry (
+            key text primary key,
+            kind text,
+            id_key text,
+            size integer,
+            create_date real,
+            access_date real
+        )
+        """,
+        """
+        create table if not exists c7n_record (
+            key text,
+            position integer,
+            rid text,
+            value blob,
+            primary key (key, position)
+        )
+        """,
+        "create index if not exists c7n_record_rid on c7n_record (key, rid)",
+        "create index if not exists c7n_entry_create on c7n_entry (create_date)",
+        "create index if not exists c7n_entry_access on c7n_entry (access_date)",
+    )
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.cache_period = config.cache_period
+        self.cache_path = resolve_path(config.cache[len(self.prefix):])
+        if getattr(config, 'cache_max_size', None):
+            self.max_size = config.cache_max_size * 1024 * 1024
+        self.conn = None
+
+    def init(self):
+        if not os.path.exists(os.path.dirname(self.cache_path)):
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.cache_path, timeout=60)
+        self.conn.execute('pragma journal_mode=wal')
+        self.conn.execute('pragma synchronous=normal')
+        with self.conn as cursor:
+            for statement in self.schema:
+                cursor.execute(statement)
+            expired = [row[0] for row in cursor.execute(
+                'select key from c7n_entry where create_date < ?',
+                [time.time() - self.cache_period * 60])]
+            if expired:
+                log.debug('expired %d stale cache entries', len(expired))
+                self._delete(cursor, expired)
+
+    def load(self):
+        if not self.conn:
+            self.init()
+        return True
+
+    @staticmethod
+    def encode_key(key):
+        return hashlib.sha256(
+            json.dumps(key, sort_keys=True, default=str).encode('utf8')).hexdigest()
+
+    @staticmethod
+    def encode_value(value):
+        return zlib.compress(
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)  # nosemgrep
+
+    @staticmethod
+    def decode_value(value):
+        return pickle.loads(zlib.decompress(value))  # nosec nosemgrep
+
+    def _delete(self, cursor, keys):
+        for k in keys:
+            cursor.execute('delete from c7n_record where key = ?', [k])
+            cursor.execute('delete from c7n_entry where key = ?', [k])
+
+    def _get_entry(self, cursor, key):
+        row = cursor.execute(
+            'select kind, id_key, create_date from c7n_entry where key = ?',
+            [key]).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[2] > self.cache_period * 60:
+            return None
+        cursor.execute(
+            'update c7n_entry set access_date = ? where key = ?', [time.time(), key])
+        return row
+
+    def get(self, key):
+        key = self.encode_key(key)
+        with self.conn as cursor:
+            entry = self._get_entry(cursor, key)
+            if entry is None:
+                return None
+            values = [self.decode_value(v) for v, in cursor.execute(
+                'select value from c7n_record where key = ? order by position', [key])]
+        if entry[0] == 'value':
+            return values[0]
+        return values
+
+    def select(self, key, id_key, ids):
+        key = self.encode_key(key)
+        with self.conn as cursor:
+            entry = self._get_entry(cursor, key)
+            if entry is None:
+                return None
+            if entry[0] != 'list':
+                return None
+            if entry[1] != id_key:
+                self._index(cursor, key, id_key)
+            results, ids = [], list(ids)
+            for i in range(0, len(ids), 500):
+                id_set = ids[i:i + 500]
+                results.extend(self.decode_value(v) for v, in cursor.execute(
+                    'select value from c7n_record where key = ? and rid in (%s) '
+                    'order by position' % ', '.join('?' * len(id_set)),
+                    [key, *map(str, id_set)]))
+            return results
+
+    def _index(self, cursor, key, id_key):
+        # record ids are indexed on first lookup by id for the entry.
+        rows = cursor.execute(
+            'select position, value from c7n_record where key = ?', [key]).fetchall()
+        cursor.executemany(
+            'update c7n_record set rid = ? where key = ? and position = ?',
+            [(str(self.decode_value(v).get(id_key)), key, pos) for pos, v in rows])
+        cursor.execute('update c7n_entry set id_key = ? where key = ?', [id_key, key])
+
+    def save(self, key, data, timestamp=None):
+        key = self.encode_key(key)
+        timestamp = timestamp and timestamp.timestamp() or time.time()
+        if isinstance(data, list):
+            kind, values = 'list', data
+        else:
+            kind, values = 'value', [data]
+        records = [(key, pos, self.encode_value(v)) for pos, v in enumerate(values)]
+        size = sum(len(r[2]) for r in records)
+        with self.conn as cursor:
+            self._delete(cursor, [key])
+            cursor.execute(
+                'insert into c7n_entry (key, kind, id_key, size, create_date, access_date) '
+                'values (?, ?, null, ?, ?, ?)', [key, kind, size, timestamp, time.time()])
+            cursor.executemany(
+                'insert into c7n_record (key, position, value) values (?, ?, ?)', records)
+            self._evict(cursor)
+
+    def _evict(self, cursor):
+        total = cursor.execute('select coalesce(sum(size), 0) from c7n_entry').fetchone()[0]
+        if total <= self.max_size:
+            return
+        evicted = []
+        for k, size in cursor.execute(
+                'select key, size from c7n_entry order by access_date').fetchall():
+            if total <= self.max_size:
+                break
+            evicted.append(k)
+            total -= size
+        log.debug('evicting %d cache entries', len(evicted))
+        self._delete(cursor, evicted)
+
+    def size(self):
+        if not self.conn:
+            return 0
+        return self.conn.execute(
+            'select coalesce(sum(size), 0) from c7n_entry').fetchone()[0]
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
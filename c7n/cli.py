@@ -93,10 +93,15 @@ def _default_options(p, exclude=[]):
     if 'cache' not in exclude:
         p.add_argument(
             "-f", "--cache", default="~/.cache/cloud-custodian.cache",
-            help="Cache file (default %(default)s)")
+            help="Cache file, prefix with records: for the per record cache "
+            "(default %(default)s)")
         p.add_argument(
             "--cache-period", default=15, type=int,
             help="Cache validity in minutes (default %(default)i)")
+        p.add_argument(
+            "--cache-max-size", default=None, type=int, metavar="MB",
+            help="Size in megabytes past which least recently used entries are "
+            "evicted from the records: cache (default 512)")
     else:
         p.add_argument("--cache", default=None, help=argparse.SUPPRESS)
     if 'session-policy' not in exclude:
@@ -231,6 +236,30 @@ def setup_parser():
         "--skip-validation",
         action="store_true",
         help="Skips validation of policies (assumes you've run the validate command separately).")
+    run.add_argument(
+        "--parallel", type=int, default=0, metavar="N",
+        help="Execute policies on a pool of N worker processes, policies sharing "
+        "a resource type in a region run together in one worker.")
+    run.add_argument(
+        "--service-concurrency", type=int, default=2,
+        help="With --parallel, the maximum number of concurrent policy groups "
+        "per service (default %(default)i)")
+    run.add_argument(
+        "--no-resource-snapshot", dest="resource_snapshot",
+        action="store_false", default=True,
+        help="Disable sharing fetched resources between policies in the run.")
+    run.add_argument(
+        "--api-rate-limits", default=None, metavar="FILE",
+        help="Yaml file of per service api call quotas, pacing api calls "
+        "client side (also set via C7N_API_RATE_LIMITS)")
+    run.add_argument(
+        "--child-workers", type=int, default=None, metavar="N",
+        help="Enumerate the child resources of up to N parent resources "
+        "concurrently (default 4)")
+    run.add_argument(
+        "--stream-batch-size", type=int, default=0, metavar="N",
+        help="Fetch, filter and act on resources in batches of N as they are "
+        "retrieved, writing matched resources to resources.jsonl.")
 
     metrics_help = ("Emit metrics to provider metrics. Specify 'aws', 'gcp', or 'azure'. "
             "For more details on aws metrics options, see: "
@@ -292,6 +321,15 @@ def setup_parser():
         "-c", "--config", help=argparse.SUPPRESS)
     validate.add_argument("configs", nargs='*',
                           help="Policy Configuration File(s)")
+    validate.add_argument(
+        "--explain", action="store_true",
+        help="Report the evaluation order and cost of each policy's filters")
+    validate.add_argument(
+        "--schema-cache", default=None, metavar="DIR",
+        help="Cache resource schemas and skip revalidating unchanged policies")
+    validate.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Number of processes validating policies in parallel")
     validate.add_argument("-v", "--verbose", action="count", help="Verbose Logging")
     validate.add_argument("-q", "--quiet", action="count", help="Less logging (repeatable)")
     validate.add_argument("--debug", default=False, help=argparse.SUPPRESS)
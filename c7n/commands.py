@@ -1,6 +1,8 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, wait
+import contextlib
 from datetime import timedelta, datetime
 from functools import wraps
 import json
@@ -14,9 +16,11 @@ from typing import List
 import yaml
 from yaml.constructor import ConstructorError
 
-from c7n import deprecated
+from c7n import cache, deprecated
 from c7n.exceptions import ClientError, PolicyValidationError
+from c7n.executor import ProcessPoolExecutor
 from c7n.loader import SourceLocator
+from c7n.manager import plan_filters
 from c7n.provider import clouds
 from c7n.policy import Policy, PolicyCollection, load as policy_load
 from c7n.schema import ElementSchema, StructureParser, generate
@@ -187,6 +191,22 @@ class DuplicateKeyCheckLoader(SafeLoader):
         return super(DuplicateKeyCheckLoader, self).construct_mapping(node, deep)
 
 
+def explain_filters(filters, block='and', depth=1):
+    """Describe the evaluation order and cost of a filter tree."""
+    lines = []
+    if block != 'or':
+        filters = plan_filters(filters)
+    for idx, f in enumerate(filters, start=1):
+        cost = f.cost is None and 'fixed' or f.cost
+        if f.type in ('and', 'or', 'not'):
+            lines.append("%s%d. %s cost:%s" % ("  " * depth, idx, f.type, cost))
+            lines.extend(explain_filters(f.filters, f.type, depth + 1))
+        else:
+            lines.append("%s%d. %s cost:%s %s" % (
+                "  " * depth, idx, f.type, cost, json.dumps(f.data, default=str)))
+    return lines
+
+
 def validate(options):
     from c7n import schema
 
@@ -196,6 +216,8 @@ def validate(options):
 
     used_policy_names = set()
     structure = StructureParser()
+    validator = schema.PolicyValidator(
+        getattr(options, 'schema_cache', None), getattr(options, 'jobs', None) or 1)
     all_errors = {}
     found_deprecations = False
     footnotes = deprecated.Footnotes()
@@ -227,8 +249,7 @@ def validate(options):
             continue
 
         load_resources(structure.get_resource_types(data))
-        schm = schema.generate()
-        errors += schema.validate(data, schm)
+        errors += validator.validate(data)
         conf_policy_names = {
             p.get('name', 'unknown') for p in data.get('policies', ())}
         dupes = conf_policy_names.intersection(used_policy_names)
@@ -252,6 +273,11 @@ def validate(options):
                 try:
                     policy = Policy(p, null_config, Bag())
                     policy.validate()
+                    if getattr(options, 'explain', False):
+                        log.info("Filter plan for policy:%s\n%s" % (
+                            policy.name,
+                            "\n".join(explain_filters(
+                                getattr(policy.resource_manager, 'filters', ())))))
                     # If the policy is invalid, there isn't much point checking
                     # for deprecated usage as there is no guarantee as to the
                     # state of the policy.
@@ -276,6 +302,8 @@ def validate(options):
         log.error("Configuration invalid: {}".format(config_file))
         for e in errors:
             log.error("%s" % e)
+    if validator.skipped:
+        log.debug("Skipped schema validation of %d unchanged policies", validator.skipped)
     if found_deprecations:
         notes = footnotes()
         if notes:
@@ -286,6 +314,113 @@ def validate(options):
         sys.exit(1)
 
 
+#: executor used for parallel policy execution, each worker runs one
+#: group of policies at a time so policy output and logs stay isolated.
+policy_executor = ProcessPoolExecutor
+
+
+def _run_policies(options, policies: List[Policy]) -> List[str]:
+    """Execute policies serially, returning the names of errored policies."""
+    errored_policies: List[str] = []
+    if options.get('resource_snapshot', True):
+        snapshot = cache.snapshot(policies)
+    else:
+        snapshot = contextlib.nullcontext()
+
+    with snapshot as resource_snapshot:
+        for policy in policies:
+            try:
+                policy()
+            except Exception:
+                errored_policies.append(policy.name)
+                if options.debug:
+                    raise
+                log.exception(
+                    "Error while executing policy %s, continuing" % (
+                        policy.name))
+            finally:
+                if resource_snapshot is not None:
+                    resource_snapshot.release(policy)
+    return errored_policies
+
+
+def _run_policy_group(options, group):
+    """Worker entry point, execute a group of policies given as (data, options) pairs."""
+    load_resources(StructureParser().get_resource_types(
+        {'policies': [data for data, _ in group]}))
+    policies = [Policy(data, policy_options) for data, policy_options in group]
+    # as in the supervisor, validation also initializes filters and conditions
+    for p in policies:
+        p.validate()
+    return _run_policies(options, policies)
+
+
+def _get_policy_service(policy):
+    resource_type = getattr(policy.resource_manager, 'resource_type', None)
+    return "%s.%s" % (
+        policy.provider_name,
+        getattr(resource_type, 'service', None) or policy.resource_type)
+
+
+def _group_policies(policies):
+    """Group policies sharing a resource type in the same region and account.
+
+    Policies within a group execute serially in one worker, sharing
+    their resource fetches through the run snapshot.
+    """
+    groups = {}
+    for p in policies:
+        key = (p.provider_name, p.options.get('account_id'),
+               p.options.region, p.resource_type)
+        groups.setdefault(key, []).append(p)
+    return list(groups.values())
+
+
+def _run_parallel(options, policies: List[Policy]) -> List[str]:
+    """Execute policy groups on a worker pool.
+
+    At most ``--parallel`` groups execute concurrently, and at most
+    ``--service-concurrency`` of those may target the same service.
+    """
+    pending = _group_policies(policies)
+    service_limit = max(options.get('service_concurrency') or 1, 1)
+    running = Counter()
+    futures = {}
+    errored_policies: List[str] = []
+
+    log.info(
+        "Executing %d policies in %d groups with %d workers",
+        len(policies), len(pending), options.parallel)
+
+    with policy_executor(max_workers=options.parallel) as w:
+        while pending or futures:
+            for group in list(pending):
+                if len(futures) >= options.parallel:
+                    break
+                service = _get_policy_service(group[0])
+                if running[service] >= service_limit:
+                    continue
+                pending.remove(group)
+                running[service] += 1
+                f = w.submit(
+                    _run_policy_group, options,
+                    [(p.data, p.options) for p in group])
+                futures[f] = (service, group)
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for f in done:
+                service, group = futures.pop(f)
+                running[service] -= 1
+                if f.exception():
+                    log.error(
+                        "Error while executing policy group %s: %s",
+                        ", ".join(p.name for p in group), f.exception())
+                    errored_policies.extend(p.name for p in group)
+                    continue
+                errored_policies.extend(f.result())
+    return errored_policies
+
+
 @policy_command
 def run(options, policies: List[Policy]) -> None:
     exit_code = 0
@@ -302,18 +437,12 @@ def run(options, policies: List[Policy]) -> None:
             log.exception("Unable to assume role %s", options.assume_role)
             sys.exit(1)
 
-    errored_policies: List[str] = []
-    for policy in policies:
-        try:
-            policy()
-        except Exception:
-            exit_code = 2
-            errored_policies.append(policy.name)
-            if options.debug:
-                raise
-            log.exception(
-                "Error while executing policy %s, continuing" % (
-                    policy.name))
+    if options.get('parallel', 0) > 1 and not options.debug:
+        errored_policies = _run_parallel(options, policies)
+    else:
+        errored_policies = _run_policies(options, policies)
+    if errored_policies:
+        exit_code = 2
     if exit_code != 0:
         log.error("The following policies had errors while executing\n - %s" % (
             "\n - ".join(errored_policies)))
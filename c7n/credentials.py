@@ -64,6 +64,9 @@ class CustodianSession(Session):
 
 class SessionFactory:
 
+    # optional c7n.ratelimit.RateLimits pacing api calls of sessions
+    rate_limits = None
+
     def __init__(
             self, region, profile=None, assume_role=None, external_id=None, session_policy=None):
         self.region = region
@@ -77,6 +80,7 @@ class SessionFactory:
                 self.session_name, os.environ['C7N_SESSION_SUFFIX'])
         self._subscribers = []
         self._policy_name = ""
+        self.account_id = None
 
     def _set_policy_name(self, name):
         self._policy_name = name
@@ -101,6 +105,9 @@ class SessionFactory:
         if self._policy_name:
             session._session.user_agent_extra = f"c7n/policy#{self._policy_name}"
 
+        if self.rate_limits is not None:
+            self.rate_limits.register(session, self.account_id)
+
         for s in self._subscribers:
             s(session)
 
@@ -33,7 +33,7 @@ from c7n.utils import (
     jmespath_search,
     jmespath_compile
 )
-from c7n.manager import iter_filters
+from c7n.manager import iter_filters, plan_filters
 
 
 class FilterValidationError(Exception):
@@ -199,6 +199,16 @@ class Filter(Element):
 
     log = logging.getLogger('custodian.filters')
 
+    #: Relative evaluation cost, used to order filters within a conjunction.
+    #: 1 for in-memory evaluation, 10 for a bounded number of api calls,
+    #: 100 for api calls per resource. None (unknown) keeps the filter's
+    #: written position.
+    cost = None
+
+    #: Resource keys the filter annotates besides c7n prefixed ones, filters
+    #: reading them are kept after it when ordering by cost.
+    annotation_keys = ()
+
     def __init__(self, data, manager=None):
         self.data = data
         self.manager = manager
@@ -433,6 +443,15 @@ class BooleanGroupFilter(Filter):
     def __len__(self):
         return len(self.filters)
 
+    @property
+    def cost(self):
+        # a block is as expensive as its most expensive member, so blocks
+        # of equally cheap filters keep their written position.
+        costs = [f.cost for f in self.filters]
+        if None in costs:
+            return None
+        return max(costs, default=1)
+
     def __bool__(self):
         return True
 
@@ -483,7 +502,7 @@ class And(BooleanGroupFilter):
         if self.manager:
             sweeper = AnnotationSweeper(self.get_resource_type_id(), resources)
 
-        for f in self.filters:
+        for f in plan_filters(self.filters):
             resources = f.process(resources, events)
             if not resources:
                 break
@@ -521,7 +540,7 @@ class Not(BooleanGroupFilter):
             resource_map = {r[rtype_id]: r for r in resources}
         sweeper = AnnotationSweeper(rtype_id, resources)
 
-        for f in self.filters:
+        for f in plan_filters(self.filters):
             resources = f.process(resources, event)
             if not resources:
                 break
@@ -614,6 +633,22 @@ class ValueFilter(BaseValueFilter):
     annotate = True
     required_keys = {'value', 'key'}
 
+    @property
+    def cost(self):
+        # subclasses typically fetch additional data for their values.
+        if type(self) is not ValueFilter:
+            return None
+        if self.data.get('value_type') == 'resource_count':
+            return None
+        if len(self.data) == 1:
+            key = list(self.data)[0]
+        else:
+            key = self.data.get('key') or ''
+        # filters on annotations depend on the filters that set them.
+        if 'c7n' in key or 'c7n' in self.data.get('value_path', ''):
+            return None
+        return 1
+
     def _validate_resource_count(self):
         """ Specific validation for `resource_count` type
 
@@ -699,11 +734,205 @@ class ValueFilter(BaseValueFilter):
                 return resources
             return []
 
-        return super(ValueFilter, self).process(resources, event)
+        matcher = self.get_matcher()
+        if matcher is None:
+            return super(ValueFilter, self).process(resources, event)
+        return matcher(resources)
 
     def get_resource_value(self, k, i):
         return super(ValueFilter, self).get_resource_value(k, i, self.data.get('value_regex'))
 
+    def get_matcher(self):
+        """Compile the filter to a batch matching function.
+
+        The key extraction is compiled once per filter, while the value
+        type conversion of the filter value (ie. age thresholds relative
+        to now) is done once per call rather than once per resource.
+
+        Returns None when the generic per resource match must be used,
+        ie. for subclasses customizing matching, ``value_path`` or
+        ``expr`` values.
+        """
+        klass = type(self)
+        if (klass.__call__ is not ValueFilter.__call__ or
+                klass.match is not ValueFilter.match or
+                klass.get_resource_value is not ValueFilter.get_resource_value or
+                klass.process_value_type is not ValueFilter.process_value_type):
+            return None
+        if 'value_path' in self.data or self.data.get('value_type') == 'expr':
+            return None
+
+        self.initialize_content()
+        if self._extract is None:
+            self._extract = self._compile_key(self.k)
+        extract, convert = self._extract, self._compile_value_type(self.v)
+        compare = self._compile_compare()
+        null_default = () if self.op in ('in', 'not-in') else None
+        annotate, k = self.annotate, self.k
+
+        def matcher(resources):
+            column = [extract(i) if i is not None else None for i in resources]
+            results = []
+            for i, r in zip(resources, column):
+                if i is None:
+                    continue
+                if r is None:
+                    r = null_default
+                if convert is None:
+                    matched = compare(r)
+                else:
+                    v, r = convert(r)
+                    matched = compare(r, v)
+                if matched:
+                    if annotate:
+                        set_annotation(i, ANNOTATION_KEY, k)
+                    results.append(i)
+            return results
+        return matcher
+
+    _extract = None
+
+    def _compile_key(self, k):
+        regex = self.data.get('value_regex')
+        if k.startswith('tag:') and not self.data.get('tag_key_transforms'):
+            tk = k.split(':', 1)[1]
+
+            def extract(i):
+                if 'Tags' in i:
+                    for t in i.get('Tags', []):
+                        if t.get('Key') == tk:
+                            return t.get('Value')
+                elif 'labels' in i:
+                    return i.get('labels', {}).get(tk, None)
+                elif 'tags' in i:
+                    return (i.get('tags', {}) or {}).get(tk, None)
+                return None
+        elif k.startswith('tag:'):
+            return partial(self.get_resource_value, k)
+        else:
+            try:
+                expr = jmespath_compile(k)
+            except Exception:
+                # only resources lacking the literal key need the expression.
+                return partial(self.get_resource_value, k)
+
+            def extract(i):
+                if k in i:
+                    return i.get(k)
+                return expr.search(i)
+
+        if regex:
+            value_regex = ValueRegex(regex)
+            return lambda i: value_regex.get_resource_value(extract(i))
+        return extract
+
+    def _compile_value_type(self, sentinel):
+        """Return a function converting a resource value to a (value, resource value) pair.
+
+        Mirrors process_value_type, with conversions of the filter value hoisted.
+        """
+        vtype = self.vtype
+        if vtype is None:
+            return None
+        elif vtype == 'normalize':
+            return lambda r: (sentinel, r.strip().lower() if isinstance(r, str) else r)
+        elif vtype in ('integer', 'float'):
+            cast, default = (int, 0) if vtype == 'integer' else (float, 0.0)
+
+            def convert(r):
+                try:
+                    return sentinel, cast(str(r).strip())
+                except ValueError:
+                    return sentinel, default
+            return convert
+        elif vtype in ('size', 'unique_size'):
+            unique = vtype == 'unique_size'
+
+            def convert(r):
+                try:
+                    return sentinel, len(set(r) if unique else r)
+                except TypeError:
+                    return sentinel, 0
+            return convert
+        elif vtype == 'swap':
+            return lambda r: (r, sentinel)
+        elif vtype == 'date':
+            date_sentinel = parse_date(sentinel)
+            return lambda r: (date_sentinel, parse_date(r))
+        elif vtype in ('age', 'expiration'):
+            threshold = sentinel
+            if not isinstance(threshold, datetime.datetime):
+                n = datetime.datetime.now(tz=tzutc())
+                threshold = n - timedelta(sentinel) if vtype == 'age' else n + timedelta(sentinel)
+
+            def convert(r):
+                r = parse_date(r)
+                if r is None:
+                    r = 0
+                # age comparisons are reversed, see process_value_type
+                return (r, threshold) if vtype == 'age' else (threshold, r)
+            return convert
+        elif vtype == 'cidr':
+            cidr_sentinel = parse_cidr(sentinel)
+            sentinel_address = isinstance(cidr_sentinel, ipaddress._BaseAddress)
+
+            def convert(r):
+                r = parse_cidr(r)
+                if sentinel_address and isinstance(r, ipaddress._BaseNetwork):
+                    return r, cidr_sentinel
+                return cidr_sentinel, r
+            return convert
+        elif vtype == 'cidr_size':
+            def convert(r):
+                cidr = parse_cidr(r)
+                return sentinel, cidr.prefixlen if cidr else 0
+            return convert
+        elif vtype == 'version':
+            version_sentinel = ComparableVersion(sentinel)
+            return lambda r: (version_sentinel, ComparableVersion(r))
+        return lambda r: (sentinel, r)
+
+    def _compile_compare(self):
+        """Return a comparison function, see the value match in match.
+
+        Without a value type the filter value is constant, and the
+        comparison is specialized to take just the resource value.
+        """
+        op = OPERATORS[self.op] if self.op else None
+
+        def compare(r, v):
+            if r is None and v == 'absent':
+                return True
+            elif r is not None and v == 'present':
+                return True
+            elif v == 'not-null' and r:
+                return True
+            elif v == 'empty' and not r:
+                return True
+            elif op:
+                try:
+                    return op(r, v)
+                except TypeError:
+                    return False
+            elif r == v:
+                return True
+            return False
+
+        if self.vtype is not None:
+            return compare
+
+        v = self.v
+        if isinstance(v, str) and v in ('absent', 'present', 'not-null', 'empty'):
+            return lambda r: compare(r, v)
+        if op:
+            def compare_op(r):
+                try:
+                    return op(r, v)
+                except TypeError:
+                    return False
+            return compare_op
+        return lambda r: r == v
+
     def get_path_value(self, i):
         """Retrieve values using JMESPath.
 
@@ -730,7 +959,7 @@ class ValueFilter(BaseValueFilter):
         """
         return jmespath_search(self.data.get('value_path'), i)
 
-    def match(self, i):
+    def initialize_content(self):
         if self.v is None and len(self.data) == 1:
             [(self.k, self.v)] = self.data.items()
         elif self.v is None and not hasattr(self, 'content_initialized'):
@@ -744,6 +973,9 @@ class ValueFilter(BaseValueFilter):
             self.content_initialized = True
             self.vtype = self.data.get('value_type')
 
+    def match(self, i):
+        self.initialize_content()
+
         if 'value_path' in self.data and 'value_from' not in self.data:
             self.v = self.get_path_value(i)
 
@@ -27,8 +27,11 @@ References
 
 """
 import fnmatch
+import functools
+import hashlib
 import logging
 import json
+import threading
 
 from c7n.exceptions import PolicyValidationError
 from c7n.filters import Filter
@@ -46,6 +49,17 @@ def _account(arn):
     return arn.split(':', 5)[4]
 
 
+def _freeze(value):
+    # hashable, order independent form of checker config values
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    elif isinstance(value, (set, frozenset)):
+        return tuple(sorted(map(str, value)))
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
 class PolicyChecker:
     """
     checker_config:
@@ -55,53 +69,84 @@ class PolicyChecker:
       - allowed_accounts: permission grants to these accounts are okay
       - whitelist_conditions: a list of conditions that are considered
             sufficient enough to whitelist the statement.
+
+    Results are memoized process wide by checker type, config and
+    policy document, as identical policy documents are common across
+    resources and accounts.
     """
+
+    # bound on memoized policy results, cleared when exceeded
+    max_results = 10000
+    _results = {}
+    _results_lock = threading.Lock()
+
     def __init__(self, checker_config):
         self.checker_config = checker_config
 
-    # Config properties
+    # Config properties, as lookup structures computed once per checker
     @property
     def return_allowed(self):
         return self.checker_config.get('return_allowed', False)
 
-    @property
+    @functools.cached_property
     def allowed_accounts(self):
-        return self.checker_config.get('allowed_accounts', ())
+        return frozenset(self.checker_config.get('allowed_accounts', ()))
 
     @property
     def everyone_only(self):
         return self.checker_config.get('everyone_only', False)
 
-    @property
+    @functools.cached_property
     def check_actions(self):
-        return self.checker_config.get('check_actions', ())
+        return tuple(self.checker_config.get('check_actions', ()))
 
-    @property
+    @functools.cached_property
     def whitelist_conditions(self):
-        return set(v.lower() for v in self.checker_config.get('whitelist_conditions', ()))
+        return frozenset(v.lower() for v in self.checker_config.get('whitelist_conditions', ()))
 
-    @property
+    @functools.cached_property
     def allowed_vpce(self):
-        return self.checker_config.get('allowed_vpce', ())
+        return frozenset(self.checker_config.get('allowed_vpce', ()))
 
-    @property
+    @functools.cached_property
     def allowed_vpc(self):
-        return self.checker_config.get('allowed_vpc', ())
+        return frozenset(self.checker_config.get('allowed_vpc', ()))
 
-    @property
+    @functools.cached_property
     def allowed_orgid(self):
-        return self.checker_config.get('allowed_orgid', ())
+        return frozenset(self.checker_config.get('allowed_orgid', ()))
 
-    @property
+    @functools.cached_property
     def allowed_org_units(self):
-        return self.checker_config.get('allowed_org_units', ())
+        return tuple(self.checker_config.get('allowed_org_units', ()))
 
-    @property
+    @functools.cached_property
     def whitelist_patterns(self):
-        return self.checker_config.get('whitelist_patterns', ())
+        return tuple(self.checker_config.get('whitelist_patterns', ()))
+
+    @functools.cached_property
+    def config_key(self):
+        return (
+            "%s.%s" % (self.__class__.__module__, self.__class__.__name__),
+            _freeze(self.checker_config))
 
     # Policy statement handling
     def check(self, policy_text):
+        if isinstance(policy_text, str):
+            document = policy_text
+        else:
+            document = json.dumps(policy_text, sort_keys=True)
+        key = (self.config_key, hashlib.sha256(document.encode('utf8')).hexdigest())
+        results = self._results.get(key)
+        if results is None:
+            results = self.evaluate(policy_text)
+            with self._results_lock:
+                if len(self._results) >= self.max_results:
+                    self._results.clear()
+                self._results[key] = results
+        return list(results)
+
+    def evaluate(self, policy_text):
         if isinstance(policy_text, str):
             policy = json.loads(policy_text)
         else:
@@ -384,6 +429,8 @@ class CrossAccountAccessFilter(Filter):
     matches a whitelisted org ID is accepted regardless of the OU whitelist.
     """
 
+    cost = 10
+
     schema = type_schema(
         'cross-account',
         # only consider policies that grant one of the given actions.
@@ -415,6 +462,10 @@ class CrossAccountAccessFilter(Filter):
 
     checker_factory = PolicyChecker
 
+    @property
+    def annotation_keys(self):
+        return (self.annotation_key, self.allowlist_key)
+
     @staticmethod
     def _validate_org_unit_path(path):
         if '*' in path or '?' in path:
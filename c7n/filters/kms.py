@@ -1,5 +1,7 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+from copy import deepcopy
+
 from .core import ValueFilter
 from .related import RelatedResourceFilter
 from c7n.utils import type_schema
@@ -49,7 +51,10 @@ class KmsRelatedFilter(RelatedResourceFilter):
     def get_related(self, resources):
         resource_manager = self.get_resource_manager()
         related_ids = self.get_related_ids(resources)
-        if len(related_ids) < self.FetchThreshold:
+        index = self.get_related_index(resource_manager, related_ids)
+        if index is not None:
+            related = [deepcopy(index[rid]) for rid in related_ids if rid in index]
+        elif len(related_ids) < self.FetchThreshold:
             related = resource_manager.get_resources(list(related_ids))
         else:
             related = resource_manager.resources()
@@ -72,6 +72,24 @@ class MetricsFilter(Filter):
 
     Note the default statistic for metrics is Average.
 
+    The ``batch`` key switches retrieval from one GetMetricStatistics
+    call per resource to GetMetricData, which fetches the metric for up
+    to 500 resources in a single call. This requires the
+    ``cloudwatch:GetMetricData`` permission.
+
+    .. code-block:: yaml
+
+      - name: ec2-underutilized-batch
+        resource: ec2
+        filters:
+          - type: metrics
+            name: CPUUtilization
+            days: 4
+            period: 86400
+            value: 30
+            op: less-than
+            batch: true
+
     The ``period-start`` key allows you to align the metric window in two ways.
     By default, using ``auto``, the window is computed relative to the current time.
     Alternatively, setting it to ``start-of-day`` aligns the window to full UTC calendar days,
@@ -91,6 +109,8 @@ class MetricsFilter(Filter):
             period-start: start-of-day
     """
 
+    cost = 100
+
     schema = type_schema(
         'metrics',
         **{'namespace': {'type': 'string'},
@@ -109,12 +129,15 @@ class MetricsFilter(Filter):
            'attr-multiplier': {'type': 'number'},
            'percent-attr': {'type': 'string'},
            'missing-value': {'type': 'number'},
+           'batch': {'type': 'boolean'},
            'required': ('value', 'name')})
     schema_alias = True
     permissions = ("cloudwatch:GetMetricStatistics",)
 
     MAX_QUERY_POINTS = 50850
     MAX_RESULT_POINTS = 1440
+    # GetMetricData limit on metric queries per request
+    MAX_BATCH_QUERIES = 500
 
     # Default per service, for overloaded services like ec2
     # we do type specific default namespace annotation
@@ -223,12 +246,17 @@ class MetricsFilter(Filter):
         self.namespace = ns
 
         self.log.debug("Querying metrics for %d", len(resources))
+        if self.is_batch():
+            process_set, batch_size = self.process_resource_batch, self.get_batch_size()
+        else:
+            process_set, batch_size = self.process_resource_set, 50
+
         matched = []
         with self.executor_factory(max_workers=3) as w:
             futures = []
-            for resource_set in chunks(resources, 50):
+            for resource_set in chunks(resources, batch_size):
                 futures.append(
-                    w.submit(self.process_resource_set, resource_set))
+                    w.submit(process_set, resource_set))
 
             for f in as_completed(futures):
                 if f.exception():
@@ -238,6 +266,24 @@ class MetricsFilter(Filter):
                 matched.extend(f.result())
         return matched
 
+    def get_permissions(self):
+        if self.is_batch():
+            return ('cloudwatch:GetMetricData',)
+        return self.permissions
+
+    def is_batch(self):
+        # resource specific retrieval overrides only know how to
+        # fetch a single resource's metrics.
+        return bool(
+            self.data.get('batch') and
+            type(self).get_metric_data is MetricsFilter.get_metric_data)
+
+    def get_batch_size(self):
+        # bound the number of datapoints a single request can return
+        # so each batch resolves in a bounded number of pages.
+        points = max(1, -(-int((self.end - self.start).total_seconds()) // self.period))
+        return max(1, min(self.MAX_BATCH_QUERIES, self.MAX_QUERY_POINTS // points))
+
     def get_dimensions(self, resource):
         return [{'Name': self.model.dimension,
                  'Value': resource[self.model.dimension]}]
@@ -250,6 +296,35 @@ class MetricsFilter(Filter):
             dims.append({'Name': k, 'Value': v})
         return dims
 
+    def get_metric_key(self):
+        # Note this annotation cache is policy scoped, not across
+        # policies, still the lack of full qualification on the key
+        # means multiple filters within a policy using the same metric
+        # across different periods or dimensions would be problematic.
+        return "%s.%s.%s.%s" % (self.namespace, self.metric, self.statistics, str(self.days))
+
+    def get_metric_params(self, resource):
+        # if we overload dimensions with multiple resources we get
+        # the statistics/average over those resources.
+        dimensions = self.get_dimensions(resource)
+        # Merge in any filter specified metrics, get_dimensions is
+        # commonly overridden so we can't do it there.
+        dimensions.extend(self.get_user_dimensions())
+
+        params = dict(
+            Namespace=self.namespace,
+            MetricName=self.metric,
+            StartTime=self.start,
+            EndTime=self.end,
+            Period=self.period,
+            Dimensions=dimensions
+        )
+
+        stats_key = (self.statistics in self.standard_stats
+                     and 'Statistics' or 'ExtendedStatistics')
+        params[stats_key] = [self.statistics]
+        return params
+
     def get_metric_data(self, client, params):
         """Retrieve metric datapoints in the filter's normalized shape.
 
@@ -258,78 +333,106 @@ class MetricsFilter(Filter):
         """
         return client.get_metric_statistics(**params)['Datapoints']
 
+    def get_batch_metric_data(self, client, queries):
+        """Retrieve datapoints for a set of metric queries with GetMetricData.
+
+        Returns a mapping of query id to datapoints in the same shape
+        GetMetricStatistics returns them.
+        """
+        if self.statistics in self.standard_stats:
+            def datapoint(t, v):
+                return {'Timestamp': t, self.statistics: v}
+        else:
+            def datapoint(t, v):
+                return {'Timestamp': t, 'ExtendedStatistics': {self.statistics: v}}
+
+        results = {q['Id']: [] for q in queries}
+        paginator = client.get_paginator('get_metric_data')
+        for page in paginator.paginate(
+                MetricDataQueries=queries,
+                StartTime=self.start,
+                EndTime=self.end,
+                ScanBy='TimestampAscending'):
+            for result in page['MetricDataResults']:
+                results[result['Id']].extend(
+                    datapoint(t, v) for t, v in zip(result['Timestamps'], result['Values']))
+        return results
+
     def process_resource_set(self, resource_set):
         client = local_session(
             self.manager.session_factory).client('cloudwatch')
 
-        matched = []
+        key = self.get_metric_key()
         for r in resource_set:
-            # if we overload dimensions with multiple resources we get
-            # the statistics/average over those resources.
-            dimensions = self.get_dimensions(r)
-            # Merge in any filter specified metrics, get_dimensions is
-            # commonly overridden so we can't do it there.
-            dimensions.extend(self.get_user_dimensions())
-
             collected_metrics = r.setdefault('c7n.metrics', {})
-            # Note this annotation cache is policy scoped, not across
-            # policies, still the lack of full qualification on the key
-            # means multiple filters within a policy using the same metric
-            # across different periods or dimensions would be problematic.
-            key = "%s.%s.%s.%s" % (self.namespace, self.metric, self.statistics, str(self.days))
-
-            params = dict(
-                Namespace=self.namespace,
-                MetricName=self.metric,
-                StartTime=self.start,
-                EndTime=self.end,
-                Period=self.period,
-                Dimensions=dimensions
-            )
+            if key not in collected_metrics:
+                collected_metrics[key] = self.get_metric_data(
+                    client, self.get_metric_params(r))
+        return [r for r in resource_set if self.match_metrics(r, key)]
 
-            stats_key = (self.statistics in self.standard_stats
-                         and 'Statistics' or 'ExtendedStatistics')
-            params[stats_key] = [self.statistics]
+    def process_resource_batch(self, resource_set):
+        client = local_session(
+            self.manager.session_factory).client('cloudwatch')
 
-            if key not in collected_metrics:
-                collected_metrics[key] = self.get_metric_data(client, params)
-
-            # In certain cases CloudWatch reports no data for a metric.
-            # If the policy specifies a fill value for missing data, add
-            # that here before testing for matches. Otherwise, skip
-            # matching entirely.
-            if len(collected_metrics[key]) == 0:
-                if 'missing-value' not in self.data:
-                    continue
-                collected_metrics[key].append({
-                    'Timestamp': self.start,
-                    self.statistics: self.data['missing-value'],
-                    'c7n:detail': 'Fill value for missing data'
-                })
-
-            if self.data.get('percent-attr'):
-                rvalue = r[self.data.get('percent-attr')]
-                if self.data.get('attr-multiplier'):
-                    rvalue = rvalue * self.data['attr-multiplier']
-                all_meet_condition = True
-                for data_point in collected_metrics[key]:
-                    percent = (data_point[self.statistics] / rvalue * 100)
-                    if not self.op(percent, self.value):
-                        all_meet_condition = False
-                        break
-                if all_meet_condition:
-                    matched.append(r)
-            else:
-                all_meet_condition = True
-                for data_point in collected_metrics[key]:
-                    if 'ExtendedStatistics' in data_point:
-                        data_point = data_point['ExtendedStatistics']
-                    if not self.op(data_point[self.statistics], self.value):
-                        all_meet_condition = False
-                        break
-                if all_meet_condition:
-                    matched.append(r)
-        return matched
+        key = self.get_metric_key()
+        pending = {}
+        for r in resource_set:
+            if key in r.setdefault('c7n.metrics', {}):
+                continue
+            params = self.get_metric_params(r)
+            qid = 'm%d' % len(pending)
+            pending[qid] = (r, {
+                'Id': qid,
+                'MetricStat': {
+                    'Metric': {
+                        'Namespace': params['Namespace'],
+                        'MetricName': params['MetricName'],
+                        'Dimensions': params['Dimensions']},
+                    'Period': self.period,
+                    'Stat': self.statistics},
+                'ReturnData': True})
+
+        if pending:
+            results = self.get_batch_metric_data(
+                client, [q for _, q in pending.values()])
+            for qid, (r, _) in pending.items():
+                r['c7n.metrics'][key] = results[qid]
+        return [r for r in resource_set if self.match_metrics(r, key)]
+
+    def match_metrics(self, r, key):
+        collected_metrics = r['c7n.metrics']
+
+        # In certain cases CloudWatch reports no data for a metric.
+        # If the policy specifies a fill value for missing data, add
+        # that here before testing for matches. Otherwise, skip
+        # matching entirely.
+        if len(collected_metrics[key]) == 0:
+            if 'missing-value' not in self.data:
+                return False
+            collected_metrics[key].append({
+                'Timestamp': self.start,
+                self.statistics: self.data['missing-value'],
+                'c7n:detail': 'Fill value for missing data'
+            })
+
+        if self.data.get('percent-attr'):
+            rvalue = r[self.data.get('percent-attr')]
+            if self.data.get('attr-multiplier'):
+                rvalue = rvalue * self.data['attr-multiplier']
+            for data_point in collected_metrics[key]:
+                if 'ExtendedStatistics' in data_point:
+                    data_point = data_point['ExtendedStatistics']
+                percent = (data_point[self.statistics] / rvalue * 100)
+                if not self.op(percent, self.value):
+                    return False
+            return True
+
+        for data_point in collected_metrics[key]:
+            if 'ExtendedStatistics' in data_point:
+                data_point = data_point['ExtendedStatistics']
+            if not self.op(data_point[self.statistics], self.value):
+                return False
+        return True
 
 
 class ShieldMetrics(MetricsFilter):
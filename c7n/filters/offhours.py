@@ -250,6 +250,7 @@ might look like:
 """
 # note we have to module import for our testing mocks
 import datetime
+import functools
 import logging
 from os.path import join
 
@@ -263,6 +264,11 @@ from c7n.resolver import ValuesFrom
 log = logging.getLogger('custodian.offhours')
 
 
+@functools.lru_cache(maxsize=None)
+def _get_tz(name):
+    return tzutil.gettz(name)
+
+
 def brackets_removed(u):
     return u.translate({ord('['): None, ord(']'): None})
 
@@ -361,6 +367,13 @@ class Time(Filter):
         self.parse_errors = []
         self.enabled_count = 0
 
+        # schedules by normalized tag value, and within a process call,
+        # the match result by tag value, as resources share few schedules.
+        self.schedule_cache = {}
+        self.match_cache = None
+        self.cache_hits = self.cache_misses = 0
+        self.skip_days = None
+
     def validate(self):
         if self.get_tz(self.default_tz) is None:
             raise PolicyValidationError(
@@ -377,7 +390,14 @@ class Time(Filter):
         return self
 
     def process(self, resources, event=None):
-        resources = super(Time, self).process(resources)
+        self.skip_days = self.get_skip_days()
+        self.match_cache = {}
+        try:
+            resources = super(Time, self).process(resources)
+        finally:
+            self.match_cache = None
+        self.log.debug(
+            "schedule cache hits:%d misses:%d", self.cache_hits, self.cache_misses)
         if self.parse_errors and self.manager and self.manager.ctx.log_dir:
             self.log.warning("parse errors %d", len(self.parse_errors))
             with open(join(
@@ -429,6 +449,46 @@ class Time(Filter):
         # dateutil.parser.parse to process: value='off=(m-f,1);' properly.
         # before this normalization, some cases would silently fail.
         value = ';'.join(filter(None, value.split(';')))
+        key = (value, time_type)
+        if self.match_cache is not None and key in self.match_cache:
+            self.cache_hits += 1
+            result, error = self.match_cache[key]
+        else:
+            self.cache_misses += 1
+            result, error = self.match_schedule(value, time_type)
+            if self.match_cache is not None:
+                self.match_cache[key] = (result, error)
+        if error:
+            log.warning("%s on resource:%s value:%s", error, rid, value)
+            self.parse_errors.append((rid, value))
+        return result
+
+    def match_schedule(self, value, time_type):
+        """Match a normalized tag value against the current time.
+
+        Returns a tuple of the match result and any error resolving the schedule.
+        """
+        schedule = self.get_schedule(value, time_type)
+        if schedule is None:
+            return False, "Invalid schedule"
+        tz = self.get_tz(schedule['tz'])
+        if not tz:
+            return False, "Could not resolve tz"
+        now = datetime.datetime.now(tz).replace(
+            minute=0, second=0, microsecond=0)
+        now_str = now.strftime("%Y-%m-%d")
+        skip_days = self.skip_days
+        if self.match_cache is None:
+            # called outside of process, resolve per resource
+            skip_days = self.skip_days = self.get_skip_days()
+        if now_str in skip_days:
+            return False, None
+        return self.match(now, schedule), None
+
+    def get_schedule(self, value, time_type):
+        key = (value, time_type)
+        if key in self.schedule_cache:
+            return self.schedule_cache[key]
         if self.parser.has_resource_schedule(value, time_type):
             schedule = self.parser.parse(value)
         elif self.parser.keys_are_valid(value):
@@ -441,28 +501,14 @@ class Time(Filter):
                 schedule = self.default_schedule
         else:
             schedule = None
-        if schedule is None:
-            log.warning(
-                "Invalid schedule on resource:%s value:%s", rid, value)
-            self.parse_errors.append((rid, value))
-            return False
-        tz = self.get_tz(schedule['tz'])
-        if not tz:
-            log.warning(
-                "Could not resolve tz on resource:%s value:%s", rid, value)
-            self.parse_errors.append((rid, value))
-            return False
-        now = datetime.datetime.now(tz).replace(
-            minute=0, second=0, microsecond=0)
-        now_str = now.strftime("%Y-%m-%d")
+        self.schedule_cache[key] = schedule
+        return schedule
+
+    def get_skip_days(self):
         if 'skip-days-from' in self.data:
             values = ValuesFrom(self.data['skip-days-from'], self.manager)
-            self.skip_days = values.get_values()
-        else:
-            self.skip_days = self.data.get('skip-days', [])
-        if now_str in self.skip_days:
-            return False
-        return self.match(now, schedule)
+            return values.get_values()
+        return self.data.get('skip-days', [])
 
     def match(self, now, schedule):
         time = schedule.get(self.time_type, ())
@@ -501,10 +547,7 @@ class Time(Filter):
 
     @classmethod
     def get_tz(cls, tz):
-        found = cls.TZ_ALIASES.get(tz)
-        if found:
-            return tzutil.gettz(found)
-        return tzutil.gettz(tz.title())
+        return _get_tz(cls.TZ_ALIASES.get(tz) or tz.title())
 
     def get_default_schedule(self):
         raise NotImplementedError("use subclass")
@@ -1,16 +1,30 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+from copy import deepcopy
 import importlib
 from functools import lru_cache
 
 from .core import ValueFilter, OPERATORS
+from c7n import cache
 from c7n.query import ChildResourceQuery
 from c7n.utils import jmespath_search
 
 
+def get_graph_key(manager):
+    """Key of a manager's resources in the run's relationship graph.
+
+    Returns None when no run snapshot is active or the manager's
+    resources are not snapshotted.
+    """
+    if cache.get_snapshot() is None or not hasattr(manager, 'get_snapshot_key'):
+        return None
+    return manager.get_snapshot_key(manager.source.get_query_params(None))
+
+
 class RelatedResourceFilter(ValueFilter):
 
     schema_alias = False
+    cost = 10
 
     RelatedResource = None
     RelatedIdsExpression = None
@@ -35,13 +49,61 @@ class RelatedResourceFilter(ValueFilter):
         return super(RelatedResourceFilter, self).validate()
 
     def get_related_ids(self, resources):
-        return set(jmespath_search(
-            "[].%s" % self.RelatedIdsExpression, resources))
+        edges = self.get_edges()
+        if edges is None:
+            return set(jmespath_search(
+                "[].%s" % self.RelatedIdsExpression, resources))
+
+        # related ids of each resource are extracted once per run and
+        # shared with other filters using the same expression.
+        id_key = self.manager.get_model().id
+        related_ids = set()
+        for r in resources:
+            rid = r.get(id_key)
+            rids = edges.get(rid) if rid is not None else None
+            if rids is None:
+                rids = frozenset(jmespath_search(
+                    "[].%s" % self.RelatedIdsExpression, [r]))
+                if rid is not None:
+                    edges[rid] = rids
+            related_ids.update(rids)
+        return related_ids
+
+    def get_edges(self):
+        key = get_graph_key(self.manager)
+        if key is None:
+            return None
+        return cache.get_snapshot().get_edges(key, self.RelatedIdsExpression)
+
+    def get_related_index(self, resource_manager, related_ids):
+        """Run scoped map of related resource id to related resource."""
+        key = get_graph_key(resource_manager)
+        if key is None:
+            return None
+        snapshot = cache.get_snapshot()
+        model = resource_manager.get_model()
+        index = snapshot.get_index(key, model.id)
+        if index is None and len(related_ids) >= self.FetchThreshold:
+            # populates the snapshot if the manager uses it
+            resource_manager.resources()
+            index = snapshot.get_index(key, model.id)
+        return index
 
     def get_related(self, resources):
         resource_manager = self.get_resource_manager()
         related_ids = self.get_related_ids(resources)
         model = resource_manager.get_model()
+        index = self.get_related_index(resource_manager, related_ids)
+        if index is not None:
+            related = {rid: deepcopy(index[rid]) for rid in related_ids if rid in index}
+            # resources outside the enumerated set, ie. in another account
+            missing = related_ids.difference(related)
+            if missing and len(missing) < self.FetchThreshold:
+                for r in resource_manager.get_resources(list(missing)) or ():
+                    if r[model.id] in missing:
+                        related[r[model.id]] = r
+            return related
+
         if len(related_ids) < self.FetchThreshold:
             related = resource_manager.get_resources(list(related_ids))
         else:
@@ -126,6 +188,10 @@ class RelatedResourceByIdFilter(RelatedResourceFilter):
         resource_manager = self.get_resource_manager()
         related_ids = self.get_related_ids(resources)
 
+        reverse = self.get_reverse_edges(resource_manager)
+        if reverse is not None:
+            return {rid: deepcopy(reverse[rid]) for rid in related_ids if rid in reverse}
+
         related = {}
         for r in resource_manager.resources():
             matched_vpc = self.get_related_by_ids(r) & related_ids
@@ -136,6 +202,27 @@ class RelatedResourceByIdFilter(RelatedResourceFilter):
                     related[vpc] = related_resources
         return related
 
+    def get_reverse_edges(self, resource_manager):
+        """Run scoped map of id to the related resources referencing it."""
+        key = get_graph_key(resource_manager)
+        if key is None:
+            return None
+
+        def build(related_resources):
+            reverse = {}
+            for r in related_resources:
+                for rid in self.get_related_by_ids(r):
+                    reverse.setdefault(rid, []).append(r)
+            return reverse
+
+        snapshot = cache.get_snapshot()
+        name = ('reverse', self.RelatedResourceByIdExpression or self.RelatedIdsExpression)
+        reverse = snapshot.derive(key, name, build)
+        if reverse is None:
+            resource_manager.resources()
+            reverse = snapshot.derive(key, name, build)
+        return reverse
+
     def get_related_by_ids(self, resources):
         RelatedResourceKey = self.RelatedResourceByIdExpression or self.RelatedIdsExpression
         ids = jmespath_search("%s" % RelatedResourceKey, resources)
@@ -69,13 +69,22 @@ class SchemaValidator:
         self.schema = v.schema
         return self.validator
 
-    @lru_cache(maxsize=32)
     def _gen_schema(self, resource_types):
-        if schema is None:
-            raise RuntimeError("missing jsonschema dependency")
-        rt_schema = schema.generate(resource_types)
-        schema.JsonSchemaValidator.check_schema(rt_schema)
-        return schema.JsonSchemaValidator(rt_schema)
+        return get_schema_validator(resource_types)
+
+
+@lru_cache(maxsize=32)
+def get_schema_validator(resource_types):
+    """Compiled schema validator for the given resource types.
+
+    Cached per process, so loaders and policy collections validating
+    the same resource types share one schema generation.
+    """
+    if schema is None:
+        raise RuntimeError("missing jsonschema dependency")
+    rt_schema = schema.generate(resource_types)
+    schema.JsonSchemaValidator.check_schema(rt_schema)
+    return schema.JsonSchemaValidator(rt_schema)
 
 
 class PolicyLoader:
@@ -29,6 +29,53 @@ def iter_filters(filters, block_end=False):
         yield f
 
 
+def get_filter_cost(f):
+    return getattr(f, 'cost', None)
+
+
+def plan_filters(filters):
+    """Order a conjunction of filters for evaluation by ascending cost.
+
+    Filters without a cost (None) keep their position and bound the
+    reordering, as they may depend on set semantics or on annotations
+    from the filters preceding them. Between those, cheaper filters are
+    moved first, otherwise preserving the written order, so expensive
+    filters only see the resources that survive the cheap ones. Filters
+    reading the annotation keys of a preceding filter stay after it.
+    """
+    plan, segment = [], []
+    for f in filters:
+        if get_filter_cost(f) is None:
+            plan.extend(_plan_segment(segment))
+            plan.append(f)
+            segment = []
+        else:
+            segment.append(f)
+    plan.extend(_plan_segment(segment))
+    return plan
+
+
+def _plan_segment(segment):
+    ranks = []
+    for idx, f in enumerate(segment):
+        rank = get_filter_cost(f)
+        for widx, w in enumerate(segment[:idx]):
+            keys = getattr(w, 'annotation_keys', ())
+            if keys and reads_keys(f, keys):
+                rank = max(rank, ranks[widx])
+        ranks.append(rank)
+    return [segment[idx] for idx in sorted(range(len(segment)), key=ranks.__getitem__)]
+
+
+def reads_keys(f, keys):
+    """Whether a filter, or any filter within it, may read one of the keys."""
+    for sf in iter_filters([f]):
+        data = str(getattr(sf, 'data', ''))
+        if any(k in data for k in keys):
+            return True
+    return False
+
+
 class ResourceManager:
     """
     A Cloud Custodian resource
@@ -76,6 +123,14 @@ class ResourceManager:
     def resources(self):
         raise NotImplementedError("")
 
+    def iter_resources(self, batch_size):
+        """Yield filtered resources in batches.
+
+        Managers that can't fetch incrementally yield their full
+        resource set as a single batch.
+        """
+        yield self.resources()
+
     def get_resource_manager(self, resource_type, data=None):
         """get a resource manager or a given resource type.
 
@@ -104,7 +159,7 @@ class ResourceManager:
         if event and event.get('debug', False):
             self.log.info(
                 "Filtering resources using %d filters", len(self.filters))
-        for idx, f in enumerate(self.filters, start=1):
+        for idx, f in enumerate(plan_filters(self.filters), start=1):
             if not resources:
                 break
             rcount = len(resources)
@@ -10,6 +10,7 @@ See docs/usage/outputs.rst
 import contextlib
 import datetime
 import gzip
+import io
 import logging
 import os
 import shutil
@@ -408,6 +409,13 @@ class OutputFileHandler(ABC):
         "Write a file at the relative path specified with the value as the content."
         raise NotImplementedError()
 
+    @contextlib.contextmanager
+    def open_file(self, rel_path):
+        "Open a file at the relative path for incremental writes."
+        buf = io.StringIO()
+        yield buf
+        self.write_file(rel_path, buf.getvalue())
+
 
 @blob_outputs.register('null')
 class NullBlobOutput(OutputFileHandler):
@@ -430,6 +438,10 @@ class NullBlobOutput(OutputFileHandler):
     def write_file(self, rel_path, value):
         "A no-op for the null handler."
 
+    def open_file(self, rel_path):
+        "A no-op for the null handler."
+        return open(os.devnull, 'w')
+
 
 @blob_outputs.register('file')
 @blob_outputs.register('default')
@@ -459,8 +471,14 @@ class DirectoryOutput(OutputFileHandler):
         return "<%s to dir:%s>" % (self.__class__.__name__, self.root_dir)
 
     def write_file(self, rel_path, value):
-        with open(os.path.join(self.root_dir, rel_path), 'w') as fh:
+        # write and rename, so an interrupted run never leaves a truncated file
+        path = os.path.join(self.root_dir, rel_path)
+        with open(path + '.tmp', 'w') as fh:
             fh.write(value)
+        os.replace(path + '.tmp', path)
+
+    def open_file(self, rel_path):
+        return open(os.path.join(self.root_dir, rel_path), 'w')
 
     def compress(self):
         # Compress files individually so thats easy to walk them, without
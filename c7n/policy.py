@@ -1,11 +1,13 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 from datetime import datetime
+import hashlib
 import json
 import fnmatch
 import itertools
 import logging
 import os
+import pickle
 import time
 from typing import List
 
@@ -14,7 +16,7 @@ from dateutil import parser, tz as tzutil
 from c7n.cwe import CloudWatchEvents
 from c7n.ctx import ExecutionContext
 from c7n.exceptions import PolicyValidationError, ClientError, ResourceLimitExceeded
-from c7n.filters import FilterRegistry, And, Or, Not
+from c7n.filters import FilterRegistry, And, Or, Not, ReduceFilter
 from c7n.manager import iter_filters
 from c7n.output import DEFAULT_NAMESPACE
 from c7n.resources import load_resources
@@ -22,7 +24,7 @@ from c7n.registry import PluginRegistry
 from c7n.provider import clouds, get_resource_class
 from c7n import deprecated, utils
 from c7n.version import version
-from c7n.query import RetryPageIterator
+from c7n.query import QueryResourceManager, RetryPageIterator
 from c7n.varfmt import VarFormat
 from c7n.utils import get_policy_provider, jmespath_compile
 
@@ -316,6 +318,10 @@ class PullMode(PolicyExecutionMode):
         if not self.policy.is_runnable():
             return []
 
+        batch_size = self.get_stream_batch_size()
+        if batch_size:
+            return self.run_stream(batch_size)
+
         with self.policy.ctx as ctx:
             self.policy.log.debug(
                 "Running policy:%s resource:%s region:%s c7n:%s",
@@ -327,7 +333,7 @@ class PullMode(PolicyExecutionMode):
 
             s = time.time()
             try:
-                resources = self.policy.resource_manager.resources()
+                resources = self.get_resources()
             except ResourceLimitExceeded as e:
                 self.policy.log.error(str(e))
                 ctx.metrics.put_metric(
@@ -375,6 +381,242 @@ class PullMode(PolicyExecutionMode):
             )
             return resources
 
+    def get_resources(self):
+        return self.policy.resource_manager.resources()
+
+    def get_stream_batch_size(self):
+        batch_size = getattr(self.policy.options, 'stream_batch_size', 0)
+        if not batch_size:
+            return 0
+        # limits, resource counts and reductions are evaluated against
+        # the entire resource set.
+        if self.policy.max_resources or self.policy.max_resources_percent:
+            self.policy.log.warning(
+                "policy:%s has resource limits, streaming disabled", self.policy.name)
+            return 0
+        for f in self.policy.resource_manager.iter_filters():
+            if f.data.get('value_type') == 'resource_count':
+                self.policy.log.warning(
+                    "policy:%s uses resource_count, streaming disabled", self.policy.name)
+                return 0
+            if isinstance(f, ReduceFilter):
+                self.policy.log.warning(
+                    "policy:%s uses a reduce filter, streaming disabled", self.policy.name)
+                return 0
+        return batch_size
+
+    def run_stream(self, batch_size):
+        """Run the policy over resource batches as they're retrieved.
+
+        Matched resources are written to resources.jsonl one per line,
+        and actions are invoked per batch. Matched resources are not
+        retained, so memory use is bounded by the batch size.
+        """
+        with self.policy.ctx as ctx:
+            self.policy.log.debug(
+                "Streaming policy:%s resource:%s region:%s batch:%d c7n:%s",
+                self.policy.name,
+                self.policy.resource_type,
+                self.policy.options.region or 'default',
+                batch_size,
+                version,
+            )
+
+            resource_manager = self.policy.resource_manager
+            count = 0
+            action_time = dict.fromkeys([a.name for a in resource_manager.actions], 0)
+            action_results = {}
+
+            s = time.time()
+            with ctx.output.open_file('resources.jsonl') as fh:
+                for resources in resource_manager.iter_resources(batch_size):
+                    for r in resources:
+                        fh.write(utils.dumps(r, indent=None))
+                        fh.write('\n')
+                    count += len(resources)
+
+                    if not resources or self.policy.options.dryrun:
+                        continue
+
+                    for a in resource_manager.actions:
+                        at = time.time()
+                        with ctx.tracer.subsegment('action:%s' % a.type):
+                            results = a.process(resources)
+                        action_time[a.name] += time.time() - at
+                        if results:
+                            action_results.setdefault(a.name, []).append(results)
+
+            rt = time.time() - s - sum(action_time.values())
+            self.policy.log.info(
+                "policy:%s resource:%s region:%s count:%d time:%0.2f",
+                self.policy.name,
+                self.policy.resource_type,
+                self.policy.options.region,
+                count,
+                rt,
+            )
+            ctx.metrics.put_metric(
+                "ResourceCount", count, "Count", Scope="Policy"
+            )
+            ctx.metrics.put_metric("ResourceTime", rt, "Seconds", Scope="Policy")
+
+            if not count or self.policy.options.dryrun:
+                return []
+
+            for a in resource_manager.actions:
+                self.policy.log.info(
+                    "policy:%s action:%s"
+                    " resources:%d"
+                    " execution_time:%0.2f"
+                    % (self.policy.name, a.name, count, action_time[a.name])
+                )
+                if a.name in action_results:
+                    ctx.output.write_file(
+                        "action-%s" % a.name, utils.dumps(action_results[a.name]))
+            ctx.metrics.put_metric(
+                "ActionTime", sum(action_time.values()), "Seconds", Scope="Policy"
+            )
+            return []
+
+
+@execution.register('delta')
+class DeltaMode(PullMode):
+    """Pull mode execution that only re-evaluates changed resources.
+
+    Resources are listed without augmentation and each is hashed. The
+    hashes and match results of the previous run are kept in a per
+    policy state file. Only new or changed resources are augmented
+    and filtered. Unchanged resources keep their previous match result,
+    and actions run against the merged set of matched resources.
+
+    Filters whose result can change without the listed resource changing
+    (ie. metrics, age, related resources, or tags not part of the
+    listing) are re-evaluated on a full run, which happens once
+    ``full-interval`` hours (default 24) have passed since the last one,
+    or whenever the policy is changed.
+
+    .. code-block:: yaml
+
+      policies:
+        - name: ec2-public-ip
+          resource: ec2
+          mode:
+            type: delta
+            full-interval: 12
+          filters:
+            - PublicIpAddress: present
+    """
+
+    schema = utils.type_schema(
+        'delta',
+        **{'state-dir': {'type': 'string'},
+           'full-interval': {'type': 'number'}})
+
+    default_state_dir = '~/.cache/c7n-delta'
+
+    def validate(self):
+        # resources are listed from the manager's source, so managers
+        # customizing their resources can't be evaluated incrementally.
+        resource_manager = self.policy.resource_manager
+        if (not isinstance(resource_manager, QueryResourceManager) or
+                type(resource_manager).resources is not QueryResourceManager.resources):
+            raise PolicyValidationError(
+                "policy:%s delta mode is not supported for resource:%s" % (
+                    self.policy.name, self.policy.resource_type))
+
+    def get_stream_batch_size(self):
+        return 0
+
+    def get_state_path(self):
+        state_dir = self.policy.data['mode'].get('state-dir', self.default_state_dir)
+        return os.path.join(
+            os.path.expanduser(state_dir),
+            self.policy.options.account_id or 'default',
+            self.policy.options.region or 'default',
+            '%s.pickle' % self.policy.name)
+
+    def get_policy_hash(self):
+        return self.get_hash(self.policy.data)
+
+    @staticmethod
+    def get_hash(data):
+        return hashlib.sha256(json.dumps(
+            data, cls=utils.JsonEncoder, sort_keys=True).encode('utf8')).hexdigest()
+
+    def load_state(self):
+        """Load the prior run's state, if it can still be used."""
+        path = self.get_state_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as fh:
+                state = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            self.policy.log.warning(
+                "policy:%s unable to load delta state %s: %s", self.policy.name, path, e)
+            return None
+        if state.get('policy') != self.get_policy_hash():
+            return None
+        interval = self.policy.data['mode'].get('full-interval', 24) * 3600
+        if time.time() - state['full_time'] > interval:
+            return None
+        return state
+
+    def save_state(self, state):
+        path = self.get_state_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as fh:
+            pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+    def get_resources(self):
+        resource_manager = self.policy.resource_manager
+        id_key = resource_manager.get_model().id
+
+        state = self.load_state()
+        if state is None:
+            state = {'policy': self.get_policy_hash(),
+                     'full_time': time.time(),
+                     'resources': {}}
+        previous = state['resources']
+
+        query = resource_manager.source.get_query_params(None) or {}
+        with resource_manager.ctx.tracer.subsegment('resource-fetch'):
+            resources = resource_manager.source.resources(query)
+
+        current, changed = {}, []
+        for r in resources:
+            rhash = self.get_hash(r)
+            prior = previous.get(r[id_key])
+            if prior and prior['hash'] == rhash:
+                current[r[id_key]] = prior
+            else:
+                current[r[id_key]] = {'hash': rhash, 'resource': None}
+                changed.append(r)
+
+        self.policy.log.debug(
+            "policy:%s delta evaluating %d of %d resources",
+            self.policy.name, len(changed), len(resources))
+
+        if changed:
+            with resource_manager.ctx.tracer.subsegment('resource-augment'):
+                augmented = resource_manager.augment(changed)
+            # resources dropped during augmentation are retried next run
+            for rid in {r[id_key] for r in changed}.difference(
+                    r[id_key] for r in augmented):
+                current.pop(rid)
+            with resource_manager.ctx.tracer.subsegment('filter'):
+                for r in resource_manager.filter_resources(augmented):
+                    current[r[id_key]]['resource'] = r
+
+        state['resources'] = current
+        self.save_state(state)
+
+        matched = [current[r[id_key]]['resource'] for r in resources
+                   if r[id_key] in current and current[r[id_key]]['resource'] is not None]
+        resource_manager.check_resource_limit(len(matched), len(resources))
+        return matched
+
 
 class LambdaMode(ServerlessExecutionMode):
     """A policy that runs/executes in lambda."""
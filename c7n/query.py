@@ -13,9 +13,10 @@ from typing import List
 
 import os
 
+from c7n import cache
 from c7n.actions import ActionRegistry
 from c7n.exceptions import ClientError, ResourceLimitExceeded, PolicyExecutionError
-from c7n.filters import FilterRegistry, MetricsFilter
+from c7n.filters import FilterRegistry, MetricsFilter, ValueFilter
 from c7n.manager import ResourceManager
 from c7n.registry import PluginRegistry
 from c7n.tags import register_ec2_tags, register_universal_tags, universal_augment
@@ -35,6 +36,10 @@ except ImportError:
         pass
 
 
+#: stages of resource augmentation, detail api calls and tag retrieval
+AUGMENT_STAGES = ('detail', 'tags')
+
+
 class ResourceQuery:
 
     def __init__(self, session_factory):
@@ -63,6 +68,19 @@ class ResourceQuery:
 
         return data
 
+    def _iter_client_enum(self, client, enum_op, params, path, retry=None):
+        if client.can_paginate(enum_op):
+            p = client.get_paginator(enum_op)
+            if retry:
+                p.PAGE_ITERATOR_CLS = RetryPageIterator
+            pages = p.paginate(**params)
+        else:
+            pages = [getattr(client, enum_op)(**params)]
+
+        path = jmespath_compile(path)
+        for page in pages:
+            yield path.search(page) or []
+
     def filter(self, resource_manager, **params):
         """Query a set of resources."""
         m = self.resolve(resource_manager.resource_type)
@@ -78,6 +96,24 @@ class ResourceQuery:
             client, enum_op, params, path,
             getattr(resource_manager, 'retry', None)) or []
 
+    def filter_pages(self, resource_manager, **params):
+        """Query a set of resources, yielding them a page at a time."""
+        m = self.resolve(resource_manager.resource_type)
+        enum_op, path, extra_args = m.enum_spec
+        if not path:
+            yield self.filter(resource_manager, **params)
+            return
+        if resource_manager.get_client:
+            client = resource_manager.get_client()
+        else:
+            client = local_session(self.session_factory).client(
+                m.service, resource_manager.config.region)
+        if extra_args:
+            params = {**extra_args, **params}
+        yield from self._iter_client_enum(
+            client, enum_op, params, path,
+            getattr(resource_manager, 'retry', None))
+
     def get(self, resource_manager, identities):
         """Get resources by identities
         """
@@ -120,6 +156,11 @@ class ChildResourceQuery(ResourceQuery):
 
     parent_key = 'c7n:parent-id'
 
+    # children of separate parents are enumerated concurrently, by default
+    # on max_workers threads, api calls are paced by the session's rate
+    # limits if configured, see c7n.ratelimit
+    max_workers = 4
+
     def __init__(self, session_factory, manager, capture_parent_id=False):
         self.session_factory = session_factory
         self.manager = manager
@@ -157,11 +198,15 @@ class ChildResourceQuery(ResourceQuery):
             return self._invoke_client_enum(client, enum_op, params, path)
 
         # Have to query separately for each parent's children.
+        get_children = functools.partial(
+            self._get_children, client, enum_op, params, path, parent_key)
+        max_workers = getattr(self.manager.config, 'child_workers', None) or self.max_workers
+        with self.manager.executor_factory(
+                max_workers=min(max_workers, len(parent_ids))) as w:
+            subsets = list(w.map(get_children, parent_ids))
+
         results = []
-        for parent_id in parent_ids:
-            merged_params = self.get_parent_parameters(params, parent_id, parent_key)
-            subset = self._invoke_client_enum(
-                client, enum_op, merged_params, path, retry=self.manager.retry)
+        for parent_id, subset in zip(parent_ids, subsets):
             if annotate_parent:
                 for r in subset:
                     r[self.parent_key] = parent_id
@@ -172,6 +217,11 @@ class ChildResourceQuery(ResourceQuery):
                     results.extend(subset)
         return results
 
+    def _get_children(self, client, enum_op, params, path, parent_key, parent_id):
+        merged_params = self.get_parent_parameters(params, parent_id, parent_key)
+        return self._invoke_client_enum(
+            client, enum_op, merged_params, path, retry=self.manager.retry)
+
     def get_parent_parameters(self, params, parent_id, parent_key):
         return dict(params, **{parent_key: parent_id})
 
@@ -231,6 +281,16 @@ class DescribeSource:
     def resources(self, query):
         return self.query.filter(self.manager, **query)
 
+    def iter_resources(self, query):
+        # sources or queries that customize enumeration are fetched whole.
+        if (type(self).resources is not DescribeSource.resources or
+                type(self.query).filter is not ResourceQuery.filter or
+                (type(self.query)._invoke_client_enum is not
+                 ResourceQuery._invoke_client_enum)):
+            yield self.resources(query)
+            return
+        yield from self.query.filter_pages(self.manager, **query)
+
     def get_query(self):
         return self.resource_query_factory(self.manager.session_factory)
 
@@ -255,7 +315,13 @@ class DescribeSource:
             perms.append("%s:%s" % (prefix, _napi(m.batch_detail_spec[0])))
         return perms
 
-    def augment(self, resources):
+    # augment stages supported by the augment method of this class,
+    # see QueryResourceManager.get_augment_stages
+    augment_stages = ('detail',)
+
+    def augment(self, resources, stages=AUGMENT_STAGES):
+        if 'detail' not in stages:
+            return resources
         model = self.manager.get_model()
         if getattr(model, 'detail_spec', None):
             detail_spec = getattr(model, 'detail_spec', None)
@@ -281,8 +347,13 @@ class DescribeSource:
 
 class DescribeWithResourceTags(DescribeSource):
 
-    def augment(self, resources):
-        return universal_augment(self.manager, super().augment(resources))
+    augment_stages = ('detail', 'tags')
+
+    def augment(self, resources, stages=AUGMENT_STAGES):
+        resources = super().augment(resources, stages)
+        if 'tags' not in stages:
+            return resources
+        return universal_augment(self.manager, resources)
 
 
 @sources.register('describe-child')
@@ -475,6 +546,7 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
     def __init__(self, ctx, data):
         super(QueryResourceManager, self).__init__(ctx, data)
         self.source = self.get_source(self.source_type)
+        self._augment_stages = False
 
     @property
     def source_type(self):
@@ -516,26 +588,123 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
         return perms
 
     def get_cache_key(self, query):
-        return {
+        key = {
             'account': self.account_id,
             'region': self.config.region,
             'resource': str(self.__class__.__name__),
             'source': self.source_type,
             'q': query
         }
+        # resources partially augmented for filtering are only shared
+        # with policies needing the same augment stages.
+        stages = self.get_augment_stages()
+        if stages is not None:
+            key['augment'] = stages
+        return key
+
+    def get_augment_stages(self):
+        """Augment stages needed to filter resources.
+
+        Returns None when resources are fully augmented before filtering,
+        otherwise the list of stages filters read. The remaining stages
+        are deferred and only applied to matched resources.
+        """
+        if self._augment_stages is False:
+            self._augment_stages = self._detect_augment_stages()
+        return self._augment_stages
+
+    def _detect_augment_stages(self):
+        if type(self).augment is not QueryResourceManager.augment:
+            return None
+        supported = get_source_augment_stages(self.source)
+        if not supported:
+            return None
+        model = self.get_model()
+        needed = set()
+        # batch detail and detail calls on bare ids replace the resource,
+        # so they can't run after filtering.
+        if (getattr(model, 'batch_detail_spec', None) or
+                (getattr(model, 'detail_spec', None) and model.detail_spec[2] is None)):
+            needed.add('detail')
+        listing_fields = get_listing_fields(model)
+        for f in self.iter_filters():
+            if f.type in ('or', 'and', 'not'):
+                continue
+            # only plain value filters have known field reads
+            if type(f) is not ValueFilter:
+                return None
+            # expr values and value paths are read from the resource too
+            if 'value_path' in f.data or f.data.get('value_type') == 'expr':
+                return None
+            key = f.data.get('key') if f.data.get('type') == 'value' else list(f.data)[0]
+            fields = key.startswith('tag:') and {'Tags'} or get_expression_fields(key)
+            if fields is None or listing_fields is None:
+                return None
+            # sources without a tags stage get tags from the listing or detail calls
+            if 'Tags' in fields and 'tags' in supported:
+                needed.add('tags')
+                fields = fields.difference(('Tags',))
+            if fields.difference(listing_fields):
+                needed.add('detail')
+        # tags are fetched by arn, which may only be set by the detail call
+        arn_key = getattr(model, 'arn', None)
+        if ('tags' in needed and arn_key and listing_fields is not None and
+                arn_key.split('.')[0] not in listing_fields):
+            needed.add('detail')
+        if needed.issuperset(supported):
+            return None
+        return sorted(needed.intersection(supported))
+
+    def augment_for_filters(self, resources):
+        """Apply the augment stages needed to filter resources."""
+        stages = self.get_augment_stages()
+        if stages is None:
+            return self.augment(resources)
+        return self.augment(resources, stages)
+
+    def augment_deferred(self, resources):
+        """Apply augment stages deferred until after filtering."""
+        stages = self.get_augment_stages()
+        if stages is None or not resources:
+            return resources
+        deferred = [s for s in get_source_augment_stages(self.source) if s not in stages]
+        with self.ctx.tracer.subsegment('resource-augment'):
+            return self.source.augment(resources, deferred)
+
+    def get_snapshot_key(self, query):
+        """Key for the run scoped resource snapshot.
+
+        Extends the cache key with the fully qualified resource class, as
+        snapshots are shared across providers within a run.
+        """
+        key = self.get_cache_key(query)
+        key['resource'] = "%s.%s" % (self.__class__.__module__, self.__class__.__name__)
+        return key
 
     def resources(self, query=None, augment=True) -> List[dict]:
         query = self.source.get_query_params(query)
         cache_key = self.get_cache_key(query)
         resources = None
 
-        with self._cache:
-            resources = self._cache.get(cache_key)
+        snapshot = augment and cache.get_snapshot() or None
+        if snapshot is not None:
+            snapshot_key = self.get_snapshot_key(query)
+            resources = snapshot.get(snapshot_key)
             if resources is not None:
-                self.log.debug("Using cached %s: %d" % (
+                self.log.debug("Using snapshot %s: %d" % (
                     "%s.%s" % (self.__class__.__module__, self.__class__.__name__),
                     len(resources)))
 
+        with self._cache:
+            if resources is None:
+                resources = self._cache.get(cache_key)
+                if resources is not None:
+                    self.log.debug("Using cached %s: %d" % (
+                        "%s.%s" % (self.__class__.__module__, self.__class__.__name__),
+                        len(resources)))
+                    if snapshot is not None:
+                        snapshot.save(snapshot_key, resources)
+
             if resources is None:
                 if query is None:
                     query = {}
@@ -543,19 +712,59 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
                     resources = self.source.resources(query)
                 if augment:
                     with self.ctx.tracer.subsegment('resource-augment'):
-                        resources = self.augment(resources)
+                        resources = self.augment_for_filters(resources)
                     # Don't pollute cache with unaugmented resources.
                     self._cache.save(cache_key, resources)
+                    if snapshot is not None:
+                        snapshot.save(snapshot_key, resources)
 
         resource_count = len(resources)
         with self.ctx.tracer.subsegment('filter'):
             resources = self.filter_resources(resources)
+        if augment:
+            resources = self.augment_deferred(resources)
 
         # Check if we're out of a policies execution limits.
         if self.data == self.ctx.policy.data:
             self.check_resource_limit(len(resources), resource_count)
         return resources
 
+    def iter_resources(self, batch_size, query=None):
+        """Yield filtered resources in batches of at most batch_size.
+
+        Resources are augmented and filtered as pages are retrieved
+        rather than materializing the full resource set, which bounds
+        memory by the batch size. The resource cache and run snapshot
+        are not consulted, and resource limits are not checked.
+        """
+        if type(self).resources is not QueryResourceManager.resources:
+            yield self.resources(query)
+            return
+
+        query = self.source.get_query_params(query)
+        if query is None:
+            query = {}
+        if hasattr(self.source, 'iter_resources'):
+            pages = self.source.iter_resources(query)
+        else:
+            pages = [self.source.resources(query)]
+
+        batch = []
+        for page in pages:
+            batch.extend(page)
+            while len(batch) >= batch_size:
+                yield self._process_batch(batch[:batch_size])
+                batch = batch[batch_size:]
+        if batch:
+            yield self._process_batch(batch)
+
+    def _process_batch(self, resources):
+        with self.ctx.tracer.subsegment('resource-augment'):
+            resources = self.augment_for_filters(resources)
+        with self.ctx.tracer.subsegment('filter'):
+            resources = self.filter_resources(resources)
+        return self.augment_deferred(resources)
+
     def check_resource_limit(self, selection_count, population_count):
         """Check if policy's execution affects more resources then its limit.
 
@@ -568,13 +777,18 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
 
     def _get_cached_resources(self, ids):
         key = self.get_cache_key(None)
+        snapshot = cache.get_snapshot()
+        if snapshot is not None:
+            resources = snapshot.select(
+                self.get_snapshot_key(None), self.get_model().id, ids)
+            if resources is not None:
+                self.log.debug("Using snapshot results for get_resources")
+                return resources
         with self._cache:
-            resources = self._cache.get(key)
+            resources = self._cache.select(key, self.get_model().id, ids)
             if resources is not None:
                 self.log.debug("Using cached results for get_resources")
-                m = self.get_model()
-                id_set = set(ids)
-                return [r for r in resources if r[m.id] in id_set]
+                return resources
         return None
 
     def get_resources(self, ids, cache=True, augment=True):
@@ -583,7 +797,7 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
         if cache:
             resources = self._get_cached_resources(ids)
             if resources is not None:
-                return resources
+                return augment and self.augment_deferred(resources) or resources
         try:
             resources = self.source.get_resources(ids)
             if augment:
@@ -593,13 +807,17 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
             self.log.warning("event ids not resolved: %s error:%s" % (ids, e))
             return []
 
-    def augment(self, resources):
+    def augment(self, resources, stages=None):
         """subclasses may want to augment resources with additional information.
 
         ie. we want tags by default (rds, elb), and policy, location, acl for
         s3 buckets.
+
+        :param stages: optionally limit augmentation to the given stages.
         """
-        return self.source.augment(resources)
+        if stages is None:
+            return self.source.augment(resources)
+        return self.source.augment(resources, stages)
 
     @property
     def account_id(self):
@@ -722,6 +940,104 @@ class ChildResourceManager(QueryResourceManager):
         return self.get_resource_manager(self.resource_type.parent_spec[0])
 
 
+def get_source_augment_stages(source):
+    """Augment stages the source's augment method can apply separately."""
+    for klass in type(source).__mro__:
+        if 'augment' in vars(klass):
+            return vars(klass).get('augment_stages', ())
+    return ()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_service_model(service):
+    import botocore.session
+    return botocore.session.get_session().get_service_model(service)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_shape_fields(service, op_name, path):
+    try:
+        from botocore import xform_name
+        service_model = _get_service_model(service)
+        op_names = {xform_name(n): n for n in service_model.operation_names}
+        shape = service_model.operation_model(op_names[op_name]).output_shape
+        for part in (path or '').split('.'):
+            while shape.type_name == 'list':
+                shape = shape.member
+            part = part.replace('[*]', '').replace('[]', '')
+            if part:
+                shape = shape.members[part]
+        while shape.type_name == 'list':
+            shape = shape.member
+    except Exception:
+        return None
+    if shape.type_name != 'structure':
+        return None
+    return frozenset(shape.members)
+
+
+def get_listing_fields(model):
+    """Fields reliably present on enumerated resources.
+
+    Api models often share a shape between list and detail operations
+    while the list operation leaves some fields unset, so any field the
+    detail call returns is treated as needing it. Returns None when the
+    fields can't be determined.
+    """
+    if not getattr(model, 'enum_spec', None):
+        return None
+    enum_op, path = model.enum_spec[:2]
+    fields = _get_shape_fields(model.service, enum_op, path)
+    detail_spec = getattr(model, 'detail_spec', None)
+    if fields is None or not detail_spec:
+        return fields
+    detail_fields = _get_shape_fields(model.service, detail_spec[0], detail_spec[3])
+    if detail_fields is None:
+        return None
+    return fields.difference(detail_fields)
+
+
+def get_expression_fields(expr):
+    """Top level resource fields a jmespath expression reads.
+
+    Returns None when the expression can't be analyzed.
+    """
+    try:
+        return _get_node_fields(jmespath_compile(expr).parsed)
+    except Exception:
+        return None
+
+
+# nodes whose first child is evaluated against the current value, and
+# the remainder against its result.
+_CHAINED_NODES = (
+    'subexpression', 'index_expression', 'projection', 'value_projection',
+    'filter_projection', 'flatten', 'pipe')
+# nodes whose children are all evaluated against the current value.
+_BRANCH_NODES = (
+    'function_expression', 'or_expression', 'and_expression', 'not_expression',
+    'comparator', 'multi_select_list', 'multi_select_dict', 'key_val_pair')
+
+
+def _get_node_fields(node):
+    node_type = node['type']
+    if node_type == 'field':
+        return {node['value']}
+    elif node_type in ('literal', 'index', 'slice', 'expref'):
+        return set()
+    elif node_type in _CHAINED_NODES:
+        return _get_node_fields(node['children'][0])
+    elif node_type in _BRANCH_NODES:
+        fields = set()
+        for child in node['children']:
+            child_fields = _get_node_fields(child)
+            if child_fields is None:
+                return None
+            fields.update(child_fields)
+        return fields
+    return None
+
+
 def _batch_augment(manager, model, detail_spec, client, resource_set):
     detail_op, param_name, param_key, detail_path, detail_args = detail_spec
     op = getattr(client, detail_op)
@@ -0,0 +1,156 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Client side api rate limiting.
+
+Api calls made from sessions of a :class:`c7n.credentials.SessionFactory`
+are paced by token buckets keyed by (account, region, service, operation)
+and shared by all threads and policies in the process. Each bucket
+adapts to throttling, halving its rate on throttled requests and
+recovering additively on successful ones.
+
+Rate limiting is opt-in, enabled by a quota file given with
+``--api-rate-limits`` or the ``C7N_API_RATE_LIMITS`` environment variable.
+
+.. code-block:: yaml
+
+   # calls per second for any operation not otherwise listed
+   default: 20
+   services:
+     # per operation rate for all operations of a service
+     ec2: 50
+     # a specific operation
+     ec2.DescribeSnapshots: 5
+     route53: 5
+
+Services are named as in botocore event names, which is the hyphenated
+lower case service id, e.g. ``ec2``, ``cloudwatch-logs``.
+"""
+from collections import Counter
+import logging
+import threading
+
+from c7n.exceptions import PolicyValidationError
+from c7n.utils import TokenBucket, THROTTLE_CODES, load_file
+
+log = logging.getLogger('custodian.ratelimit')
+
+
+class RateLimits:
+    """Process wide registry of api rate limiters.
+
+    :param quotas: Mapping of the ``default`` rate and per ``services`` rates.
+    """
+
+    default_rate = 20
+
+    def __init__(self, quotas=None):
+        quotas = quotas or {}
+        self.default = quotas.get('default', self.default_rate)
+        self.services = dict(quotas.get('services') or {})
+        self.buckets = {}
+        self.waits = Counter()
+        self.throttles = Counter()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path):
+        quotas = load_file(path)
+        if not isinstance(quotas, dict):
+            raise PolicyValidationError(
+                "invalid api rate limits file %s, expected a mapping" % path)
+        unknown = set(quotas).difference(('default', 'services'))
+        if unknown:
+            raise PolicyValidationError(
+                "invalid api rate limits file %s, unknown keys %s" % (
+                    path, ", ".join(sorted(unknown))))
+        return cls(quotas)
+
+    def get_rate(self, service, operation):
+        return self.services.get(
+            "%s.%s" % (service, operation),
+            self.services.get(service, self.default))
+
+    def get_bucket(self, account, region, service, operation):
+        key = (account, region, service, operation)
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            return bucket
+        with self.lock:
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(self.get_rate(service, operation))
+            return self.buckets[key]
+
+    def register(self, session, account=None, region=None):
+        """Pace api requests of clients created from the session."""
+        region = region or session.region_name
+        limiter = SessionLimiter(self, account, region)
+        session.events.register(
+            'before-send.*.*', limiter.before_send, unique_id='c7n-rate-limit-send')
+        session.events.register(
+            'needs-retry.*.*', limiter.needs_retry, unique_id='c7n-rate-limit-retry')
+        return limiter
+
+    def wait_time(self):
+        """Total seconds spent waiting on rate limits."""
+        return sum(self.waits.values())
+
+    def get_stats(self):
+        return {
+            'waits': dict(self.waits),
+            'throttles': dict(self.throttles)}
+
+
+class SessionLimiter:
+    """Botocore event handlers pacing the requests of one session."""
+
+    def __init__(self, limits, account, region):
+        self.limits = limits
+        self.account = account
+        self.region = region
+
+    def _get_bucket(self, event_name):
+        _, service, operation = event_name.split('.', 2)
+        return "%s.%s" % (service, operation), self.limits.get_bucket(
+            self.account, self.region, service, operation)
+
+    def before_send(self, event_name, **kwargs):
+        # each attempt, including botocore's own retries, counts against the quota
+        key, bucket = self._get_bucket(event_name)
+        waited = bucket.acquire()
+        if waited:
+            with self.limits.lock:
+                self.limits.waits[key] += waited
+
+    def needs_retry(self, event_name, response=None, **kwargs):
+        if response is None:
+            return
+        key, bucket = self._get_bucket(event_name)
+        code = response[1].get('Error', {}).get('Code')
+        if code in THROTTLE_CODES:
+            bucket.throttled()
+            with self.limits.lock:
+                self.limits.throttles[key] += 1
+            log.debug("api throttled %s rate reduced to %0.2f/s", key, bucket.rate)
+        elif not code:
+            bucket.succeeded()
+
+
+_rate_limits = None
+_rate_limits_lock = threading.Lock()
+
+
+def get_rate_limits(path):
+    """Get the process wide rate limits, loading the quota file once."""
+    global _rate_limits
+    with _rate_limits_lock:
+        if _rate_limits is None:
+            _rate_limits = RateLimits.from_file(path)
+            log.debug("api rate limits loaded from %s", path)
+        return _rate_limits
+
+
+def reset_rate_limits():
+    global _rate_limits
+    with _rate_limits_lock:
+        _rate_limits = None
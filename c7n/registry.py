@@ -1,6 +1,8 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 
+import importlib
+
 
 class PluginRegistry:
     """A plugin registry
@@ -40,6 +42,7 @@ class PluginRegistry:
     def __init__(self, plugin_type):
         self.plugin_type = plugin_type
         self._factories = {}
+        self._lazy = {}
         self._subscribers = []
 
     def subscribe(self, func):
@@ -55,6 +58,7 @@ class PluginRegistry:
             klass.type = name
             klass.type_aliases = aliases
             self._factories[name] = klass
+            self._lazy.pop(name, None)
             return klass
 
         # invoked as class decorator
@@ -62,12 +66,37 @@ class PluginRegistry:
             if not condition:
                 return klass
             self._factories[name] = klass
+            self._lazy.pop(name, None)
             klass.type = name
             klass.type_aliases = aliases
             return klass
         return _register_class
 
+    def register_lazy(self, name, class_path):
+        """Register a plugin by dotted class path, imported on first use.
+
+        The plugin's module is expected to register the class itself
+        when imported. Existing registrations take precedence.
+        """
+        if name not in self._factories:
+            self._lazy[name] = class_path
+
+    def _resolve(self, name):
+        module_name, class_name = self._lazy[name].rsplit('.', 1)
+        klass = getattr(importlib.import_module(module_name), class_name)
+        self._lazy.pop(name, None)
+        # importing may have registered a more specific plugin
+        if name not in self._factories:
+            self.register(name, klass, aliases=getattr(klass, 'type_aliases', None))
+        return self._factories[name]
+
+    def _resolve_all(self):
+        # resolving one entry may register its module siblings
+        while self._lazy:
+            self._resolve(next(iter(self._lazy)))
+
     def unregister(self, name):
+        self._lazy.pop(name, None)
         if name in self._factories:
             del self._factories[name]
 
@@ -76,7 +105,7 @@ class PluginRegistry:
             subscriber(self, key)
 
     def __contains__(self, key):
-        return key in self._factories
+        return key in self._factories or key in self._lazy
 
     def __getitem__(self, name):
         v = self.get(name)
@@ -85,7 +114,7 @@ class PluginRegistry:
         return v
 
     def __len__(self):
-        return len(self._factories)
+        return len(self._factories) + len(self._lazy)
 
     def get(self, name):
         factory = self._factories.get(name)
@@ -93,15 +122,21 @@ class PluginRegistry:
         if factory:
             return factory
 
+        if name in self._lazy:
+            return self._resolve(name)
+
         return next((v for k, v in self._factories.items()
                      if v.type_aliases and name in v.type_aliases),
                     None)
 
     def keys(self):
+        self._resolve_all()
         return self._factories.keys()
 
     def values(self):
+        self._resolve_all()
         return self._factories.values()
 
     def items(self):
+        self._resolve_all()
         return self._factories.items()
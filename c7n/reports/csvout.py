@@ -257,13 +257,19 @@ def fs_record_set(output_path, policy_name):
     record_path = os.path.join(output_path, 'resources.json')
 
     if not os.path.exists(record_path):
-        return []
+        # streaming runs write json lines
+        record_path = os.path.join(output_path, 'resources.jsonl')
+        if not os.path.exists(record_path):
+            return []
 
     mdate = datetime.fromtimestamp(
         os.stat(record_path).st_ctime)
 
     with open(record_path) as fh:
-        records = json.load(fh)
+        if record_path.endswith('.jsonl'):
+            records = [json.loads(line) for line in fh if line.strip()]
+        else:
+            records = json.load(fh)
         [r.__setitem__('CustodianDate', mdate) for r in records]
         return records
 
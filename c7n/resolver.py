@@ -1,24 +1,131 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import csv
+import hashlib
 import io
 import json
 import os.path
 import logging
 import itertools
+import tempfile
+import threading
+import time
+from urllib.error import HTTPError
 from urllib.request import Request, urlopen
 from urllib.parse import parse_qsl, urlparse
 import zlib
 from contextlib import closing
 
-from c7n.cache import NullCache
-from c7n.utils import format_string_values, local_session, jmespath_search
+from c7n.cache import NullCache, resolve_path
+from c7n.exceptions import ClientError
+from c7n.utils import format_string_values, local_session, jmespath_search, dumps
 
 log = logging.getLogger('custodian.resolver')
 
 ZIP_OR_GZIP_HEADER_DETECT = zlib.MAX_WBITS | 32
 
 
+class DocumentCache:
+    """Process wide cache of value documents and the values parsed from them.
+
+    Documents fetched over s3 or http(s) are keyed by uri and request
+    headers, and once older than ``ttl`` seconds are revalidated with
+    their etag or last modified date. With a directory, documents are
+    also stored on disk to share them between processes, ie. c7n-org
+    workers. Parsed values are keyed by document content hash, format
+    and expression.
+    """
+
+    ttl = 60
+
+    def __init__(self, path=None):
+        self.path = path and resolve_path(path) or None
+        self.documents = {}
+        self.values = {}
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def get_key(uri, headers):
+        return hashlib.sha256(
+            json.dumps([uri, headers or {}], sort_keys=True).encode('utf8')).hexdigest()
+
+    def get_document(self, key):
+        with self.lock:
+            entry = self.documents.get(key)
+        if entry is None and self.path:
+            try:
+                with open(os.path.join(self.path, "%s.json" % key)) as fh:
+                    entry = json.load(fh)
+            except (OSError, ValueError):
+                return None
+        return entry
+
+    def is_fresh(self, entry):
+        return entry['validated'] + self.ttl > time.time()
+
+    def save_document(self, key, contents, validators):
+        entry = {
+            'contents': contents,
+            'validators': validators,
+            'hash': hashlib.sha256(contents.encode('utf8')).hexdigest(),
+            'validated': time.time()}
+        self._store(key, entry)
+        return entry
+
+    def revalidated(self, key, entry):
+        entry = dict(entry, validated=time.time())
+        self._store(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        with self.lock:
+            self.documents[key] = entry
+        if not self.path:
+            return
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # write and rename, as concurrent workers may read the entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            with os.fdopen(fd, 'w') as fh:
+                dumps(entry, fh)
+            os.replace(tmp_path, os.path.join(self.path, "%s.json" % key))
+        except OSError as e:
+            log.warning("unable to store value document in %s: %s", self.path, e)
+
+    def get_values(self, key):
+        with self.lock:
+            if key in self.values:
+                self.hits += 1
+                return self.values[key]
+            self.misses += 1
+        return None
+
+    def save_values(self, key, values):
+        with self.lock:
+            self.values[key] = values
+
+
+_document_cache = None
+
+
+def get_document_cache():
+    """Get the process wide document cache.
+
+    Documents are stored on disk when the C7N_VALUE_CACHE_DIR
+    environment variable is set.
+    """
+    global _document_cache
+    if _document_cache is None:
+        _document_cache = DocumentCache(os.environ.get('C7N_VALUE_CACHE_DIR'))
+    return _document_cache
+
+
+def reset_document_cache():
+    global _document_cache
+    _document_cache = None
+
+
 class URIResolver:
     # Class-level registry for URI scheme providers
     _uri_providers = {}
@@ -53,10 +160,10 @@ class URIResolver:
         # Long-term, built-in handlers may migrate to the registry once the registry
         # is proven stable and a clear trust model is established.
 
-        if uri.startswith('s3://'):
-            # S3 handler (predates the registry)
-            contents = self.get_s3_uri(uri)
-        elif scheme in ('http', 'https', 'file'):
+        if uri.startswith('s3://') or scheme in ('http', 'https'):
+            # S3 handler (predates the registry) and remote urls
+            contents = self.get_document(uri, headers)
+        elif scheme == 'file':
             # Standard URL schemes handled by urllib
             headers.update({"Accept-Encoding": "gzip"})
             req = Request(uri, headers=headers)
@@ -77,6 +184,44 @@ class URIResolver:
         self.cache.save(("uri-resolver", uri), contents)
         return contents
 
+    def get_document(self, uri, headers):
+        """Fetch a document through the process wide document cache."""
+        documents = get_document_cache()
+        key = documents.get_key(uri, headers)
+        entry = documents.get_document(key)
+        if entry is not None and documents.is_fresh(entry):
+            return entry['contents']
+
+        validators = entry and entry['validators'] or {}
+        if uri.startswith('s3://'):
+            result = self.get_s3_document(uri, validators)
+        else:
+            result = self.get_url_document(uri, headers, validators)
+
+        if result is None:
+            log.debug("value document not modified %s", uri)
+            return documents.revalidated(key, entry)['contents']
+        return documents.save_document(key, *result)['contents']
+
+    def get_url_document(self, uri, headers, validators):
+        """Fetch a url, returning None if not modified from the validators."""
+        headers = dict(headers, **{"Accept-Encoding": "gzip"})
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        req = Request(uri, headers=headers)
+        try:
+            with closing(urlopen(req)) as response:  # nosec nosemgrep
+                contents = self.handle_response_encoding(response)
+                info = response.info()
+        except HTTPError as e:
+            if validators and e.code == 304:
+                return None
+            raise
+        return contents, {
+            'etag': info.get('ETag'), 'last_modified': info.get('Last-Modified')}
+
     def handle_response_encoding(self, response):
         if response.info().get('Content-Encoding') != 'gzip':
             return response.read().decode('utf-8')
@@ -86,6 +231,10 @@ class URIResolver:
         return data
 
     def get_s3_uri(self, uri):
+        return self.get_s3_document(uri, {})[0]
+
+    def get_s3_document(self, uri, validators):
+        """Fetch an s3 object, returning None if its etag matches the validators."""
         parsed = urlparse(uri)
         client = local_session(self.session_factory).client('s3')
         params = dict(
@@ -95,14 +244,23 @@ class URIResolver:
             params.update(dict(parse_qsl(parsed.query)))
         region = params.pop('region', None)
         client = self.session_factory().client('s3', region_name=region)
-        result = client.get_object(**params)
+        if validators.get('etag'):
+            params['IfNoneMatch'] = validators['etag']
+        try:
+            result = client.get_object(**params)
+        except ClientError as e:
+            if validators and e.response['Error']['Code'] in ('304', 'NotModified'):
+                return None
+            raise
         body = result['Body'].read()
+        validators = {'etag': result.get('ETag')}
         if params['Key'].lower().endswith(('.gz', '.zip', '.gzip')):
-            return zlib.decompress(body, ZIP_OR_GZIP_HEADER_DETECT).decode('utf-8')
+            return zlib.decompress(
+                body, ZIP_OR_GZIP_HEADER_DETECT).decode('utf-8'), validators
         elif isinstance(body, str):
-            return body
+            return body, validators
         else:
-            return body.decode('utf-8')
+            return body.decode('utf-8'), validators
 
 
 class ValuesFrom:
@@ -258,6 +416,19 @@ class ValuesFrom:
     def _get_values(self):
         contents, format = self.get_contents()
 
+        # values are shared by every policy reading the same document
+        # content with the same format and expression.
+        documents = get_document_cache()
+        key = (
+            hashlib.sha256(contents.encode('utf8')).hexdigest(),
+            format, json.dumps(self.data.get('expr')))
+        values = documents.get_values(key)
+        if values is None:
+            values = self._parse_values(contents, format)
+            documents.save_values(key, values)
+        return values
+
+    def _parse_values(self, contents, format):
         if format == 'json':
             data = json.loads(contents)
             if 'expr' in self.data:
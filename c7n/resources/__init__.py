@@ -62,12 +62,16 @@ def load_available(resources=True):
 def load_providers(provider_types):
     global LOADED
 
-    # Even though we're lazy loading resources we still need to import
-    # those that are making available generic filters/actions
+    # Even though we're lazy loading resources we still need to make
+    # available generic filters/actions, their modules are imported
+    # on first use.
     if should_load_provider('aws', provider_types):
-        import c7n.resources.securityhub
-        import c7n.resources.sfn
-        import c7n.resources.ssm # NOQA
+        from c7n.policy import execution
+        from c7n.resources.aws import AWS, register_plugin_map
+        from c7n.resources.resource_map import PluginMap
+        AWS.resources.subscribe(register_plugin_map)
+        for name, class_path in PluginMap['execution'].items():
+            execution.register_lazy(name, class_path)
 
     if should_load_provider('awscc', provider_types):
         from c7n_awscc.entry import initialize_awscc
@@ -29,9 +29,10 @@ from c7n.credentials import SessionFactory
 from c7n.config import Bag
 from c7n.exceptions import InvalidOutputConfig, PolicyValidationError
 from c7n.log import CloudWatchLogHandler
+from c7n.ratelimit import get_rate_limits
 from c7n.utils import parse_url_config, backoff_delays
 
-from .resource_map import ResourceMap
+from .resource_map import PluginMap, ResourceMap
 
 # Import output registries aws provider extends.
 from c7n.output import (
@@ -665,6 +666,7 @@ class ApiStats(DeltaStats):
     def __init__(self, ctx, config=None):
         super(ApiStats, self).__init__(ctx, config)
         self.api_calls = Counter()
+        self.rate_limit_wait = 0
 
     def get_snapshot(self):
         return dict(self.api_calls)
@@ -675,8 +677,13 @@ class ApiStats(DeltaStats):
     def __enter__(self):
         if isinstance(self.ctx.session_factory, credentials.SessionFactory):
             self.ctx.session_factory.set_subscribers((self,))
+        self.rate_limit_wait = self._get_rate_limit_wait()
         self.push_snapshot()
 
+    def _get_rate_limit_wait(self):
+        rate_limits = getattr(self.ctx.session_factory, 'rate_limits', None)
+        return rate_limits is not None and rate_limits.wait_time() or 0
+
     def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
         if isinstance(self.ctx.session_factory, credentials.SessionFactory):
             self.ctx.session_factory.set_subscribers(())
@@ -688,6 +695,11 @@ class ApiStats(DeltaStats):
 
         self.ctx.metrics.put_metric(
             "ApiCalls", sum(self.api_calls.values()), "Count")
+        if getattr(self.ctx.session_factory, 'rate_limits', None) is not None:
+            # includes waits of policies running concurrently in the process
+            self.ctx.metrics.put_metric(
+                "ApiRateLimitWait",
+                round(self._get_rate_limit_wait() - self.rate_limit_wait, 2), "Seconds")
         self.pop_snapshot()
 
     def __call__(self, s):
@@ -734,6 +746,17 @@ class S3Output(BlobOutput):
                 'ServerSideEncryption': 'AES256'})
 
 
+def register_plugin_map(registry, resource_class):
+    """Resource registration subscriber adding lazily imported generic plugins."""
+    for name, class_path in PluginMap['actions'].items():
+        resource_class.action_registry.register_lazy(name, class_path)
+    for name, class_path in PluginMap['filters'].items():
+        # security hub findings are associated to resources by arn
+        if name == 'finding' and not resource_class.has_arn():
+            continue
+        resource_class.filter_registry.register_lazy(name, class_path)
+
+
 @clouds.register('aws')
 class AWS(Provider):
 
@@ -756,12 +779,17 @@ class AWS(Provider):
         return options
 
     def get_session_factory(self, options):
-        return SessionFactory(
+        factory = SessionFactory(
             options.region,
             options.profile,
             options.assume_role,
             options.external_id,
             options.session_policy)
+        rate_limits = options.get('api_rate_limits') or os.environ.get('C7N_API_RATE_LIMITS')
+        if rate_limits:
+            factory.rate_limits = get_rate_limits(rate_limits)
+            factory.account_id = options.account_id
+        return factory
 
     def initialize_policies(self, policy_collection, options):
         """Return a set of policies targetted to the given regions.
@@ -35,11 +35,7 @@ from .securityhub import PostFinding
 ErrAccessDenied = "AccessDeniedException"
 
 
-class DescribeLambda(query.DescribeSource):
-
-    def augment(self, resources):
-        return universal_augment(
-            self.manager, super(DescribeLambda, self).augment(resources))
+class DescribeLambda(query.DescribeWithResourceTags):
 
     def get_resources(self, ids):
         client = local_session(self.manager.session_factory).client('lambda')
@@ -30,11 +30,12 @@ from c7n.query import (
     ChildResourceManager,
     ConfigSource,
     DescribeSource,
+    DescribeWithResourceTags,
     QueryResourceManager,
     TypeInfo,
 )
 from c7n.resolver import ValuesFrom
-from c7n.tags import TagActionFilter, TagDelayedAction, Tag, RemoveTag, universal_augment
+from c7n.tags import TagActionFilter, TagDelayedAction, Tag, RemoveTag
 from c7n.utils import (
     get_partition, get_retry, local_session, type_schema, chunks, filter_empty, QueryParser,
     select_keys
@@ -385,7 +386,7 @@ class UserSetBoundary(SetBoundary):
                 'UserName': resource['UserName']}
 
 
-class DescribePolicy(DescribeSource):
+class DescribePolicy(DescribeWithResourceTags):
 
     def resources(self, query=None):
         queries = PolicyQueryParser.parse(self.manager.data.get('query', []))
@@ -408,9 +409,6 @@ class DescribePolicy(DescribeSource):
                     continue
         return results
 
-    def augment(self, resources):
-        return universal_augment(self.manager, super().augment(resources))
-
 
 @resources.register('iam-policy')
 class Policy(QueryResourceManager):
@@ -679,6 +677,8 @@ class CheckPermissions(Filter):
     By default permission boundaries are checked.
     """
 
+    cost = 100
+
     schema = type_schema(
         'check-permissions', **{
             'match': {'oneOf': [
@@ -403,3 +403,21 @@ ResourceMap = {
   "aws.xray-group": "c7n.resources.xray.XRayGroup",
   "aws.xray-rule": "c7n.resources.xray.XRaySamplingRule"
 }
+
+# Filters, actions and execution modes the securityhub, sfn and ssm
+# modules provide for every aws resource, imported on first use.
+PluginMap = {
+  "actions": {
+    "invoke-sfn": "c7n.resources.sfn.InvokeStepFunction",
+    "post-finding": "c7n.resources.securityhub.OtherResourcePostFinding",
+    "post-item": "c7n.resources.ssm.PostItem"
+  },
+  "filters": {
+    "finding": "c7n.resources.securityhub.SecurityHubFindingFilter",
+    "ops-item": "c7n.resources.ssm.OpsItemFilter"
+  },
+  "execution": {
+    "hub-action": "c7n.resources.securityhub.SecurityHubAction",
+    "hub-finding": "c7n.resources.securityhub.SecurityHub"
+  }
+}
@@ -451,6 +451,14 @@ class S3(query.QueryResourceManager):
         super().validate()
         BucketAssembly(self).validate()
 
+    def get_snapshot_key(self, query):
+        key = super().get_snapshot_key(query)
+        # augmentation varies with the policy's augment-keys, only share
+        # buckets between policies needing the same subdocuments.
+        if self.source_type == 'describe':
+            key['augment'] = sorted(BucketAssembly(self).detect_augment_fields())
+        return key
+
     def get_arns(self, resources):
         return ["arn:aws:s3:::{}".format(r["Name"]) for r in resources]
 
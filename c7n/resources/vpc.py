@@ -11,7 +11,7 @@ import c7n.filters.vpc as net_filters
 from c7n.filters.iamaccess import CrossAccountAccessFilter
 from c7n.filters.related import RelatedResourceFilter, RelatedResourceByIdFilter
 from c7n.filters.revisions import Diff
-from c7n import query, resolver
+from c7n import cache, query, resolver
 from c7n.manager import resources
 from c7n.resources.securityhub import OtherResourcePostFinding, PostFinding
 from c7n.utils import (
@@ -1083,6 +1083,12 @@ class SGUsage(Filter):
 
     nics = ()
 
+    # scans whose results are shared by the policies of a run, eni
+    # resources are already shared through the resource snapshot and
+    # also needed for eni annotations.
+    shared_scans = (
+        "sg-perm-refs", "lambdas", "launch-configs", "ecs-cwe", "codebuild", "batch")
+
     def get_permissions(self):
         return list(itertools.chain(
             *[self.manager.get_resource_manager(m).get_permissions()
@@ -1095,12 +1101,15 @@ class SGUsage(Filter):
             return resources
         # Check that groups are not referenced across accounts
         client = local_session(self.manager.session_factory).client('ec2')
+
+        def get_peered_ids(resource_set):
+            return [sg_ref['GroupId'] for sg_ref in client.describe_security_group_references(
+                GroupId=[r['GroupId'] for r in resource_set])['SecurityGroupReferenceSet']]
+
         peered_ids = set()
-        for resource_set in chunks(resources, 200):
-            for sg_ref in client.describe_security_group_references(
-                    GroupId=[r['GroupId'] for r in resource_set]
-            )['SecurityGroupReferenceSet']:
-                peered_ids.add(sg_ref['GroupId'])
+        with self.executor_factory(max_workers=3) as w:
+            for group_ids in w.map(get_peered_ids, chunks(resources, 200)):
+                peered_ids.update(group_ids)
         self.log.debug(
             "%d of %d groups w/ peered refs", len(peered_ids), len(resources))
         return [r for r in resources if r['GroupId'] not in peered_ids]
@@ -1117,9 +1126,12 @@ class SGUsage(Filter):
         )
 
     def scan_groups(self):
+        scanners = self.get_scanners()
+        with self.executor_factory(max_workers=len(scanners)) as w:
+            results = list(w.map(self.run_scanner, scanners))
+
         used = set()
-        for kind, scanner in self.get_scanners():
-            sg_ids = scanner()
+        for (kind, _), sg_ids in zip(scanners, results):
             new_refs = sg_ids.difference(used)
             used = used.union(sg_ids)
             self.log.debug(
@@ -1128,6 +1140,21 @@ class SGUsage(Filter):
 
         return used
 
+    def run_scanner(self, scanner):
+        kind, scan = scanner
+        snapshot = cache.get_snapshot()
+        if snapshot is None or kind not in self.shared_scans:
+            return scan()
+        key = {
+            'sg-usage': kind,
+            'account': self.manager.account_id,
+            'region': self.manager.config.region}
+        sg_ids = snapshot.get(key)
+        if sg_ids is None:
+            sg_ids = scan()
+            snapshot.save(key, sg_ids)
+        return sg_ids
+
     def get_launch_config_sgs(self):
         # Note assuming we also have launch config garbage collection
         # enabled.
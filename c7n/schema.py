@@ -15,17 +15,24 @@ All filters and actions are annotated with schema typically using
 the utils.type_schema function.
 """
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import itertools
 import json
 import inspect
 import logging
+import os
+import sys
 
 from jsonschema import Draft7Validator as JsonSchemaValidator
 from jsonschema.exceptions import best_match
 
+from c7n.exceptions import PolicyValidationError
 from c7n.policy import execution
-from c7n.provider import clouds
+from c7n.provider import clouds, get_resource_class
 from c7n.query import sources
-from c7n.resources import load_available
+from c7n.resources import load_available, load_resources
+from c7n.version import version
 from c7n.resolver import ValuesFrom
 from c7n.filters.core import (
     ValueFilter,
@@ -58,7 +65,10 @@ def validate(data, schema=None, resource_types=()):
         schema = generate(resource_types)
         JsonSchemaValidator.check_schema(schema)
 
-    validator = JsonSchemaValidator(schema)
+    return _validate(JsonSchemaValidator(schema), data)
+
+
+def _validate(validator, data):
     errors = []
     for error in validator.iter_errors(data):
         try:
@@ -416,6 +426,184 @@ def generate(resource_types=()):
     return schema
 
 
+class PolicyValidator:
+    """Incremental schema validation of policy files.
+
+    Policies are validated individually, each against a schema for just
+    its resource types, generated on first use and compiled once. With a
+    cache directory, the schemas are also cached on disk and the content
+    hashes of valid policies are recorded, so later runs skip policies
+    that haven't changed. Cache entries are keyed by custodian version,
+    installed providers and the resource types' registered plugins.
+
+    Resource types must be loaded before validating.
+    """
+
+    valid_file = 'valid-policies.json'
+
+    def __init__(self, cache_dir=None, workers=1):
+        self.cache_dir = cache_dir and os.path.abspath(os.path.expanduser(cache_dir))
+        self.workers = workers
+        self.validators = {}
+        self.cache_keys = {}
+        self.valid = None
+        self.skipped = 0
+
+    def get_resource_types(self, policy):
+        return tuple(sorted(StructureParser().get_resource_types({'policies': [policy]})))
+
+    def get_cache_key(self, resource_types):
+        """Key of a resource types schema, or None if a type isn't loaded."""
+        if resource_types in self.cache_keys:
+            return self.cache_keys[resource_types]
+        plugins = []
+        modules = set()
+        for rtype in resource_types:
+            try:
+                resource_class = get_resource_class(rtype)
+            except (KeyError, AssertionError):
+                return None
+            plugins.append([
+                rtype,
+                sorted(resource_class.filter_registry.keys()),
+                sorted(resource_class.action_registry.keys())])
+            modules.add(resource_class.__module__)
+            modules.update(
+                c.__module__ for c in resource_class.filter_registry.values())
+            modules.update(
+                c.__module__ for c in resource_class.action_registry.values())
+        # module modification times catch schema changes in development
+        mtimes = []
+        for m in sorted(modules):
+            path = getattr(sys.modules.get(m), '__file__', None)
+            mtimes.append(path and os.path.exists(path) and os.stat(path).st_mtime or 0)
+        key = hashlib.sha256(json.dumps([
+            version, sorted(clouds.keys()), sorted(execution.keys()), plugins, mtimes]
+        ).encode('utf8')).hexdigest()
+        self.cache_keys[resource_types] = key
+        return key
+
+    def get_validator(self, resource_types, cache_key):
+        validator = self.validators.get(cache_key)
+        if validator is not None:
+            return validator
+        schema = self.load_schema(cache_key)
+        if schema is None:
+            schema = generate(resource_types)
+            JsonSchemaValidator.check_schema(schema)
+            self.save_schema(cache_key, schema)
+        validator = self.validators[cache_key] = JsonSchemaValidator(schema)
+        return validator
+
+    def load_schema(self, cache_key):
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, "%s.json" % cache_key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as fh:
+                return json.load(fh)
+        except ValueError:
+            return None
+
+    def save_schema(self, cache_key, schema):
+        if self.cache_dir:
+            self._write(os.path.join(self.cache_dir, "%s.json" % cache_key), schema)
+
+    def _write(self, path, data):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = "%s.%d" % (path, os.getpid())
+        with open(tmp, 'w') as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+
+    def get_valid(self):
+        if self.valid is not None:
+            return self.valid
+        self.valid = set()
+        path = self.cache_dir and os.path.join(self.cache_dir, self.valid_file)
+        if path and os.path.exists(path):
+            try:
+                with open(path) as fh:
+                    self.valid = set(json.load(fh))
+            except ValueError:
+                pass
+        return self.valid
+
+    @staticmethod
+    def get_policy_hash(policy, cache_key):
+        return hashlib.sha256(
+            (cache_key + json.dumps(policy, sort_keys=True, default=str)).encode('utf8')
+        ).hexdigest()
+
+    def validate_policy(self, policy, resource_types, cache_key):
+        if cache_key is None:
+            return [ValueError(
+                "Error on policy:{} invalid resource:{}".format(
+                    policy.get('name', 'unknown'), ", ".join(resource_types))),
+                policy.get('name', 'unknown')]
+        errors = _validate(
+            self.get_validator(resource_types, cache_key), {'policies': [policy]})
+        # errors are scoped to the single policy validated, which names it even
+        # when the specific error is nested within one of its filters or actions
+        if len(errors) == 2 and isinstance(errors[1], str):
+            errors[1] = policy.get('name', 'unknown')
+        return errors
+
+    def validate(self, data):
+        """Validate a policy file, with results as per :func:`validate`."""
+        valid = self.get_valid()
+        pending = []
+        for p in data.get('policies', ()):
+            resource_types = self.get_resource_types(p)
+            cache_key = self.get_cache_key(resource_types)
+            policy_hash = cache_key and self.get_policy_hash(p, cache_key)
+            if policy_hash and policy_hash in valid:
+                self.skipped += 1
+                continue
+            pending.append((p, resource_types, cache_key, policy_hash))
+
+        if self.workers > 1 and len(pending) > self.workers:
+            results = self.validate_parallel(pending)
+        else:
+            results = [self.validate_policy(p, rtypes, key) for p, rtypes, key, _ in pending]
+
+        first_error = None
+        for (_, _, _, policy_hash), errors in zip(pending, results):
+            if errors:
+                first_error = first_error or errors
+            else:
+                valid.add(policy_hash)
+        if self.cache_dir and pending:
+            self._write(os.path.join(self.cache_dir, self.valid_file), sorted(valid))
+        return first_error or check_unique(data) or []
+
+    def validate_parallel(self, pending):
+        chunks = [pending[i::self.workers] for i in range(self.workers)]
+        with ProcessPoolExecutor(max_workers=self.workers) as w:
+            chunk_results = list(w.map(
+                _validate_chunk,
+                [self.cache_dir] * len(chunks),
+                [[(p, rtypes, key) for p, rtypes, key, _ in c] for c in chunks]))
+        # restore policy order from the interleaved chunks
+        results = [None] * len(pending)
+        for offset, chunk in enumerate(chunk_results):
+            results[offset::self.workers] = chunk
+        return results
+
+
+def _validate_chunk(cache_dir, policies):
+    load_resources(set(itertools.chain(*[rtypes for _, rtypes, _ in policies])))
+    validator = PolicyValidator(cache_dir)
+    results = []
+    for p, rtypes, key in policies:
+        errors = validator.validate_policy(p, rtypes, key)
+        # schema errors reference unpicklable validator state
+        results.append(errors and [PolicyValidationError(str(errors[0])), errors[1]] or [])
+    return results
+
+
 def process_resource(
         type_name, resource_type, resource_defs, aliases=None,
         definitions=None, provider_name=None):
@@ -20,8 +20,9 @@ from c7n.vendored.distutils.util import strtobool
 
 from c7n import deprecated, policy
 from c7n.exceptions import DeprecationError
-from c7n.loader import PolicyLoader
+from c7n.loader import PolicyLoader, get_schema_validator
 from c7n.ctx import ExecutionContext
+from c7n.resolver import reset_document_cache
 from c7n.utils import reset_session_cache, jmespath_search
 from c7n.config import Bag, Config
 
@@ -250,6 +251,9 @@ class TestUtils(unittest.TestCase, CustodianTestCore):
     def cleanUp(self):
         # Clear out thread local session cache
         reset_session_cache()
+        reset_document_cache()
+        # schemas reflect plugins registered by the test
+        get_schema_validator.cache_clear()
 
 
 class TextTestIO(io.StringIO):
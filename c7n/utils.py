@@ -469,6 +469,65 @@ def get_retry(retry_codes=(), max_attempts=8, min_delay=1, log_retries=False):
     return _retry
 
 
+THROTTLE_CODES = (
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'Throttled',
+    'RequestLimitExceeded',
+    'Client.RequestLimitExceeded',
+    'TooManyRequestsException',
+    'RequestThrottled',
+    'SlowDown',
+)
+
+
+class TokenBucket:
+    """Thread safe token bucket limiting the rate of api calls.
+
+    The fill rate adapts to throttling, halving on each throttled
+    call and recovering additively on successful calls, up to the
+    configured rate.
+
+    :param rate: The maximum calls per second.
+    :param burst: The bucket capacity, defaults to the rate.
+    :param min_rate: The floor the rate is reduced to on throttling.
+    """
+
+    def __init__(self, rate, burst=None, min_rate=0.5):
+        self.max_rate = self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.min_rate = min(min_rate, self.max_rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is permitted, returning the seconds waited."""
+        waited = 0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                # a clock that went backwards, ie. a mocked one, refills nothing
+                elapsed = max(0, now - self.updated)
+                self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def throttled(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def succeeded(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
 def backoff_delays(start, stop, factor=2.0, jitter=False):
     """Geometric backoff sequence w/ jitter
     """
@@ -10,7 +10,8 @@ from vcr import stubs
 
 try:
     from .zpill import PillTest, ACCOUNT_ID, ORG_ID
-    from c7n.testing import PyTestUtils, reset_session_cache
+    from c7n.testing import (
+        PyTestUtils, reset_session_cache, reset_document_cache, get_schema_validator)
     from pytest_terraform.tf import LazyPluginCacheDir, LazyReplay
 except ImportError: # noqa
     # docker tests run with minimial deps
@@ -71,4 +72,6 @@ def pytest_configure(config):
 def test(request):
     test_utils = CustodianAWSTesting(request)
     test_utils.addCleanup(reset_session_cache)
+    test_utils.addCleanup(reset_document_cache)
+    test_utils.addCleanup(get_schema_validator.cache_clear)
     return test_utils
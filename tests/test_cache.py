@@ -99,3 +99,128 @@ def test_sqlkv_convert(tmp_path):
     kv.close()
     with open(cache_path, 'rb') as fh:
         assert fh.read(15) == b"SQLite format 3"
+
+
+def test_snapshot_copies():
+    snapshot = cache.ResourceSnapshot()
+    k1 = {"account": "12345678901234", "region": "us-west-2", "resource": "ec2"}
+    v1 = [{'id': 'a', 'Tags': []}, {'id': 'b', 'Tags': []}]
+
+    assert snapshot.get(k1) is None
+    snapshot.save(k1, v1)
+    v1[0]['Tags'].append({'Key': 'Owner', 'Value': 'x'})
+
+    resources = snapshot.get(k1)
+    assert resources == [{'id': 'a', 'Tags': []}, {'id': 'b', 'Tags': []}]
+    resources[1]['c7n:MatchedFilters'] = ['id']
+    assert snapshot.get(k1)[1] == {'id': 'b', 'Tags': []}
+    assert snapshot.select(k1, 'id', ['b']) == [{'id': 'b', 'Tags': []}]
+    assert (snapshot.hits, snapshot.misses) == (3, 1)
+
+
+def test_snapshot_graph():
+    snapshot = cache.ResourceSnapshot()
+    k1 = {"account": "12345678901234", "region": "us-west-2", "resource": "ec2"}
+    assert snapshot.get_index(k1, 'id') is None
+
+    snapshot.save(k1, [{'id': 'a', 'vpc': 'v1'}, {'id': 'b', 'vpc': 'v1'}])
+    index = snapshot.get_index(k1, 'id')
+    assert index == {'a': {'id': 'a', 'vpc': 'v1'}, 'b': {'id': 'b', 'vpc': 'v1'}}
+    assert snapshot.get_index(k1, 'id') is index
+
+    calls = []
+
+    def reverse(resources):
+        calls.append(1)
+        return {'v1': [r['id'] for r in resources]}
+
+    assert snapshot.derive(k1, 'reverse', reverse) == {'v1': ['a', 'b']}
+    assert snapshot.derive(k1, 'reverse', reverse) == {'v1': ['a', 'b']}
+    assert len(calls) == 1
+
+    edges = snapshot.get_edges(k1, 'vpc')
+    edges['a'] = frozenset(['v1'])
+    assert snapshot.get_edges(k1, 'vpc') == {'a': frozenset(['v1'])}
+    assert snapshot.get_edges(k1, 'subnet') == {}
+
+    # saving an entry discards values derived from its prior resources
+    snapshot.save(k1, [{'id': 'c', 'vpc': 'v2'}])
+    assert snapshot.get_index(k1, 'id') == {'c': {'id': 'c', 'vpc': 'v2'}}
+
+
+def test_snapshot_context():
+    assert cache.get_snapshot() is None
+    with cache.snapshot() as snapshot:
+        assert cache.get_snapshot() is snapshot
+        snapshot.save({'a': 'b'}, [])
+        assert snapshot.size() == 1
+    assert cache.get_snapshot() is None
+
+
+def test_records_factory(tmp_path):
+    kv = cache.factory(
+        config.Bag(cache="records:%s" % (tmp_path / "cache.db"), cache_period=60))
+    assert isinstance(kv, cache.SqlRecordCache)
+    assert kv.cache_path == str(tmp_path / "cache.db")
+
+
+def test_records_get_select(tmp_path):
+    kv = cache.SqlRecordCache(
+        config.Bag(cache="records:%s" % (tmp_path / "cache.db"), cache_period=60))
+    kv.load()
+    k1 = {"account": "12345678901234", "region": "us-west-2", "resource": "ec2"}
+    v1 = [{'id': 'a', 'CreateTime': datetime(2024, 1, 1)}, {'id': 'b'}, {'id': 'c'}]
+
+    assert kv.get(k1) is None
+    assert kv.select(k1, 'id', ['a']) is None
+    kv.save(k1, v1)
+    assert kv.get(dict(reversed(k1.items()))) == v1
+    assert kv.select(k1, 'id', ['c', 'a', 'z']) == [v1[0], v1[2]]
+    assert kv.select(k1, 'id', []) == []
+
+    kv.save({'a': 'b'}, {'hello': 'world'})
+    assert kv.get({'a': 'b'}) == {'hello': 'world'}
+    assert kv.size() > 0
+    kv.close()
+
+    kv.load()
+    assert kv.conn.execute('pragma journal_mode').fetchone()[0] == 'wal'
+    assert kv.select(k1, 'id', ['b']) == [{'id': 'b'}]
+    kv.close()
+
+
+def test_records_expired(tmp_path):
+    kv = cache.SqlRecordCache(
+        config.Bag(cache="records:%s" % (tmp_path / "cache.db"), cache_period=60))
+    kv.load()
+    kv.save({'a': 'b'}, [1], datetime.utcnow() - timedelta(days=10))
+    kv.save({'b': 'c'}, [2])
+    assert kv.get({'a': 'b'}) is None
+    kv.close()
+
+    kv.load()
+    assert kv.conn.execute('select count(*) from c7n_entry').fetchone()[0] == 1
+    assert kv.get({'b': 'c'}) == [2]
+
+
+def test_records_max_size(tmp_path):
+    path = "records:%s" % (tmp_path / "cache.db")
+    kv = cache.SqlRecordCache(config.Bag(cache=path, cache_period=60, cache_max_size=64))
+    assert kv.max_size == 64 * 1024 * 1024
+    kv = cache.SqlRecordCache(config.Bag(cache=path, cache_period=60, cache_max_size=None))
+    assert kv.max_size == cache.SqlRecordCache.max_size
+
+
+def test_records_lru_eviction(tmp_path):
+    kv = cache.SqlRecordCache(
+        config.Bag(cache="records:%s" % (tmp_path / "cache.db"), cache_period=60))
+    kv.load()
+    kv.save({'k': 1}, [os.urandom(1024)])
+    kv.save({'k': 2}, [os.urandom(1024)])
+    # touch the first entry so the second is least recently used
+    assert kv.get({'k': 1})
+    kv.max_size = 2500
+    kv.save({'k': 3}, [os.urandom(1024)])
+    assert kv.get({'k': 2}) is None
+    assert kv.get({'k': 1}) is not None
+    assert kv.get({'k': 3}) is not None
@@ -591,6 +591,72 @@ class RunTest(CliTest):
             ["custodian", "run", "-s", temp_dir, "--debug", yaml_file], CustomError
         )
 
+    def test_parallel(self):
+        from c7n.executor import MainThreadExecutor
+        from c7n.policy import Policy
+
+        executed = []
+
+        def policy_call(p):
+            executed.append((p.name, p.options.output_dir))
+            if p.name == "error":
+                raise Exception("foobar")
+
+        self.patch(Policy, "__call__", policy_call)
+        self.patch(commands, "policy_executor", MainThreadExecutor)
+
+        temp_dir = self.get_temp_dir()
+        yaml_file = self.write_policy_file(
+            {
+                "policies": [
+                    {"name": "ec2-a", "resource": "ec2"},
+                    {"name": "s3", "resource": "s3"},
+                    {"name": "error", "resource": "ec2"},
+                    {"name": "ec2-b", "resource": "ec2"},
+                ]
+            }
+        )
+        self.run_and_expect_failure(
+            ["custodian", "run", "--parallel", "2", "-s", temp_dir, yaml_file], 2
+        )
+        # policies sharing a resource type execute together in policy order
+        self.assertEqual(
+            [name for name, _ in executed], ["ec2-a", "error", "ec2-b", "s3"])
+
+    def test_run_policy_group_spawned(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from c7n.config import Config
+
+        # a fresh interpreter has no resources loaded
+        options = Config.empty(
+            region="us-east-1", output_dir=self.get_temp_dir(), debug=False)
+        group = [
+            ({"name": name, "resource": "ec2",
+              "conditions": [{"type": "value", "key": "region", "value": "nowhere"}]},
+             options)
+            for name in ("ec2-a", "ec2-b")]
+        with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")) as w:
+            self.assertEqual(w.submit(commands._run_policy_group, options, group).result(), [])
+
+    def test_group_policies(self):
+        policies = self.load_policy_set(
+            {
+                "policies": [
+                    {"name": "ec2-a", "resource": "ec2"},
+                    {"name": "asg", "resource": "asg"},
+                    {"name": "ec2-b", "resource": "ec2"},
+                ]
+            }
+        )
+        groups = commands._group_policies(policies)
+        self.assertEqual(
+            [[p.name for p in g] for g in groups], [["ec2-a", "ec2-b"], ["asg"]])
+        self.assertEqual(
+            [commands._get_policy_service(g[0]) for g in groups],
+            ["aws.ec2", "aws.autoscaling"])
+
     def test_session_policy(self):
         parser = argparse.ArgumentParser()
         parser.add_argument('--session-policy', action=LoadSessionPolicyJson)
@@ -13,7 +13,8 @@ from c7n.testing import mock_datetime_now
 from c7n.exceptions import PolicyValidationError, ClientError
 from c7n.resources import ec2
 from c7n.resources.ec2 import actions, EC2QueryParser
-from c7n import tags, utils
+from c7n import cache, tags, utils
+from c7n.filters.related import get_graph_key
 
 from .common import BaseTest
 
@@ -2099,6 +2100,62 @@ class TestModifySecurityGroupAction(BaseTest):
         self.assertEqual(len(resources), 1)
         self.assertEqual(resources[0]["InstanceId"], "i-0dd3919bc5bac1ea8")
 
+    def test_security_group_graph_edges(self):
+        session_factory = self.replay_flight_data("test_ec2_security_group_filter")
+        policy = self.load_policy(
+            {
+                "name": "sg-graph",
+                "resource": "ec2",
+                "filters": [
+                    {
+                        "type": "security-group",
+                        "key": "GroupName",
+                        "value": "(.*PROD-ONLY.*)",
+                        "op": "regex",
+                    },
+                ],
+            },
+            session_factory=session_factory,
+        )
+        sg_filter = policy.resource_manager.filters[0]
+        with cache.snapshot([policy]) as snapshot:
+            resources = policy.run()
+            edges = snapshot.get_edges(
+                get_graph_key(policy.resource_manager), sg_filter.RelatedIdsExpression)
+            self.assertTrue(resources)
+            for r in resources:
+                self.assertEqual(
+                    edges[r["InstanceId"]],
+                    {g["GroupId"] for g in r["SecurityGroups"]})
+                self.assertEqual(
+                    sg_filter.get_related_ids([r]), set(edges[r["InstanceId"]]))
+
+    def test_security_group_graph_fetch_missing(self):
+        policy = self.load_policy(
+            {
+                "name": "sg-graph-missing",
+                "resource": "ec2",
+                "filters": [{"type": "security-group", "key": "GroupName", "value": "web"}],
+            },
+        )
+        sg_filter = policy.resource_manager.filters[0]
+        manager = sg_filter.get_resource_manager()
+        fetched = []
+
+        def get_resources(ids):
+            fetched.append(sorted(ids))
+            return [{"GroupId": gid, "GroupName": "shared"} for gid in ids]
+
+        self.patch(sg_filter, "get_related_index", lambda m, ids: {
+            "sg-1": {"GroupId": "sg-1", "GroupName": "web"}})
+        self.patch(manager, "get_resources", get_resources)
+        related = sg_filter.get_related([
+            {"InstanceId": "i-1", "NetworkInterfaces": [
+                {"Groups": [{"GroupId": "sg-1"}, {"GroupId": "sg-2"}]}]}])
+        # groups missing from the index, ie. shared from another account, are fetched
+        self.assertEqual(fetched, [["sg-2"]])
+        self.assertEqual(set(related), {"sg-1", "sg-2"})
+
     def test_security_group_modify_groups_action(self):
         # Test conditions:
         #   - running two instances; one with TestProductionInstanceProfile
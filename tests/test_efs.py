@@ -2,11 +2,13 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from c7n.exceptions import PolicyValidationError
+from c7n.executor import MainThreadExecutor
 
 from .common import BaseTest, functional, event_data
 from botocore.exceptions import ClientError
 
 import uuid
+from unittest import mock
 import time
 
 from operator import itemgetter
@@ -53,6 +55,19 @@ class ElasticFileSystem(BaseTest):
         resources = p.run()
         self.assertEqual(len(resources), 2)
 
+    def test_mount_target_child_workers(self):
+        factory = self.replay_flight_data("test_efs_subresource")
+        p = self.load_policy(
+            {"name": "test-mount-targets", "resource": "efs-mount-target"},
+            config={"child_workers": 1},
+            session_factory=factory,
+        )
+        with mock.patch.object(
+                p.resource_manager, "executor_factory", wraps=MainThreadExecutor) as executor:
+            resources = p.run()
+        self.assertEqual(len(resources), 2)
+        executor.assert_called_with(max_workers=1)
+
     def test_mount_target_security_group(self):
         factory = self.replay_flight_data("test_efs_mount_secgroup")
         p = self.load_policy(
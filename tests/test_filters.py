@@ -1259,6 +1259,78 @@ class TestMetricsFilter(BaseTest):
                 for res in resources)
         )
 
+    def test_metrics_batch(self):
+        self.patch(ELB, "executor_factory", MainThreadExecutor)
+        session_factory = self.replay_flight_data("test_metrics_batch")
+
+        p = self.load_policy(
+            {
+                "name": "elb-metrics-batch",
+                "resource": "elb",
+                "filters": [
+                    {
+                        "type": "metrics",
+                        "value": 0,
+                        "name": "RequestCount",
+                        "op": "eq",
+                        "statistics": "Sum",
+                        "missing-value": 0.0,
+                        "batch": True,
+                    }
+                ],
+            },
+            config={"account_id": "644160558196"},
+            session_factory=session_factory,
+        )
+        self.assertEqual(
+            p.resource_manager.filters[0].get_permissions(),
+            ("cloudwatch:GetMetricData",))
+        resources = p.run()
+        self.assertEqual(
+            [r["LoadBalancerName"] for r in resources],
+            ["test-elb-zero-metrics", "test-elb-missing-metrics"])
+        self.assertEqual(
+            resources[0]["c7n.metrics"]["AWS/ELB.RequestCount.Sum.14"][0]["Sum"], 0.0)
+        self.assertEqual(
+            resources[1]["c7n.metrics"]["AWS/ELB.RequestCount.Sum.14"][0]["c7n:detail"],
+            "Fill value for missing data")
+
+    def test_metrics_batch_size(self):
+        p = self.load_policy(
+            {
+                "name": "ec2-metrics-batch",
+                "resource": "ec2",
+                "filters": [
+                    {
+                        "type": "metrics",
+                        "name": "CPUUtilization",
+                        "value": 30,
+                        "days": 14,
+                        "period": 60,
+                        "statistics": "p99",
+                        "batch": True,
+                    }
+                ],
+            },
+        )
+        f = p.resource_manager.filters[0]
+        f.start, f.end = f.get_metric_window()
+        f.period = 60
+        self.assertTrue(f.is_batch())
+        # 14 days of minute periods is 20160 points per query
+        self.assertEqual(f.get_batch_size(), 2)
+        f.period = 86400
+        self.assertEqual(f.get_batch_size(), 500)
+
+        class CustomMetrics(f.__class__):
+            def get_metric_data(self, client, params):
+                return []
+
+        self.assertEqual(f.get_permissions(), ('cloudwatch:GetMetricData',))
+        custom = CustomMetrics(f.data, f.manager)
+        self.assertFalse(custom.is_batch())
+        self.assertEqual(custom.get_permissions(), ('cloudwatch:GetMetricStatistics',))
+
     def test_metric_period_rounding(self):
         """Round metrics start and end times to align with CloudWatch retention periods"""
 
@@ -1972,5 +2044,157 @@ class AnnotationSweeperTest(unittest.TestCase):
         self.assertEqual(resources, swept)
 
 
+class CompiledValueFilterTest(unittest.TestCase):
+
+    specs = [
+        {"State.Name": "running"},
+        {"tag:Name": "present"},
+        {"tag:Name": "absent"},
+        {"tag:Env": "empty"},
+        {"tag:Env": "not-null"},
+        {"type": "value", "key": "tag:Env", "value": ["prod", "dev"], "op": "in"},
+        {"type": "value", "key": "tag:Missing", "value": ["prod"], "op": "not-in"},
+        {"type": "value", "key": "tag:env", "value": "prod",
+         "tag_key_transforms": ["lower"]},
+        {"type": "value", "key": "tag:Env", "value": "PROD ", "value_type": "normalize"},
+        {"type": "value", "key": "tag:Count", "value": 2, "op": "gte",
+         "value_type": "integer"},
+        {"type": "value", "key": "tag:Count", "value": 1.5, "op": "lt",
+         "value_type": "float"},
+        {"type": "value", "key": "SecurityGroups[].GroupId", "value": 2,
+         "value_type": "size"},
+        {"type": "value", "key": "SecurityGroups[].GroupId", "value": 1,
+         "value_type": "unique_size", "op": "gt"},
+        {"type": "value", "key": "LaunchTime", "value": 30, "op": "gt",
+         "value_type": "age"},
+        {"type": "value", "key": "LaunchTime", "value": 30, "op": "lt",
+         "value_type": "expiration"},
+        {"type": "value", "key": "LaunchTime", "value": "2020-01-01", "op": "gt",
+         "value_type": "date"},
+        {"type": "value", "key": "PrivateIpAddress", "value": "10.0.0.0/16",
+         "op": "in", "value_type": "cidr"},
+        {"type": "value", "key": "Cidr", "value": 24, "op": "lt",
+         "value_type": "cidr_size"},
+        {"type": "value", "key": "Version", "value": "1.10", "op": "gte",
+         "value_type": "version"},
+        {"type": "value", "key": "tag:Env", "value": "prod", "value_type": "swap",
+         "op": "eq"},
+        {"type": "value", "key": "tag:Owner", "value": "^team-(a|b)$", "op": "regex"},
+        {"type": "value", "key": "tag:Owner", "value": "team-*", "op": "glob"},
+        {"type": "value", "key": "tag:Owner", "value_regex": "team-(.*)",
+         "value": "a"},
+        {"type": "value", "key": "SecurityGroups[].GroupId", "value": ["sg-1"],
+         "op": "intersect"},
+        {"type": "value", "key": "SecurityGroups[].GroupId", "value": "sg-2",
+         "op": "contains"},
+        {"type": "value", "key": "InstanceType", "value": "t2.micro", "op": "ne"},
+    ]
+
+    def get_resources(self, count=200):
+        rand = random.Random(42)
+        resources = []
+        for idx in range(count):
+            tags = [{"Key": "Name", "Value": "node-%d" % idx}]
+            if idx % 3:
+                tags.append({"Key": "Env", "Value": rand.choice(
+                    ["prod", " Prod", "dev", "", "qa"])})
+            if idx % 4:
+                tags.append({"Key": "Count", "Value": rand.choice(["1", "2", "x", " 3"])})
+            if idx % 5:
+                tags.append({"Key": "Owner", "Value": rand.choice(
+                    ["team-a", "team-b", "team-c", "other"])})
+            resources.append(instance(
+                InstanceId="i-%d" % idx,
+                Tags=tags if idx % 7 else [],
+                State={"Name": rand.choice(["running", "stopped"])},
+                LaunchTime=datetime.now(tz.tzutc()) - timedelta(days=rand.randint(0, 90)),
+                PrivateIpAddress=rand.choice(["10.0.1.2", "172.16.0.1", None]),
+                Cidr=rand.choice(["10.0.0.0/16", "10.0.1.0/24", "10.0.0.0/28", "x"]),
+                Version=rand.choice(["1.9", "1.10", "1.11.2", "2.0"]),
+                SecurityGroups=[{"GroupId": g} for g in rand.sample(
+                    ["sg-1", "sg-2", "sg-2", "sg-3"], rand.randint(0, 3))],
+            ))
+        return resources
+
+    def test_compiled_equivalence(self):
+        resources = self.get_resources()
+        for spec in self.specs:
+            f = filters.factory(spec)
+            self.assertIsNotNone(f.get_matcher(), spec)
+            compiled = f.process(copy.deepcopy(resources))
+            generic_filter = filters.factory(spec)
+            generic = [r for r in copy.deepcopy(resources) if generic_filter(r)]
+            self.assertEqual(compiled, generic, spec)
+
+    def test_compiled_fallback(self):
+        self.assertIsNone(filters.factory(
+            {"type": "value", "key": "Size", "value_type": "expr",
+             "value": "Other"}).get_matcher())
+        self.assertIsNone(filters.factory(
+            {"type": "value", "key": "Size", "value_path": "Other"}).get_matcher())
+
+        class CustomValueFilter(base_filters.ValueFilter):
+            def match(self, i):
+                return True
+
+        self.assertIsNone(CustomValueFilter({"Size": 1}).get_matcher())
+
+
+class FilterPlanTest(BaseFilterTest):
+
+    def test_plan_cheap_first(self):
+        p = self.load_policy({
+            "name": "plan",
+            "resource": "aws.ec2",
+            "filters": [
+                {"type": "metrics", "name": "CPUUtilization", "value": 1, "op": "lt"},
+                {"tag:Env": "prod"},
+                {"type": "value", "key": "c7n.metrics", "value": "present"},
+                {"type": "security-group", "key": "GroupName", "value": "default"},
+                {"type": "instance-age", "days": 1},
+                {"State.Name": "running"},
+            ]})
+        filters = p.resource_manager.filters
+        self.assertEqual(
+            base_filters.core.plan_filters(filters),
+            [filters[1], filters[0], filters[2], filters[3], filters[4], filters[5]])
+
+    def test_plan_after_annotation(self):
+        p = self.load_policy({
+            "name": "plan",
+            "resource": "aws.sqs",
+            "filters": [
+                {"type": "cross-account"},
+                {"type": "value", "key": "CrossAccountViolations[].Sid",
+                 "value": "public", "op": "contains"},
+                {"not": [{"CrossAccountAllowlists": "present"}]},
+                {"QueueArn": "present"},
+            ]})
+        filters = p.resource_manager.filters
+        self.assertEqual(
+            base_filters.core.plan_filters(filters),
+            [filters[3], filters[0], filters[1], filters[2]])
+
+    def test_and_block_plan(self):
+        p = self.load_policy({
+            "name": "plan",
+            "resource": "aws.ec2",
+            "filters": [{"and": [
+                {"type": "metrics", "name": "CPUUtilization", "value": 1, "op": "lt"},
+                {"State.Name": "running"}]}]})
+        block = p.resource_manager.filters[0]
+        self.assertEqual(block.cost, 100)
+        processed = []
+
+        def process(f, resources, event=None):
+            processed.append(f.type)
+            return resources
+
+        with mock.patch.object(base_filters.MetricsFilter, 'process', process):
+            with mock.patch.object(base_filters.ValueFilter, 'process', process):
+                block.process([{"InstanceId": "i-1"}])
+        self.assertEqual(processed, ["value", "metrics"])
+
+
 if __name__ == "__main__":
     unittest.main()
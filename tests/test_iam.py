@@ -2767,6 +2767,30 @@ class CrossAccountChecker(TestCase):
             self.assertEqual(
                 bool(checker.handle_statement(statement)), expected)
 
+    def test_check_memoized(self):
+        corpus = []
+        for name in ("iam-policies", "s3-policies", "sqs-policies", "s3-conditions"):
+            corpus.extend(load_data("iam/%s.json" % name))
+        config = {
+            "allowed_accounts": {"123456789012", "221800032964"},
+            "allowed_vpc": {"vpc-12345678"}}
+
+        with mock.patch.object(PolicyChecker, "_results", {}):
+            checker = PolicyChecker(dict(config))
+            expected = [checker.evaluate(p) for p in corpus]
+            for _ in range(3):
+                self.assertEqual([checker.check(p) for p in corpus], expected)
+                self.assertEqual(
+                    [checker.check(json.dumps(p)) for p in corpus], expected)
+            # a checker with equal config reuses the results
+            with mock.patch.object(PolicyChecker, "evaluate") as evaluate:
+                self.assertEqual(
+                    [PolicyChecker(dict(config)).check(p) for p in corpus], expected)
+                evaluate.assert_not_called()
+                # while a different config evaluates afresh
+                PolicyChecker({"allowed_accounts": ["123456789012"]}).check(corpus[0])
+                evaluate.assert_called_once()
+
     def test_s3_policies(self):
         policies = load_data("iam/s3-policies.json")
         checker = PolicyChecker(
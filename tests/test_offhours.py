@@ -9,6 +9,7 @@ from dateutil import tz as tzutil
 from .common import BaseTest, instance
 
 from c7n.exceptions import PolicyValidationError
+from c7n.filters import offhours
 from c7n.filters.offhours import OffHour, OnHour, ScheduleParser, Time
 from c7n.testing import mock_datetime_now
 
@@ -105,6 +106,42 @@ class OffHoursFilterTest(BaseTest):
                 f.process(instances), [instances[0], instances[1], instances[2]]
             )
 
+    def test_process_schedule_cache(self):
+        calls = []
+
+        class SkipDays:
+
+            def __init__(self, data, manager):
+                pass
+
+            def get_values(self):
+                calls.append(self)
+                return ["2015-12-02"]
+
+        self.patch(offhours, "ValuesFrom", SkipDays)
+        f = OffHour({"skip-days-from": {"url": "s3://bucket/skip.json"}})
+        instances = [
+            instance(Tags=[{"Key": "maid_offhours", "Value": "tz=est"}]),
+            instance(Tags=[{"Key": "maid_offhours", "Value": "tz=est;"}]),
+            instance(Tags=[{"Key": "maid_offhours", "Value": "tz=pt"}]),
+            instance(Tags=[{"Key": "maid_offhours", "Value": "tz=bad"}]),
+            instance(Tags=[{"Key": "maid_offhours", "Value": "tz=bad"}]),
+        ]
+        t = datetime.datetime(
+            year=2015,
+            month=12,
+            day=1,
+            hour=19,
+            minute=5,
+            tzinfo=tzutil.gettz("America/New_York"),
+        )
+        # the mocked clock reads 19:05 in every timezone
+        with mock_datetime_now(t, datetime):
+            self.assertEqual(f.process(instances), instances[:3])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((f.cache_hits, f.cache_misses), (2, 3))
+        self.assertEqual(len(f.parse_errors), 2)
+
     def test_opt_out_behavior(self):
         # Some users want to match based on policy filters to
         # a resource subset with default opt out behavior
@@ -7,6 +7,7 @@ import logging
 import os
 import shutil
 import tempfile
+import time
 from unittest import mock
 
 from c7n import policy, manager
@@ -2101,6 +2102,148 @@ class PullModeTest(BaseTest):
             session_factory=None)
         self.assertEqual(p.is_runnable(), True)
 
+    def test_stream(self):
+        factory = self.replay_flight_data("test_missing_metrics")
+        output_dir = self.get_temp_dir()
+        p = self.load_policy(
+            {'name': 'elb-stream',
+             'resource': 'elb',
+             'filters': [{
+                 'type': 'value',
+                 'key': 'LoadBalancerName',
+                 'op': 'ne',
+                 'value': 'test-elb-zero-metrics'}],
+             'actions': [{'type': 'tag', 'key': 'Stream', 'value': 'x'}]},
+            config={'stream_batch_size': 2, 'account_id': '644160558196'},
+            session_factory=factory,
+            output_dir=output_dir)
+
+        batches = []
+        self.patch(
+            p.resource_manager.actions[0].__class__, 'process',
+            lambda self, resources: batches.append(
+                [r['LoadBalancerName'] for r in resources]))
+        self.assertEqual(p.run(), [])
+        self.assertEqual(
+            batches,
+            [['test-elb-nonzero-metrics'], ['test-elb-missing-metrics']])
+
+        with open(os.path.join(output_dir, 'elb-stream', 'resources.jsonl')) as fh:
+            records = [json.loads(line) for line in fh]
+        self.assertEqual(
+            [r['LoadBalancerName'] for r in records],
+            ['test-elb-nonzero-metrics', 'test-elb-missing-metrics'])
+        self.assertEqual(records[0]['Tags'], [{'Key': 'Platform', 'Value': 'ubuntu'}])
+
+    def test_stream_disabled_by_limits(self):
+        p = self.load_policy(
+            {'name': 'elb-stream-limit',
+             'resource': 'elb',
+             'max-resources': 10},
+            config={'stream_batch_size': 2})
+        self.assertEqual(p.get_execution_mode().get_stream_batch_size(), 0)
+
+        p = self.load_policy(
+            {'name': 'elb-stream-count',
+             'resource': 'elb',
+             'filters': [{
+                 'type': 'value', 'value_type': 'resource_count',
+                 'op': 'gt', 'value': 1}]},
+            config={'stream_batch_size': 2})
+        self.assertEqual(p.get_execution_mode().get_stream_batch_size(), 0)
+
+        p = self.load_policy(
+            {'name': 'elb-stream-reduce',
+             'resource': 'elb',
+             'filters': [{'or': [
+                 {'LoadBalancerName': 'absent'},
+                 {'type': 'reduce', 'sort-by': 'CreatedTime', 'limit': 1}]}]},
+            config={'stream_batch_size': 2})
+        self.assertEqual(p.get_execution_mode().get_stream_batch_size(), 0)
+
+
+class DeltaModeTest(BaseTest):
+
+    def test_delta(self):
+        factory = self.replay_flight_data("test_missing_metrics")
+        state_dir = self.get_temp_dir()
+        policy_data = {
+            'name': 'elb-delta',
+            'resource': 'elb',
+            'mode': {'type': 'delta', 'state-dir': state_dir},
+            'filters': [{
+                'type': 'value',
+                'key': 'LoadBalancerName',
+                'op': 'ne',
+                'value': 'test-elb-zero-metrics'}]}
+
+        evaluated = []
+        filter_resources = manager.ResourceManager.filter_resources
+
+        def record_filter(self, resources, event=None):
+            evaluated.append(sorted(r['LoadBalancerName'] for r in resources))
+            return filter_resources(self, resources, event)
+
+        self.patch(manager.ResourceManager, 'filter_resources', record_filter)
+
+        p = self.load_policy(
+            policy_data, config={'account_id': '644160558196'}, session_factory=factory)
+        resources = p.run()
+        self.assertEqual(
+            [r['LoadBalancerName'] for r in resources],
+            ['test-elb-nonzero-metrics', 'test-elb-missing-metrics'])
+        self.assertEqual(len(evaluated[0]), 3)
+        state_path = p.get_execution_mode().get_state_path()
+        self.assertTrue(state_path.startswith(
+            os.path.join(state_dir, '644160558196', 'us-east-1')))
+
+        # unchanged resources are not re-evaluated
+        p = self.load_policy(
+            policy_data, config={'account_id': '644160558196'}, session_factory=factory)
+        resources = p.run()
+        self.assertEqual(len(evaluated), 1)
+        self.assertEqual(
+            [r['LoadBalancerName'] for r in resources],
+            ['test-elb-nonzero-metrics', 'test-elb-missing-metrics'])
+        self.assertEqual(resources[0]['Tags'], [{'Key': 'Platform', 'Value': 'ubuntu'}])
+
+        # a changed resource is re-evaluated
+        mode = p.get_execution_mode()
+        state = mode.load_state()
+        state['resources']['test-elb-zero-metrics']['hash'] = 'xyz'
+        mode.save_state(state)
+        p.run()
+        self.assertEqual(evaluated[1], ['test-elb-zero-metrics'])
+
+        # policy changes invalidate the state
+        policy_data['filters'][0]['value'] = 'test-elb-missing-metrics'
+        p = self.load_policy(
+            policy_data, config={'account_id': '644160558196'}, session_factory=factory)
+        self.assertIsNone(p.get_execution_mode().load_state())
+
+    def test_delta_validate(self):
+        for resource in ('rds', 'ami'):
+            self.assertRaises(
+                PolicyValidationError,
+                self.load_policy,
+                {'name': 'delta', 'resource': resource, 'mode': {'type': 'delta'}})
+
+    def test_delta_full_interval(self):
+        p = self.load_policy({
+            'name': 'elb-delta',
+            'resource': 'elb',
+            'mode': {'type': 'delta', 'state-dir': self.get_temp_dir(),
+                     'full-interval': 1}})
+        mode = p.get_execution_mode()
+        mode.save_state({
+            'policy': mode.get_policy_hash(),
+            'full_time': time.time() - 1800, 'resources': {}})
+        self.assertIsNotNone(mode.load_state())
+        mode.save_state({
+            'policy': mode.get_policy_hash(),
+            'full_time': time.time() - 7200, 'resources': {}})
+        self.assertIsNone(mode.load_state())
+
 
 class PhdModeTest(BaseTest):
 
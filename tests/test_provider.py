@@ -1,6 +1,7 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
-
+import subprocess
+import sys
 
 from .common import BaseTest
 
@@ -33,3 +34,25 @@ class ProviderTest(BaseTest):
         load_resources(('aws.ec2',))
         ec2 = get_resource_class('aws.ec2')
         self.assertEqual(ec2.type, 'ec2')
+
+    def test_load_resources_startup(self):
+        # startup benchmark, loading a resource in a fresh interpreter
+        # defers importing the modules providing generic filters/actions
+        script = (
+            "import sys, time\n"
+            "t = time.time()\n"
+            "from c7n.resources import load_resources\n"
+            "load_resources(('aws.dynamodb-table',))\n"
+            "print('%0.3f' % (time.time() - t))\n"
+            "print(' '.join(sorted(m for m in sys.modules if m in (\n"
+            "    'c7n.resources.securityhub', 'c7n.resources.sfn', 'c7n.resources.ssm'))))\n")
+        duration, imported = subprocess.check_output(
+            [sys.executable, '-c', script], text=True).split('\n')[:2]
+        self.assertEqual(imported, '', "startup %ss" % duration)
+
+        load_resources(('aws.dynamodb-table',))
+        table = get_resource_class('aws.dynamodb-table')
+        self.assertIn('post-finding', table.action_registry)
+        self.assertEqual(
+            table.action_registry.get('post-finding').__name__, 'OtherResourcePostFinding')
+        self.assertIn('finding', table.filter_registry)
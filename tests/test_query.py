@@ -3,9 +3,12 @@
 import json
 import logging
 import os
+from unittest import mock
 
 
-from c7n.query import ResourceQuery, RetryPageIterator, TypeInfo
+from c7n import cache
+from c7n.query import (
+    ResourceQuery, RetryPageIterator, TypeInfo, get_expression_fields)
 from c7n.resources.vpc import InternetGateway
 
 from botocore.config import Config
@@ -198,3 +201,111 @@ class QueryResourceManagerTest(BaseTest):
         # Check that the warning message was logged
         self.assertTrue("Resource not found: get_core_network using" in output.getvalue())
         self.assertTrue(resources[0]["CoreNetworkArn"] not in output.getvalue())
+
+
+class AugmentStagesTest(BaseTest):
+
+    def test_expression_fields(self):
+        self.assertEqual(get_expression_fields('Endpoint.Address'), {'Endpoint'})
+        self.assertEqual(
+            get_expression_fields("length(Tags[?Key=='Env'])"), {'Tags'})
+        self.assertEqual(
+            get_expression_fields('[Name, Config.Size] | [0]'), {'Name', 'Config'})
+        self.assertEqual(get_expression_fields('@'), None)
+
+    def test_defer_tags(self):
+        p = self.load_policy({
+            'name': 'iam-policy',
+            'resource': 'iam-policy',
+            'filters': [{'PolicyName': 'admin'}]})
+        self.assertEqual(p.resource_manager.get_augment_stages(), [])
+        self.assertEqual(p.resource_manager.get_cache_key(None)['augment'], [])
+
+        p = self.load_policy({
+            'name': 'iam-policy',
+            'resource': 'iam-policy',
+            'filters': [{'or': [{'PolicyName': 'admin'}, {'tag:Owner': 'absent'}]}]})
+        self.assertEqual(p.resource_manager.get_augment_stages(), ['tags'])
+
+    def test_augment_all_stages(self):
+        # role listing and detail share a shape, so any field needs the detail
+        p = self.load_policy({
+            'name': 'iam-role',
+            'resource': 'iam-role',
+            'filters': [{'RoleName': 'admin'}]})
+        self.assertEqual(p.resource_manager.get_augment_stages(), None)
+        self.assertNotIn('augment', p.resource_manager.get_cache_key(None))
+
+        # as do tags when the detail call returns them
+        p = self.load_policy({
+            'name': 'iam-role',
+            'resource': 'iam-role',
+            'filters': [{'tag:Name': 'admin'}]})
+        self.assertEqual(p.resource_manager.get_augment_stages(), None)
+
+        # resources without a listing operation have no known fields
+        p = self.load_policy({
+            'name': 'account',
+            'resource': 'account',
+            'filters': [{'account_name': 'dev'}]})
+        self.assertEqual(p.resource_manager.get_augment_stages(), None)
+
+        # filters other than value filters may read any field
+        p = self.load_policy({
+            'name': 'iam-policy',
+            'resource': 'iam-policy',
+            'filters': [{'type': 'has-allow-all'}]})
+        self.assertEqual(p.resource_manager.get_augment_stages(), None)
+
+        # as do expr values, which are resource expressions
+        p = self.load_policy({
+            'name': 'iam-policy',
+            'resource': 'iam-policy',
+            'filters': [{'type': 'value', 'key': 'PolicyName',
+                         'value_type': 'expr', 'value': 'Tags[0].Value'}]})
+        self.assertEqual(p.resource_manager.get_augment_stages(), None)
+
+    def test_tags_need_arn_detail(self):
+        # ingress point arns are only set by the detail call
+        p = self.load_policy({
+            'name': 'ses-ingress-endpoint',
+            'resource': 'ses-ingress-endpoint',
+            'filters': [{'tag:team': 'policy'}]})
+        self.assertEqual(p.resource_manager.get_augment_stages(), None)
+
+
+class ResourceSnapshotTest(BaseTest):
+
+    def test_snapshot_shared_fetch(self):
+        session_factory = self.replay_flight_data("test_query_filter")
+        policies = [
+            self.load_policy(
+                {"name": "ec2-%d" % i, "resource": "ec2",
+                 "filters": [{"InstanceId": "present"}]},
+                session_factory=session_factory)
+            for i in range(3)]
+        policies.append(self.load_policy(
+            {"name": "ec2-other", "resource": "ec2",
+             "query": [{"instance-state-name": "stopped"}]},
+            session_factory=session_factory))
+
+        with cache.snapshot(policies) as snapshot:
+            self.assertEqual(len(snapshot.consumers), 2)
+            source = policies[0].resource_manager.source
+            with mock.patch.object(
+                    source, 'resources', wraps=source.resources) as fetch:
+                resources = policies[0].resource_manager.resources()
+            self.assertEqual(fetch.call_count, 1)
+            self.assertEqual(len(resources), 1)
+            resources[0]['c7n:annotation'] = True
+            snapshot.release(policies[0])
+
+            for p in policies[1:3]:
+                with mock.patch.object(p.resource_manager.source, 'resources') as fetch:
+                    resources = p.resource_manager.resources()
+                fetch.assert_not_called()
+                self.assertEqual(len(resources), 1)
+                self.assertNotIn('c7n:annotation', resources[0])
+                snapshot.release(p)
+            self.assertEqual(snapshot.size(), 0)
+            self.assertEqual(snapshot.hits, 2)
@@ -0,0 +1,62 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+import os
+import tempfile
+
+from c7n.credentials import SessionFactory
+from c7n.exceptions import PolicyValidationError
+from c7n.ratelimit import RateLimits
+
+from .common import BaseTest
+
+
+class RateLimitsTest(BaseTest):
+
+    def write_quotas(self, content):
+        fh = tempfile.NamedTemporaryFile('w', suffix='.yml', delete=False)
+        self.addCleanup(os.unlink, fh.name)
+        fh.write(content)
+        fh.close()
+        return fh.name
+
+    def test_quota_file(self):
+        limits = RateLimits.from_file(self.write_quotas(
+            "default: 30\n"
+            "services:\n"
+            "  ec2: 10\n"
+            "  ec2.DescribeSnapshots: 2\n"))
+        self.assertEqual(limits.get_rate('ec2', 'DescribeSnapshots'), 2)
+        self.assertEqual(limits.get_rate('ec2', 'DescribeInstances'), 10)
+        self.assertEqual(limits.get_rate('s3', 'ListBuckets'), 30)
+
+    def test_quota_file_invalid(self):
+        with self.assertRaises(PolicyValidationError):
+            RateLimits.from_file(self.write_quotas("rate: 30\n"))
+
+    def test_buckets_shared(self):
+        limits = RateLimits()
+        bucket = limits.get_bucket('123', 'us-east-1', 'ec2', 'DescribeInstances')
+        self.assertEqual(bucket.max_rate, RateLimits.default_rate)
+        self.assertIs(
+            bucket, limits.get_bucket('123', 'us-east-1', 'ec2', 'DescribeInstances'))
+        self.assertIsNot(
+            bucket, limits.get_bucket('456', 'us-east-1', 'ec2', 'DescribeInstances'))
+
+    def test_session_limiter_throttled(self):
+        limits = RateLimits({'default': 8})
+        factory = SessionFactory('us-west-2')
+        factory.rate_limits = limits
+        factory.account_id = '123'
+        session = factory()
+
+        event = 'needs-retry.ec2.DescribeInstances'
+        session.events.emit(event, response=(None, {'Error': {'Code': 'Throttling'}}))
+        bucket = limits.get_bucket('123', 'us-west-2', 'ec2', 'DescribeInstances')
+        self.assertEqual(bucket.rate, 4)
+        self.assertEqual(limits.get_stats()['throttles'], {'ec2.DescribeInstances': 1})
+
+        session.events.emit(event, response=(None, {}))
+        self.assertEqual(bucket.rate, 4.4)
+
+        session.events.emit('before-send.ec2.DescribeInstances', request=None)
+        self.assertEqual(bucket.tokens, 7)
@@ -1,10 +1,17 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import sys
+import types
 import unittest
+from unittest import mock
 
 from c7n.registry import PluginRegistry
 
 
+class LazyPlugin:
+    """Plugin registered by import path in test_register_lazy."""
+
+
 class RegistryTest(unittest.TestCase):
 
     def test_unregister(self):
@@ -67,3 +74,48 @@ class RegistryTest(unittest.TestCase):
 
         registry.register('concrete', _plugin_impl_func, condition=False)
         self.assertEqual(list(registry.keys()), [])
+
+    def test_register_lazy(self):
+        registry = PluginRegistry('dummy')
+
+        @registry.register('json')
+        class _plugin_impl:
+            pass
+
+        registry.register_lazy('json', '%s.LazyPlugin' % __name__)
+        registry.register_lazy('lazy', '%s.LazyPlugin' % __name__)
+        self.assertIn('lazy', registry)
+        self.assertEqual(len(registry), 2)
+        self.assertIs(registry.get('json'), _plugin_impl)
+
+        self.assertIs(registry.get('lazy'), LazyPlugin)
+        self.assertEqual(LazyPlugin.type, 'lazy')
+        self.assertEqual(sorted(registry.keys()), ['json', 'lazy'])
+
+        registry.register_lazy('encoder', '%s.LazyPlugin' % __name__)
+        registry.unregister('encoder')
+        self.assertNotIn('encoder', registry)
+
+    def test_resolve_all_shared_module(self):
+        registry = PluginRegistry('dummy')
+
+        class Finding:
+            pass
+
+        class Action:
+            pass
+
+        # importing a plugin module registers all of its plugins
+        module = types.ModuleType('c7n_lazy_siblings')
+
+        def load(name):
+            registry.register('finding', Finding)
+            registry.register('action', Action)
+            return {'Finding': Finding, 'Action': Action}[name]
+        module.__getattr__ = load
+
+        registry.register_lazy('action', 'c7n_lazy_siblings.Action')
+        registry.register_lazy('finding', 'c7n_lazy_siblings.Finding')
+        with mock.patch.dict(sys.modules, {'c7n_lazy_siblings': module}):
+            self.assertEqual(
+                dict(registry.items()), {'action': Action, 'finding': Finding})
@@ -4,6 +4,7 @@ import csv
 import json
 import pickle
 import os
+import shutil
 import tempfile
 import vcr
 from urllib.request import urlopen
@@ -11,9 +12,10 @@ from urllib.request import urlopen
 from .common import BaseTest, ACCOUNT_ID, Bag
 from .test_s3 import destroyBucket
 
-from c7n.cache import SqlKvCache
+from c7n.cache import NullCache, SqlKvCache
 from c7n.config import Config
-from c7n.resolver import ValuesFrom, URIResolver
+from c7n.resolver import (
+    DocumentCache, ValuesFrom, URIResolver, get_document_cache, reset_document_cache)
 
 from pytest_terraform import terraform
 
@@ -148,6 +150,68 @@ def test_value_from_sqlkv(tmp_path):
     assert values.get_values() == {"magic"}
 
 
+class CountingResolver(URIResolver):
+
+    def __init__(self, contents):
+        super().__init__(None, NullCache(None))
+        self.contents = contents
+        self.requests = []
+
+    def get_url_document(self, uri, headers, validators):
+        self.requests.append(validators)
+        if validators.get('etag') == '"v1"':
+            return None
+        return self.contents, {'etag': '"v1"', 'last_modified': None}
+
+
+class DocumentCacheTest(BaseTest):
+
+    def setUp(self):
+        reset_document_cache()
+        self.addCleanup(reset_document_cache)
+
+    def test_document_revalidation(self):
+        resolver = CountingResolver('{"a": 1}')
+        uri = 'https://example.com/values.json'
+        self.assertEqual(resolver.resolve(uri, {}), '{"a": 1}')
+        self.assertEqual(resolver.resolve(uri, {}), '{"a": 1}')
+        self.assertEqual(resolver.requests, [{}])
+
+        # headers are part of the document identity
+        self.assertEqual(resolver.resolve(uri, {'auth': 'x'}), '{"a": 1}')
+        self.assertEqual(len(resolver.requests), 2)
+
+        self.patch(DocumentCache, 'ttl', -1)
+        self.assertEqual(resolver.resolve(uri, {}), '{"a": 1}')
+        self.assertEqual(resolver.requests[-1], {'etag': '"v1"', 'last_modified': None})
+
+    def test_document_shared_on_disk(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.change_environment(C7N_VALUE_CACHE_DIR=tmp_dir)
+        uri = 'https://example.com/values.json'
+
+        resolver = CountingResolver('["a"]')
+        resolver.resolve(uri, {})
+        self.assertEqual(len(os.listdir(tmp_dir)), 1)
+
+        # a new process reads the stored document
+        reset_document_cache()
+        resolver = CountingResolver('["b"]')
+        self.assertEqual(resolver.resolve(uri, {}), '["a"]')
+        self.assertEqual(resolver.requests, [])
+
+    def test_parsed_values_shared(self):
+        config = Config.empty(account_id=ACCOUNT_ID)
+        mgr = Bag({"session_factory": None, "_cache": None, "config": config})
+        for url in ("moon", "mars"):
+            values = ValuesFrom({"url": url, "expr": "[].bean", "format": "json"}, mgr)
+            values.resolver = FakeResolver(json.dumps([{"bean": "magic"}]))
+            self.assertEqual(values.get_values(), {"magic"})
+        cache = get_document_cache()
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
 class URIResolverProviderTest(BaseTest):
     """Test suite for URI resolver provider delegation mechanism (TDD)"""
 
@@ -205,6 +205,43 @@ class SchemaTest(BaseTest):
         self.assertTrue("'asdf' is not of type 'boolean'" in str(err).replace("u'", "'"))
         self.assertEqual(policy, 'policy-ec2')
 
+    def test_policy_validator_cache(self):
+        cache_dir = self.get_temp_dir()
+        load_resources(('aws.ec2',))
+        data = {
+            'policies': [
+                {'name': 'ec2-stop', 'resource': 'ec2', 'actions': ['stop']},
+                {'name': 'ec2-bad', 'resource': 'aws.ec2',
+                 'actions': [{'type': 'terminate', 'force': 'asdf'}]}]}
+
+        validator = schema.PolicyValidator(cache_dir)
+        err, policy = validator.validate(data)
+        self.assertIn("'asdf' is not of type 'boolean'", str(err))
+        self.assertEqual(policy, 'ec2-bad')
+        self.assertEqual(validator.skipped, 0)
+
+        # a new validator reuses the cached schema and skips the unchanged valid policy
+        generate = mock.MagicMock(side_effect=schema.generate)
+        self.patch(schema, 'generate', generate)
+        validator = schema.PolicyValidator(cache_dir)
+        err, policy = validator.validate(data)
+        self.assertEqual(policy, 'ec2-bad')
+        self.assertEqual(validator.skipped, 1)
+        self.assertFalse(generate.called)
+
+        data['policies'][1]['actions'][0]['force'] = True
+        self.assertEqual(schema.PolicyValidator(cache_dir).validate(data), [])
+
+        data['policies'].append({'name': 'ec2-stop', 'resource': 'ec2'})
+        err, policy = schema.PolicyValidator(cache_dir).validate(data)
+        self.assertIn('duplicates', str(err))
+
+    def test_policy_validator_invalid_resource(self):
+        err, policy = schema.PolicyValidator().validate(
+            {'policies': [{'name': 'bad', 'resource': 'aws.not-a-thing'}]})
+        self.assertIn('invalid resource:aws.not-a-thing', str(err))
+        self.assertEqual(policy, 'bad')
+
     def test_policy_name_regex(self):
         data = {
             'policies': [
@@ -69,6 +69,16 @@ class Backoff(BaseTest):
                 self.assertTrue(i >= maxv / 5)
                 self.assertTrue(i < maxv)
 
+    def test_token_bucket_adapts(self):
+        bucket = utils.TokenBucket(10)
+        self.assertEqual(bucket.tokens, 10)
+        bucket.throttled()
+        bucket.throttled()
+        self.assertEqual(bucket.rate, 2.5)
+        for _ in range(100):
+            bucket.succeeded()
+        self.assertEqual(bucket.rate, 10)
+
 
 class UrlConfTest(BaseTest):
 
@@ -77,3 +77,42 @@ class CommandsValidateTest(BaseTest):
         )
         # if there are only good policy, it should exit none
         self.assertIsNone(validate_yaml_policies(yaml_validate_options))
+
+    def test_explain(self):
+        policy_file = self.write_policy_file({
+            "policies": [{
+                "name": "explain",
+                "resource": "aws.ec2",
+                "filters": [
+                    {"type": "metrics", "name": "CPUUtilization", "value": 1,
+                     "op": "lt"},
+                    {"tag:Env": "prod"},
+                    {"or": [
+                        {"State.Name": "running"},
+                        {"type": "security-group", "key": "GroupName",
+                         "value": "default"}]},
+                    {"type": "value", "key": "c7n.metrics", "value": "present"},
+                    {"InstanceType": "t2.micro"},
+                ]}]})
+        yaml_validate_options = argparse.Namespace(
+            command="c7n.commands.validate",
+            config=None,
+            configs=[policy_file],
+            debug=False,
+            subparser="validate",
+            verbose=False,
+            check_deprecations="yes",
+            explain=True,
+        )
+        log_output = self.capture_logging("custodian.commands")
+        validate_yaml_policies(yaml_validate_options)
+        plan = log_output.getvalue().split("Filter plan for policy:explain\n")[1]
+        self.assertEqual(
+            [line.split(' {')[0] for line in plan.splitlines()[:7]],
+            ["  1. value cost:1",
+             "  2. or cost:10",
+             "    1. value cost:1",
+             "    2. security-group cost:10",
+             "  3. metrics cost:100",
+             "  4. value cost:fixed",
+             "  5. value cost:1"])
@@ -6,6 +6,7 @@ from .common import BaseTest, functional, event_data, load_data
 from unittest.mock import MagicMock
 
 from botocore.exceptions import ClientError as BotoClientError
+from c7n import cache
 from c7n.exceptions import PolicyValidationError
 from c7n.resources.aws import shape_validate
 from pytest_terraform import terraform
@@ -2392,6 +2393,31 @@ class SecurityGroupTest(BaseTest):
         resources = p.run()
         assert resources == []
 
+    def test_unused_scans_shared(self):
+        calls = []
+
+        def scan(kind, sg_ids):
+            def _scan():
+                calls.append(kind)
+                return set(sg_ids)
+            return _scan
+
+        policies = [
+            self.load_policy(
+                {"name": "sg-%s" % f, "resource": "security-group", "filters": [f]})
+            for f in ("unused", "used")]
+        for p in policies:
+            f = p.resource_manager.filters[0]
+            self.patch(f, "get_scanners", lambda: (
+                ("nics", scan("nics", ["sg-1"])),
+                ("lambdas", scan("lambdas", ["sg-2"]))))
+
+        with cache.snapshot():
+            for p in policies:
+                self.assertEqual(
+                    p.resource_manager.filters[0].scan_groups(), {"sg-1", "sg-2"})
+        self.assertEqual(sorted(calls), ["lambdas", "nics", "nics"])
+
     def test_unused_batch(self):
         factory = self.replay_flight_data("test_security_group_batch_unused")
         # 2 security groups in this flight data:
@@ -4,6 +4,7 @@
 import itertools
 import logging
 from pathlib import Path
+import subprocess
 import sys
 
 import click
@@ -15,6 +16,7 @@ from .entry import initialize_iac
 from .output import get_reporter, report_outputs, summary_options
 from .test import TestReporter, TestRunner
 from .policy import load_policies
+from .utils import get_changed_files
 from .validate import validate_files
 
 log = logging.getLogger("c7n.iac")
@@ -118,6 +120,23 @@ def dump(directory, var_file, output_file, terraform_workspace, output_query, er
     is_flag=True,
     help="Fail/stop if there are errors present in the HCL",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of processes evaluating policies (default 1)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory caching parsed sources across runs",
+)
+@click.option(
+    "--changed-since",
+    metavar="GIT-REF",
+    help="Only evaluate resources affected by changes since the given git ref",
+)
 def run(
     format,
     policy_dir,
@@ -131,6 +150,9 @@ def run(
     filters,
     warn_on,
     err_invalid,
+    jobs=1,
+    cache_dir=None,
+    changed_since=None,
     reporter=None,
 ):
     """evaluate policies against IaC sources.
@@ -152,7 +174,15 @@ def run(
         warn_on=warn_on,
         filters=filters,
         stop_on_hcl_errors=err_invalid,
+        jobs=jobs,
+        cache_dir=cache_dir,
     )
+    if changed_since:
+        try:
+            config["changed_files"] = get_changed_files(config.source_dir, changed_since)
+        except (OSError, subprocess.CalledProcessError) as e:
+            log.error(f"Unable to determine changes since {changed_since}: {e}")
+            sys.exit(1)
     policies = config.exec_filter.filter_policies(load_policies(policy_dir, config))
     if not policies:
         log.warning("no policies found")
@@ -221,6 +251,8 @@ def get_config(
     warn_on=None,
     format="terraform",
     stop_on_hcl_errors=False,
+    jobs=1,
+    cache_dir=None,
 ):
     config = Config.empty(
         source_dir=directory and Path(directory),
@@ -235,6 +267,8 @@ def get_config(
         warn_on=warn_on,
         format=format,
         stop_on_hcl_errors=stop_on_hcl_errors,
+        jobs=jobs,
+        cache_dir=cache_dir,
     )
     config["exec_filter"] = ExecutionFilter.parse(config.filters)
     config["warn_filter"] = ExecutionFilter.parse(config.warn_on, severity_direction="gte")
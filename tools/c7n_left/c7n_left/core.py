@@ -2,8 +2,10 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import fnmatch
 import logging
+import multiprocessing
 import operator
 import os
 
@@ -37,6 +39,9 @@ class IACSourceProvider(Provider):
     def parse(self, source_dir, var_files, **kwargs):
         """Return the resource graph for the provider"""
 
+    def get_changed_resources(self, graph, changed_files, var_files=()):
+        """Return ids of the resources affected by changed files, None for all"""
+
 
 def get_provider(source_dir):
     """For a given source directory return an appropriate IaC provider"""
@@ -227,6 +232,8 @@ class CollectionRunner:
         self.options = options
         self.reporter = reporter
         self.provider = None
+        self.type_policies = {}
+        self.selection = None
 
     def run(self) -> bool:
         # return value is used to signal process exit code.
@@ -243,6 +250,13 @@ class CollectionRunner:
             self.options.terraform_workspace,
         )
 
+        if self.options.get("changed_files") is not None:
+            self.selection = provider.get_changed_resources(
+                graph, self.options.changed_files, self.options.var_files
+            )
+            if self.selection is not None:
+                log.info("evaluating %d changed resources", len(self.selection))
+
         for p in self.policies:
             p.expand_variables(p.get_variables())
             p.validate()
@@ -251,33 +265,105 @@ class CollectionRunner:
         # consider inverting this order to allow for results grouped by policy
         # at the moment, we're doing results grouped by resource.
         found = False
+        jobs = self.options.get("jobs") or 1
+        if jobs > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            log.warning("parallel evaluation requires fork, evaluating serially")
+            jobs = 1
+        if jobs > 1:
+            evaluated = self.evaluate_parallel(graph, event, jobs)
+        else:
+            evaluated = self.evaluate(graph, event)
+        for p, rtype, resources, result_set, error in evaluated:
+            if error is not None:
+                found = True
+                self.reporter.on_policy_error(error, p, rtype, resources)
+            if result_set:
+                self.reporter.on_results(p, result_set)
+            if result_set and (
+                not self.options.warn_filter or not self.options.warn_filter.filter_policies((p,))
+            ):
+                found = True
+        self.reporter.on_execution_ended()
+        return found
+
+    def get_work(self, graph):
+        """Yield (resource type, resources, matching policies) to evaluate."""
         for rtype, resources in graph.get_resources_by_type():
             if self.options.exec_filter:
                 resources = self.options.exec_filter.filter_resources(rtype, resources)
+            if self.selection is not None:
+                resources = [r for r in resources if r.id in self.selection]
             if not resources:
                 continue
-            for p in self.policies:
-                if not self.match_type(rtype, p):
-                    continue
-                result_set = []
+            policies = self.get_type_policies(rtype)
+            if policies:
+                yield rtype, resources, policies
+
+    def evaluate(self, graph, event):
+        for rtype, resources, policies in self.get_work(graph):
+            for p in policies:
+                result_set, error = [], None
                 try:
                     result_set = self.run_policy(p, graph, resources, event, rtype)
                 except Exception as e:
-                    found = True
-                    self.reporter.on_policy_error(e, p, rtype, resources)
-                if result_set:
-                    self.reporter.on_results(p, result_set)
-                if result_set and (
-                    not self.options.warn_filter
-                    or not self.options.warn_filter.filter_policies((p,))
-                ):
-                    found = True
-        self.reporter.on_execution_ended()
-        return found
+                    error = e
+                yield p, rtype, resources, result_set, error
 
-    def run_policy(self, policy, graph, resources, event, resource_type):
+    def evaluate_parallel(self, graph, event, jobs):
+        """Evaluate (resource type, policy) units across a pool of processes.
+
+        Workers are forked with the graph and policies in place, so only
+        unit indexes are sent to them and only matched resources are sent
+        back. Results are yielded in the same order as serial evaluation.
+        """
+        global _worker_state
+
+        work = list(self.get_work(graph))
+        units = [
+            (widx, pidx)
+            for widx, (_, _, policies) in enumerate(work)
+            for pidx in range(len(policies))
+        ]
+        _worker_state = (graph, event, work)
+        try:
+            with ProcessPoolExecutor(
+                jobs, mp_context=multiprocessing.get_context("fork")
+            ) as executor:
+                futures = [executor.submit(_evaluate_unit, *unit) for unit in units]
+                for (widx, pidx), future in zip(units, futures):
+                    rtype, resources, policies = work[widx]
+                    p = policies[pidx]
+                    self.reporter.on_policy_start(
+                        p, self.get_policy_event(graph, resources, event, rtype)
+                    )
+                    try:
+                        matched = future.result()
+                    except Exception as e:
+                        yield p, rtype, resources, [], e
+                        continue
+                    yield p, rtype, resources, ResultSet(
+                        [PolicyResourceResult(r, p) for r in matched]
+                    ), None
+        finally:
+            _worker_state = None
+
+    def get_type_policies(self, rtype):
+        """Policies matching a resource type, indexed on first lookup."""
+        policies = self.type_policies.get(rtype)
+        if policies is None:
+            policies = self.type_policies[rtype] = [
+                p for p in self.policies if self.match_type(rtype, p)
+            ]
+        return policies
+
+    @staticmethod
+    def get_policy_event(graph, resources, event, resource_type):
         event = dict(event)
         event.update({"graph": graph, "resources": resources, "resource_type": resource_type})
+        return event
+
+    def run_policy(self, policy, graph, resources, event, resource_type):
+        event = self.get_policy_event(graph, resources, event, resource_type)
         self.reporter.on_policy_start(policy, event)
         return policy.push(event)
 
@@ -303,6 +389,17 @@ class CollectionRunner:
         return found
 
 
+# graph, event and work of a parallel evaluation, inherited by forked workers
+_worker_state = None
+
+
+def _evaluate_unit(work_idx, policy_idx):
+    graph, event, work = _worker_state
+    rtype, resources, policies = work[work_idx]
+    event = CollectionRunner.get_policy_event(graph, resources, event, rtype)
+    return [r.resource for r in policies[policy_idx].push(event)]
+
+
 class IACSourceMode(PolicyExecutionMode):
     @property
     def manager(self):
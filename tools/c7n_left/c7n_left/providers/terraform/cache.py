@@ -0,0 +1,149 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+#
+import hashlib
+from importlib.metadata import PackageNotFoundError, version
+import json
+import os
+from pathlib import Path
+import re
+
+import tfparse
+
+from ...core import log
+
+
+class ModuleTracker:
+    """Track the local modules a root module depends on.
+
+    Local module calls are found by scanning sources for module ``source``
+    attributes with relative paths, which identifies the files a parse of
+    the root module depends on without parsing it. A change to a shared
+    module thus only affects the root modules calling it.
+    """
+
+    source_pattern = re.compile(r'"?source"?\s*[=:]\s*"(\.{1,2}/[^"]*)"')
+    file_patterns = ("*.tf", "*.tf.json", "*.tfvars", "*.tfvars.json")
+    # variable files written by the variable resolver for the duration of a parse
+    temp_prefix = "c7n-left-"
+
+    def __init__(self, source_dir):
+        self.source_dir = Path(source_dir).resolve()
+        # module directory -> directories of modules calling it
+        self.modules = {}
+
+    def scan(self):
+        self.modules = {self.source_dir: set()}
+        pending = [self.source_dir]
+        while pending:
+            mod_dir = pending.pop()
+            for f in self.get_module_files(mod_dir):
+                if not f.name.endswith((".tf", ".tf.json")):
+                    continue
+                for source in self.source_pattern.findall(f.read_text()):
+                    child = (mod_dir / source).resolve()
+                    if not child.is_dir():
+                        continue
+                    if child not in self.modules:
+                        self.modules[child] = set()
+                        pending.append(child)
+                    self.modules[child].add(mod_dir)
+        return self
+
+    def get_module_files(self, mod_dir):
+        files = set()
+        for pattern in self.file_patterns:
+            files.update(
+                f for f in mod_dir.glob(pattern) if not f.name.startswith(self.temp_prefix)
+            )
+        return sorted(files)
+
+    def get_files(self):
+        files = []
+        for mod_dir in sorted(self.modules):
+            files.extend(self.get_module_files(mod_dir))
+        # remote modules installed by terraform init
+        installed = self.source_dir / ".terraform" / "modules"
+        if installed.is_dir():
+            files.extend(sorted(f for f in installed.rglob("*") if f.is_file()))
+        return files
+
+    def get_callers(self, mod_dir):
+        """Directories of all modules transitively calling a module."""
+        callers, pending = set(), [Path(mod_dir).resolve()]
+        while pending:
+            for caller in self.modules.get(pending.pop(), ()):
+                if caller not in callers:
+                    callers.add(caller)
+                    pending.append(caller)
+        return callers
+
+
+class NullParseCache:
+    def load(self, source_dir, vars_paths=(), **params):
+        return tfparse.load_from_path(source_dir, vars_paths=list(vars_paths), **params)
+
+
+class ParseCache(NullParseCache):
+    """Persist parsed module data across runs.
+
+    Entries are keyed by a digest of the content of the root module's
+    files and those of its local modules, the variable files, and the
+    parse parameters, so unchanged sources are not parsed again.
+    """
+
+    max_entries = 64
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+
+    def get_key(self, source_dir, vars_paths=(), **params):
+        tracker = ModuleTracker(source_dir).scan()
+        digest = hashlib.sha256()
+        for f in tracker.get_files():
+            digest.update(os.path.relpath(f, tracker.source_dir).encode("utf8"))
+            digest.update(hashlib.sha256(f.read_bytes()).digest())
+        # resolved variable files are often temporary files, only their content matters
+        for v in vars_paths:
+            digest.update(hashlib.sha256((Path(source_dir) / v).read_bytes()).digest())
+        env = sorted((k, v) for k, v in os.environ.items() if k.startswith("TF_VAR_"))
+        params = json.dumps([get_tfparse_version(), env, params], sort_keys=True)
+        digest.update(params.encode("utf8"))
+        return digest.hexdigest()
+
+    def load(self, source_dir, vars_paths=(), **params):
+        cache_path = self.cache_dir / ("%s.json" % self.get_key(source_dir, vars_paths, **params))
+        if cache_path.exists():
+            try:
+                data = json.loads(cache_path.read_text())
+                # entries are expired least recently used first
+                os.utime(cache_path)
+                log.debug("Loaded %s from parse cache", source_dir)
+                return data
+            except ValueError:
+                log.warning("ignoring invalid parse cache entry %s", cache_path)
+        data = super().load(source_dir, vars_paths, **params)
+        self.save(cache_path, data)
+        return data
+
+    def save(self, cache_path, data):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".%d" % os.getpid())
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, cache_path)
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for expired in entries[: -self.max_entries]:
+            expired.unlink()
+
+
+def get_parse_cache(cache_dir=None):
+    if not cache_dir:
+        return NullParseCache()
+    return ParseCache(cache_dir)
+
+
+def get_tfparse_version():
+    try:
+        return version("tfparse")
+    except PackageNotFoundError:  # pragma: no cover
+        return ""
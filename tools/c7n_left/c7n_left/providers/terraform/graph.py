@@ -7,58 +7,111 @@ from .resource import TerraformResource
 
 
 class TerraformGraph(ResourceGraph):
+    """Terraform resource graph.
+
+    Resources are indexed by type on first access, and the same
+    resource wrappers are handed out for the rest of the run, along
+    with an index of provider default tags.
+    """
+
     resolver = None
 
+    # block types whose resources are not distinguished as data or managed
+    block_types = {
+        "module": "module",
+        "moved": "moved",
+        "locals": "local",
+        "terraform": "terraform",
+        "provider": "provider",
+        "variable": "variable",
+        "output": "output",
+    }
+
+    def __init__(self, resource_data, src_dir):
+        super().__init__(resource_data, src_dir)
+        self._resources = {}
+        self._type_index = None
+        self._provider_tags = None
+
     def __len__(self):
         return sum([len(v) for k, v in self.resource_data.items() if "_" in k])
 
     def get_resources_by_type(self, types=()):
         if isinstance(types, str):
             types = (types,)
+        for type_name, resources in self.get_type_index().items():
+            if types and type_name not in types:
+                continue
+            yield type_name, list(resources)
+
+    def get_type_index(self):
+        """Map of resource type, with data sources prefixed by ``data.``, to resources."""
+        if self._type_index is not None:
+            return self._type_index
+        index = {}
         for type_name, type_items in self.resource_data.items():
-            if types and (type_name not in types and f"data.{type_name}" not in types):
+            if type_name in self.block_types:
+                index[type_name] = [
+                    self.as_resource(type_name, d, self.block_types[type_name]) for d in type_items
+                ]
                 continue
-            elif type_name == "module":
-                yield type_name, [self.as_resource(type_name, d, "module") for d in type_items]
-            elif type_name == "moved":
-                yield type_name, [self.as_resource(type_name, d, "moved") for d in type_items]
-            elif type_name == "locals":
-                yield type_name, [self.as_resource(type_name, d, "local") for d in type_items]
-            elif type_name == "terraform":
-                yield type_name, [self.as_resource(type_name, d, "terraform") for d in type_items]
-            elif type_name == "provider":
-                yield type_name, [self.as_resource(type_name, d, "provider") for d in type_items]
-            elif type_name == "variable":
-                yield type_name, [self.as_resource(type_name, d, "variable") for d in type_items]
-            elif type_name == "output":
-                yield type_name, [self.as_resource(type_name, d, "output") for d in type_items]
-            else:
-                data_resources = []
-                resources = []
-                for item in type_items:
-                    name = item["__tfmeta"]["path"]
-                    resource = self.as_resource(name, item)
-                    if item["__tfmeta"].get("type", "resource") == "data":
-                        data_resources.append(resource)
-                    else:
-                        resources.append(resource)
-
-                if resources:
-                    if types and type_name in types:
-                        yield type_name, resources
-                    elif not types:
-                        yield type_name, resources
-                if data_resources:
-                    if types and f"data.{type_name}" in types:
-                        yield f"data.{type_name}", data_resources
-                    elif not types:
-                        yield f"data.{type_name}", data_resources
+            data_resources = []
+            resources = []
+            for item in type_items:
+                name = item["__tfmeta"]["path"]
+                resource = self.as_resource(name, item)
+                if item["__tfmeta"].get("type", "resource") == "data":
+                    data_resources.append(resource)
+                else:
+                    resources.append(resource)
+            if resources:
+                index[type_name] = resources
+            if data_resources:
+                index[f"data.{type_name}"] = data_resources
+        self._type_index = index
+        return index
 
     def as_resource(self, name, data, type_name=None):
+        block_id = data.get("id")
+        if block_id in self._resources:
+            return self._resources[block_id]
         if type_name and "type" not in data["__tfmeta"]:
             data["__tfmeta"]["type"] = type_name
         data["__tfmeta"]["src_dir"] = self.src_dir
-        return TerraformResource(name, data)
+        resource = TerraformResource(name, data)
+        if block_id is not None:
+            self._resources[block_id] = resource
+        return resource
+
+    def get_provider_tags(self, resource):
+        """Default tags of the provider configuration managing a resource."""
+        if self._provider_tags is None:
+            self._provider_tags = self.get_provider_tag_index()
+        provider = resource.get("provider")
+        if isinstance(provider, dict):
+            provider = provider.get("__attribute__")
+        if isinstance(provider, str) and "." in provider:
+            label, alias = provider.split(".", 1)
+            if (label, alias) in self._provider_tags:
+                return self._provider_tags[(label, alias)]
+        else:
+            label = resource["__tfmeta"]["label"].split("_", 1)[0]
+        return self._provider_tags.get((label, None), {})
+
+    def get_provider_tag_index(self):
+        index = {}
+        merged = {}
+        for block in self.resource_data.get("provider", ()):
+            label = block["__tfmeta"]["label"]
+            tags = (block.get("default_tags") or {}).get("tags") or {}
+            index.setdefault((label, block.get("alias")), {}).update(tags)
+            merged.setdefault(label, {}).update(tags)
+        # provider configurations passed to modules aren't resolved by the
+        # parser, so resources of a provider without a default configuration
+        # get the tags of all its configurations.
+        for label, tags in merged.items():
+            index.setdefault((label, None), tags)
+        return index
 
     def build(self):
         self.resolver = Resolver()
@@ -73,6 +126,7 @@ class Resolver:
     def __init__(self):
         self._id_map = {}
         self._ref_map = {}
+        self._typed_refs = {}
 
     @staticmethod
     def is_id_ref(v):
@@ -83,17 +137,40 @@ class Resolver:
         return True
 
     def resolve_refs(self, block, types=None):
-        refs = self._ref_map.get(block["id"], ())
-        for rid in refs:
+        refs, refs_by_type = self.get_typed_refs(block["id"])
+        if not types:
+            return iter([r for _, r in refs])
+        if len(types) == 1:
+            (rtype,) = types
+            return iter(refs_by_type.get(rtype, ()))
+        return iter([r for rtype, r in refs if rtype in types])
+
+    def get_typed_refs(self, block_id):
+        """References of a block in order with their types, and grouped by type."""
+        typed_refs = self._typed_refs.get(block_id)
+        if typed_refs is not None:
+            return typed_refs
+        refs = []
+        refs_by_type = {}
+        for rid in self._ref_map.get(block_id, ()):
             r = self._id_map.get(rid, {})
             if "__tfmeta" not in r:
                 continue
             rtype = r["__tfmeta"]["label"]
             if r["__tfmeta"].get("type") == "data":
                 rtype = f"data.{rtype}"
-            if types and rtype not in types:
-                continue
-            yield r
+            refs.append((rtype, r))
+            refs_by_type.setdefault(rtype, []).append(r)
+        typed_refs = self._typed_refs[block_id] = (refs, refs_by_type)
+        return typed_refs
+
+    def get_ref_ids(self, block):
+        """Ids of the blocks referencing or referenced by a block."""
+        return self._ref_map.get(block.get("id"), ())
+
+    def build(self, block):
+        self._typed_refs = {}
+        return self.visit(block)
 
     def visit(self, block):
         if not isinstance(block, dict):
@@ -125,5 +202,3 @@ class Resolver:
                 self._ref_map.setdefault(r, []).append(bid)
 
         return refs
-
-    build = visit
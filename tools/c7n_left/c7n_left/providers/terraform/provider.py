@@ -1,8 +1,7 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 #
-
-from tfparse import load_from_path
+from pathlib import Path
 
 from c7n.provider import clouds
 from c7n.policy import execution
@@ -18,6 +17,7 @@ from ...core import (
     ResultSet,
     PolicyResourceResult,
 )
+from .cache import ModuleTracker, NullParseCache, get_parse_cache
 from .graph import TerraformGraph
 from .filters import Taggable
 from .variables import VariableResolver
@@ -76,17 +76,11 @@ class TerraformResourceManager(IACResourceManager):
         # https://registry.terraform.io/providers/hashicorp/aws/latest/docs#default_tags
         if event["resource_type"] == "aws_autoscaling_group":
             return
-        provider_tags = {}
-        for type_name, blocks in event["graph"].get_resources_by_type(("provider",)):
-            for block in blocks:
-                if block["__tfmeta"]["label"] != "aws":
-                    continue
-                provider_tags.update(block.get("default_tags", {}).get("tags") or {})
-
-        if not provider_tags:
-            return
-
+        graph = event["graph"]
         for r in resources:
+            provider_tags = graph.get_provider_tags(r)
+            if not provider_tags:
+                continue
             rtags = dict(provider_tags)
             if r.get("tags"):
                 rtags.update(r["tags"])
@@ -115,9 +109,11 @@ class TerraformProvider(IACSourceProvider):
     resource_map = TerraformResourceMap(resource_prefix)
     resources = resource_map
     reporter = None
+    parse_cache = NullParseCache()
 
     def initialize(self, options):
         self.reporter = options.get("reporter")
+        self.parse_cache = get_parse_cache(options.get("cache_dir"))
 
     def initialize_policies(self, policies, options):
         for p in policies:
@@ -130,10 +126,11 @@ class TerraformProvider(IACSourceProvider):
             var_files,
             self.reporter,
             stop_on_hcl_errors=stop_on_hcl_errors,
+            parse_cache=self.parse_cache,
         )
         with resolver.get_variables() as var_files:
             graph = TerraformGraph(
-                load_from_path(
+                self.parse_cache.load(
                     source_dir,
                     vars_paths=var_files,
                     allow_downloads=True,
@@ -146,6 +143,50 @@ class TerraformProvider(IACSourceProvider):
             log.debug("Loaded %d %s resources", len(graph), self.type)
             return graph
 
+    def get_changed_resources(self, graph, changed_files, var_files=()):
+        """Paths of the blocks affected by changes to the given files.
+
+        Selects blocks defined in changed files and blocks referencing
+        or referenced by them. A selected module call selects the module's
+        blocks, as its inputs may have changed. Changes to a module's
+        files select its callers. Returns None when variable files
+        changed, as any block may be affected.
+        """
+        source_dir = Path(graph.src_dir).resolve()
+        changed_files = {Path(f).resolve() for f in changed_files}
+        var_files = {(source_dir / f).resolve() for f in var_files}
+        if changed_files.intersection(var_files) or any(
+            f.parent == source_dir and f.name.endswith((".tfvars", ".tfvars.json"))
+            for f in changed_files
+        ):
+            return None
+
+        blocks = [b for _, type_blocks in graph.get_resources_by_type() for b in type_blocks]
+        changed = [b for b in blocks if (source_dir / b.filename).resolve() in changed_files]
+        selected = {b.id for b in changed}
+        changed_ids = {b.get("id") for b in changed}
+        for b in blocks:
+            if changed_ids.intersection(graph.resolver.get_ref_ids(b)):
+                selected.add(b.id)
+
+        module_calls = tuple(
+            b.id + "." for b in blocks if b.id in selected and b.id.startswith("module.")
+        )
+        if module_calls:
+            selected.update(b.id for b in blocks if b.id.startswith(module_calls))
+
+        tracker = ModuleTracker(source_dir).scan()
+        changed_modules = {f.parent for f in changed_files if f.parent in tracker.modules}
+        for mod_dir in list(changed_modules):
+            changed_modules.update(tracker.get_callers(mod_dir))
+        for b in blocks:
+            if b["__tfmeta"].get("type") != "module" or not isinstance(b.get("source"), str):
+                continue
+            mod_dir = ((source_dir / b.filename).parent / b["source"]).resolve()
+            if mod_dir in changed_modules:
+                selected.add(b.id)
+        return selected
+
     def match_dir(self, source_dir):
         files = list(source_dir.glob("*.tf"))
         files += list(source_dir.glob("*.tf.json"))
@@ -8,10 +8,10 @@ import os
 from pathlib import Path
 import tempfile
 
-import tfparse
 import hcl2
 
 from ...core import log
+from .cache import NullParseCache
 from .graph import TerraformGraph
 
 
@@ -52,13 +52,16 @@ class VariableResolver:
         "object": {},
     }
 
-    def __init__(self, source_dir, var_files, reporter=None, stop_on_hcl_errors=False):
+    def __init__(
+        self, source_dir, var_files, reporter=None, stop_on_hcl_errors=False, parse_cache=None
+    ):
         self.source_dir = source_dir
         self.var_files = var_files
         self.resolved_files = {}
         self.temp_files = []
         self.reporter = reporter
         self.stop_on_hcl_errors = stop_on_hcl_errors
+        self.parse_cache = parse_cache or NullParseCache()
 
     def _write_file_content(self, content, suffix=".tfvars"):
         fh = tempfile.NamedTemporaryFile(
@@ -121,7 +124,7 @@ class VariableResolver:
                 var_map.update(f_vars)
 
         uninitialized_vars = {}
-        graph_data = tfparse.load_from_path(
+        graph_data = self.parse_cache.load(
             self.source_dir,
             allow_downloads=False,
             stop_on_hcl_error=self.stop_on_hcl_errors,
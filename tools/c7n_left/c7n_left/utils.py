@@ -1,6 +1,21 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 #
-
+from pathlib import Path
+import subprocess
 
 SEVERITY_LEVELS = {"critical": 0, "high": 10, "medium": 20, "low": 30, "unknown": 40}
+
+
+def get_changed_files(directory, ref):
+    """Files changed in a git working tree since a ref, including untracked files."""
+
+    def git(*args, cwd=directory):
+        return subprocess.run(
+            ("git",) + args, cwd=cwd, check=True, capture_output=True, text=True
+        ).stdout
+
+    root = Path(git("rev-parse", "--show-toplevel").strip())
+    changed = git("diff", "--name-only", "-z", ref, "--", cwd=root).split("\0")
+    changed += git("ls-files", "--others", "--exclude-standard", "-z", cwd=root).split("\0")
+    return {(root / f).resolve() for f in changed if f}
@@ -5,6 +5,7 @@ import json
 import os
 from pathlib import Path
 import re
+import shutil
 import subprocess
 import sys
 import uuid
@@ -17,7 +18,7 @@ import jsonschema
 import pytest
 from click.testing import CliRunner
 
-from c7n.config import Config
+from c7n.config import Bag, Config
 from c7n.resources import load_resources
 
 try:
@@ -27,6 +28,7 @@ try:
         TerraformResourceManager,
         extract_mod_stack,
     )
+    from c7n_left.providers.terraform.cache import ModuleTracker, ParseCache
     from c7n_left.providers.terraform.graph import Resolver
     from c7n_left.providers.terraform.filters import Taggable
     from c7n_left.providers.terraform.variables import VariableResolver
@@ -246,6 +248,130 @@ def test_graph_resolver_local_modules():
     assert queues[0][1][1]["name"] == "parent_queue"
 
 
+def test_module_tracker():
+    root = terraform_dir / "local_modules" / "root"
+    tracker = ModuleTracker(root).scan()
+    parent_dir = (terraform_dir / "local_modules" / "parent_modules" / "parent_sqs").resolve()
+    assert set(tracker.modules) == {
+        root.resolve(),
+        parent_dir,
+        (root / "child_modules" / "child_sqs").resolve(),
+    }
+    assert tracker.get_callers(parent_dir) == {root.resolve()}
+    assert len(tracker.get_files()) == 3
+
+
+def test_parse_cache(tmp_path):
+    shutil.copytree(terraform_dir / "local_modules", tmp_path / "local_modules")
+    root = tmp_path / "local_modules" / "root"
+    provider = TerraformProvider()
+    provider.parse_cache = ParseCache(tmp_path / "cache")
+    graph = provider.parse(root)
+    entries = set((tmp_path / "cache").iterdir())
+    assert entries
+
+    with patch("tfparse.load_from_path", side_effect=AssertionError("not cached")):
+        cached = provider.parse(root)
+    assert cached.resource_data.keys() == graph.resource_data.keys()
+    assert len(cached) == len(graph)
+
+    # changing a local module invalidates its caller's entries
+    queue_tf = tmp_path / "local_modules" / "parent_modules" / "parent_sqs" / "main.tf"
+    queue_tf.write_text(queue_tf.read_text().replace("parent_queue", "renamed_queue"))
+    graph = provider.parse(root)
+    assert set((tmp_path / "cache").iterdir()) > entries
+    queues = dict(graph.get_resources_by_type("aws_sqs_queue"))["aws_sqs_queue"]
+    assert {q["name"] for q in queues} == {"child_queue", "renamed_queue"}
+
+
+def write_changes_tf(tmp_path):
+    (tmp_path / "modules" / "queue").mkdir(parents=True)
+    (tmp_path / "modules" / "queue" / "main.tf").write_text(
+        'resource "aws_sqs_queue" "mod_queue" {\n  name = "mod"\n}\n'
+    )
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "main.tf").write_text('module "queue" {\n  source = "../modules/queue"\n}\n')
+    (root / "queues.tf").write_text('resource "aws_sqs_queue" "root_queue" {\n  name = "q"\n}\n')
+    (root / "topics.tf").write_text(
+        'resource "aws_sns_topic" "topic" {\n  name = aws_sqs_queue.root_queue.name\n}\n'
+        'resource "aws_sns_topic" "other" {\n  name = "other"\n}\n'
+    )
+    return root
+
+
+def test_changed_resources(tmp_path):
+    root = write_changes_tf(tmp_path)
+    provider = TerraformProvider()
+    graph = provider.parse(root)
+
+    assert provider.get_changed_resources(graph, [tmp_path / "modules" / "queue" / "main.tf"]) == {
+        "module.queue",
+        "module.queue.aws_sqs_queue.mod_queue",
+    }
+    assert provider.get_changed_resources(graph, [root / "queues.tf"]) == {
+        "aws_sqs_queue.root_queue",
+        "aws_sns_topic.topic",
+    }
+    assert provider.get_changed_resources(graph, [root / "main.tf"]) == {
+        "module.queue",
+        "module.queue.aws_sqs_queue.mod_queue",
+    }
+    assert provider.get_changed_resources(graph, [tmp_path / "README.md"]) == set()
+    assert provider.get_changed_resources(graph, [root / "terraform.tfvars"]) is None
+
+
+def test_cli_changed_since(tmp_path):
+    root = write_changes_tf(tmp_path)
+
+    def git(*args):
+        subprocess.run(
+            ("git", "-c", "user.name=c7n", "-c", "user.email=c7n@example.com") + args,
+            cwd=tmp_path,
+            check=True,
+            capture_output=True,
+        )
+
+    git("init", "-q")
+    git("add", ".")
+    git("commit", "-q", "-m", "initial")
+    queues_tf = root / "queues.tf"
+    queues_tf.write_text(queues_tf.read_text().replace('"q"', '"queue"'))
+
+    (tmp_path / "policies").mkdir()
+    (tmp_path / "policies" / "policy.json").write_text(
+        json.dumps({"policies": [{"name": "check-wild", "resource": "terraform.aws_*"}]})
+    )
+    result = CliRunner().invoke(
+        cli.cli,
+        [
+            "run",
+            "-p",
+            str(tmp_path / "policies"),
+            "-d",
+            str(root),
+            "-o",
+            "json",
+            "--output-file",
+            str(tmp_path / "output.json"),
+            "--changed-since",
+            "HEAD",
+        ],
+    )
+    assert result.exit_code == 1
+    data = json.loads((tmp_path / "output.json").read_text())
+    assert {r["resource"]["__tfmeta"]["path"] for r in data["results"]} == {
+        "aws_sqs_queue.root_queue",
+        "aws_sns_topic.topic",
+    }
+
+    result = CliRunner().invoke(
+        cli.cli,
+        ["run", "-p", str(tmp_path / "policies"), "-d", str(root), "--changed-since", "nope"],
+    )
+    assert result.exit_code == 1
+
+
 def test_graph_resolver_id():
     resolver = Resolver()
     assert resolver.is_id_ref("4b3db3ec-98ad-4382-a460-d8e392d128b7") is True
@@ -443,6 +569,78 @@ provider "google" {
     assert results[0].resource["name"] == "Yada"
 
 
+def test_provider_tag_augment_alias(policy_env):
+    policy_env.write_tf("""
+provider "aws" {
+  default_tags {
+    tags = { Env = "Default" }
+  }
+}
+provider "aws" {
+  alias = "west"
+  default_tags {
+    tags = { Env = "West", Team = "Ops" }
+  }
+}
+resource "aws_sqs_queue" "default" {
+  name = "default"
+}
+resource "aws_sqs_queue" "west" {
+  provider = aws.west
+  name     = "west"
+  tags     = { Team = "Dev" }
+}
+        """)
+    policy_env.write_policy(
+        {
+            "name": "check-tags",
+            "resource": "terraform.aws_sqs_queue",
+            "filters": [{"tag:Env": "present"}],
+        }
+    )
+    results = policy_env.run()
+    assert {r.resource["name"]: r.resource["tags"] for r in results} == {
+        "default": {"Env": "Default"},
+        "west": {"Env": "West", "Team": "Dev"},
+    }
+
+
+def test_graph_indexes(policy_env):
+    policy_env.write_tf("""
+resource "aws_sqs_queue" "queue" {
+  name = "queue"
+}
+resource "aws_sns_topic" "topic" {
+  name = aws_sqs_queue.queue.name
+}
+data "aws_sqs_queue" "queue" {
+  name = "queue"
+}
+        """)
+    graph = policy_env.get_graph()
+    index = graph.get_type_index()
+    assert {"aws_sqs_queue", "data.aws_sqs_queue", "aws_sns_topic"}.issubset(index)
+    assert dict(graph.get_resources_by_type("data.aws_sqs_queue")) == {
+        "data.aws_sqs_queue": index["data.aws_sqs_queue"]
+    }
+    # resources are wrapped once, but lists are fresh for each caller
+    ((_, queues),) = graph.get_resources_by_type("aws_sqs_queue")
+    assert queues is not index["aws_sqs_queue"]
+    assert queues[0] is index["aws_sqs_queue"][0]
+    assert graph.as_resource("aws_sqs_queue.queue", graph.resource_data["aws_sqs_queue"][0]) is (
+        queues[0]
+    )
+
+    (topic,) = index["aws_sns_topic"]
+    assert [r["__tfmeta"]["path"] for r in graph.get_refs(topic, "aws_sqs_queue")] == [
+        "aws_sqs_queue.queue"
+    ]
+    assert [r["__tfmeta"]["path"] for r in graph.get_refs(queues[0], "aws_sns_topic")] == [
+        "aws_sns_topic.topic"
+    ]
+    assert list(graph.get_refs(topic, "aws_s3_bucket")) == []
+
+
 def test_value_tag_prefix(policy_env):
     policy_env.write_tf("""
 locals {
@@ -1362,6 +1560,65 @@ def test_multi_resource_glob_policy(tmp_path):
     assert len(data["results"]) == 2
 
 
+def test_cli_run_parallel(tmp_path):
+    (tmp_path / "policies").mkdir()
+    (tmp_path / "policies" / "policy.json").write_text(
+        json.dumps(
+            {
+                "policies": [
+                    {"name": "check-wild", "resource": "terraform.aws_*"},
+                    {"name": "check-lambda", "resource": "terraform.aws_lambda_function"},
+                    {"name": "check-bucket", "resource": "terraform.aws_s3_bucket"},
+                ]
+            }
+        )
+    )
+
+    def run(jobs):
+        output = tmp_path / ("output-%d.json" % jobs)
+        result = CliRunner().invoke(
+            cli.cli,
+            [
+                "run",
+                "-p",
+                str(tmp_path / "policies"),
+                "-d",
+                str(terraform_dir / "aws_lambda_check_permissions"),
+                "-o",
+                "json",
+                "--output-file",
+                str(output),
+                "-j",
+                str(jobs),
+            ],
+        )
+        assert result.exit_code == 1
+        return [
+            (r["policy"]["name"], r["resource"]["__tfmeta"]["path"])
+            for r in json.loads(output.read_text())["results"]
+        ]
+
+    serial = run(1)
+    assert len(serial) == 3
+    assert run(2) == serial
+
+
+def test_runner_type_policies():
+    policies = [
+        Bag(name="wild", resource_type="terraform.aws_*"),
+        Bag(name="lambda", resource_type="terraform.aws_lambda_function"),
+        Bag(name="multi", resource_type=["terraform.aws_alb", "terraform.aws_lb"]),
+    ]
+    runner = core.CollectionRunner(policies, Config.empty(), None)
+    assert [p.name for p in runner.get_type_policies("aws_lb")] == ["wild", "multi"]
+    assert [p.name for p in runner.get_type_policies("aws_lambda_function")] == [
+        "wild",
+        "lambda",
+    ]
+    assert runner.get_type_policies("google_compute_instance") == []
+    assert set(runner.type_policies) == {"aws_lb", "aws_lambda_function", "google_compute_instance"}
+
+
 def write_output_test_policy(tmp_path, policy=None, policy_path="policy.json"):
     policies = (
         policy
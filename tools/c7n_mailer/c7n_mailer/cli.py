@@ -124,6 +124,7 @@ CONFIG_SCHEMA = {
         "email_base_url": {"type": "string"},
         # Mailer Infrastructure Config
         "cache_engine": {"type": "string"},
+        "templates_cache_dir": {"type": "string"},
         "smtp_server": {"type": "string"},
         "smtp_port": {"type": "integer"},
         "smtp_ssl": {"type": "boolean"},
@@ -259,6 +260,12 @@ def main():
     if args_dict.get("run"):
         max_num_processes = args_dict.get("max_num_processes")
 
+        if mailer_config.get("templates_cache_dir"):
+            count = utils.compile_templates(
+                mailer_config["templates_folders"], logger, mailer_config["templates_cache_dir"]
+            )
+            logger.info("Compiled %d templates", count)
+
         # Select correct processor
         processor = get_processor(mailer_config, logger)
 
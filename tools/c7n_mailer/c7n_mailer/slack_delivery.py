@@ -30,6 +30,8 @@ class SlackDelivery:
         resource_list = copy.deepcopy(sqs_message["resources"])
 
         slack_messages = {}
+        # targets receiving the same resources share a rendering
+        rendered = {}
 
         # Check for Slack targets in 'to' action and render appropriate template.
         for target in sqs_message.get("action", ()).get("to", []):
@@ -52,6 +54,7 @@ class SlackDelivery:
                             "slack_template",
                             "slack_default",
                             self.config["templates_folders"],
+                            rendered=rendered,
                         )
                 self.logger.debug(
                     "Generating messages for recipient list produced by resource owner resolution."
@@ -65,6 +68,7 @@ class SlackDelivery:
                     "slack_template",
                     "slack_default",
                     self.config["templates_folders"],
+                    rendered=rendered,
                 )
             elif target.startswith("slack://webhook/#") and self.config.get("slack_webhook"):
                 webhook_target = self.config.get("slack_webhook")
@@ -76,6 +80,7 @@ class SlackDelivery:
                     "slack_template",
                     "slack_default",
                     self.config["templates_folders"],
+                    rendered=rendered,
                 )
                 self.logger.debug(
                     "Generating message for webhook %s." % self.config.get("slack_webhook")
@@ -91,6 +96,7 @@ class SlackDelivery:
                         "slack_template",
                         "slack_default",
                         self.config["templates_folders"],
+                        rendered=rendered,
                     )
             elif target.startswith("slack://#"):
                 resolved_addrs = target.split("slack://#", 1)[1]
@@ -102,6 +108,7 @@ class SlackDelivery:
                     "slack_template",
                     "slack_default",
                     self.config["templates_folders"],
+                    rendered=rendered,
                 )
             elif target.startswith("slack://tag/") and "Tags" in resource_list[0]:
                 tag_name = target.split("tag/", 1)[1]
@@ -130,6 +137,7 @@ class SlackDelivery:
                     "slack_template",
                     "slack_default",
                     self.config["templates_folders"],
+                    rendered=rendered,
                 )
                 self.logger.debug("Generating message for specified Slack channel.")
         return slack_messages
@@ -27,7 +27,9 @@ class SnsDelivery:
                 sns_addresses.append(target)
         return sns_addresses
 
-    def get_sns_message_package(self, sqs_message, policy_sns_address, subject, resources):
+    def get_sns_message_package(
+        self, sqs_message, policy_sns_address, subject, resources, rendered=None
+    ):
         rendered_jinja_body = get_rendered_jinja(
             policy_sns_address,
             sqs_message,
@@ -36,6 +38,7 @@ class SnsDelivery:
             "template",
             "default",
             self.config["templates_folders"],
+            rendered=rendered,
         )
         return {"topic": policy_sns_address, "subject": subject, "sns_message": rendered_jinja_body}
 
@@ -43,11 +46,13 @@ class SnsDelivery:
         sns_to_resources_map = self.get_sns_addrs_to_resources_map(sqs_message)
         subject = get_message_subject(sqs_message)
         sns_addrs_to_rendered_jinja_messages = []
+        # topics in the to field all receive the message's resources
+        rendered = {}
         # take the map with lists of resources, and jinja render them and add them
         # to sns_addrs_to_rendered_jinja_messages as an sns_message package
         for sns_topic, resources in sns_to_resources_map.items():
             sns_addrs_to_rendered_jinja_messages.append(
-                self.get_sns_message_package(sqs_message, sns_topic, subject, resources)
+                self.get_sns_message_package(sqs_message, sns_topic, subject, resources, rendered)
             )
 
         if sns_addrs_to_rendered_jinja_messages == []:
@@ -4,13 +4,32 @@
 SQS Message Processing
 ===============
 
+Messages are received in batches of ten, with the next batch prefetched
+while the current one is processed. Messages are deleted in batches once
+they have been delivered, undelivered messages become visible again on
+the queue for a later retry.
+
+Received messages are held until they are deleted or have failed, and
+the visibility of any held message halfway through the queue's
+visibility timeout is extended, so messages waiting to be processed or
+still in flight aren't received again.
+
+In parallel mode messages are delivered by a bounded pool of worker
+processes.
 """
 
 import base64
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 import json
 import logging
+import queue
+import threading
+import time
 import zlib
 
+from botocore.exceptions import ClientError
+
 from c7n_mailer.target import MessageTargetMixin
 
 DATA_MESSAGE = "maidmsg/1.0"
@@ -20,41 +39,184 @@ class MailerSqsQueueIterator:
     # Copied from custodian to avoid runtime library dependency
     msg_attributes = ["sequence_id", "op", "ser"]
 
-    def __init__(self, aws_sqs, queue_url, logger, limit=0, timeout=10):
+    # maximum number of messages per sqs receive and batch call
+    batch_size = 10
+    # the sqs default, assumed when the queue's timeout can't be read
+    default_visibility_timeout = 30
+
+    def __init__(
+        self,
+        aws_sqs,
+        queue_url,
+        logger,
+        limit=0,
+        timeout=10,
+        prefetch=0,
+        visibility_timeout=None,
+    ):
         self.aws_sqs = aws_sqs
         self.queue_url = queue_url
         self.limit = limit
         self.logger = logger
         self.timeout = timeout
+        self.prefetch = prefetch
+        self.visibility_timeout = visibility_timeout
         self.messages = []
+        self.acks = []
+        self.metrics = Counter()
+        self.batches = None
+        self.received_all = False
+        # receipt handle -> [message, time its visibility is next extended]
+        self.held = {}
+        self.lock = threading.Lock()
 
     # this and the next function make this object iterable with a for loop
     def __iter__(self):
         return self
 
     def __next__(self):
+        self.extend_expiring()
+        if self.messages:
+            return self.messages.pop(0)
+        if self.prefetch:
+            msgs = self.get_prefetched()
+        else:
+            msgs = self.receive()
+        self.messages.extend(msgs)
         if self.messages:
             return self.messages.pop(0)
+        raise StopIteration()
+
+    next = __next__  # python2.7
+
+    def get_visibility_timeout(self):
+        if self.visibility_timeout is not None:
+            return self.visibility_timeout
+        try:
+            response = self.aws_sqs.get_queue_attributes(
+                QueueUrl=self.queue_url, AttributeNames=["VisibilityTimeout"]
+            )
+            self.visibility_timeout = int(response["Attributes"]["VisibilityTimeout"])
+        except ClientError as e:
+            self.logger.warning(
+                "Unable to get queue visibility timeout, assuming %ds error:%s",
+                self.default_visibility_timeout,
+                e,
+            )
+            self.visibility_timeout = self.default_visibility_timeout
+        return self.visibility_timeout
+
+    def receive(self):
+        extend_at = time.time() + self.get_visibility_timeout() / 2
         response = self.aws_sqs.receive_message(
             QueueUrl=self.queue_url,
             WaitTimeSeconds=self.timeout,
-            MaxNumberOfMessages=3,
+            MaxNumberOfMessages=self.batch_size,
             MessageAttributeNames=self.msg_attributes,
             AttributeNames=["SentTimestamp"],
         )
-
         msgs = response.get("Messages", [])
+        with self.lock:
+            for m in msgs:
+                self.held[m["ReceiptHandle"]] = [m, extend_at]
         self.logger.debug("Messages received %d", len(msgs))
-        for m in msgs:
-            self.messages.append(m)
-        if self.messages:
-            return self.messages.pop(0)
-        raise StopIteration()
+        self.metrics["received"] += len(msgs)
+        return msgs
 
-    next = __next__  # python2.7
+    def get_prefetched(self):
+        """Get the next batch from a thread receiving up to ``prefetch`` batches ahead."""
+        if self.batches is None:
+            self.batches = queue.Queue()
+            # batches the thread may receive ahead of the consumer
+            self.slots = threading.Semaphore(self.prefetch)
+            threading.Thread(target=self.receive_batches, daemon=True).start()
+        elif self.received_all:
+            return []
+        msgs = self.batches.get()
+        self.slots.release()
+        if isinstance(msgs, Exception):
+            self.received_all = True
+            raise msgs
+        self.received_all = not msgs
+        return msgs
+
+    def receive_batches(self):
+        msgs = True
+        while msgs:
+            self.slots.acquire()
+            try:
+                msgs = self.receive()
+            except Exception as e:
+                msgs = None
+                self.batches.put(e)
+            else:
+                self.batches.put(msgs)
 
     def ack(self, m):
-        self.aws_sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=m["ReceiptHandle"])
+        """Delete a delivered message, deletes are sent in batches."""
+        self.acks.append(m)
+        if len(self.acks) >= self.batch_size:
+            self.flush()
+
+    def release(self, m):
+        """Stop extending a failed message, it's received again once visible."""
+        with self.lock:
+            self.held.pop(m["ReceiptHandle"], None)
+
+    def flush(self):
+        while self.acks:
+            batch, self.acks = self.acks[: self.batch_size], self.acks[self.batch_size :]
+            response = self.aws_sqs.delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {"Id": str(idx), "ReceiptHandle": m["ReceiptHandle"]}
+                    for idx, m in enumerate(batch)
+                ],
+            )
+            failed = response.get("Failed", ())
+            for f in failed:
+                self.logger.warning(
+                    "Unable to delete message:%s error:%s",
+                    batch[int(f["Id"])]["MessageId"],
+                    f.get("Message", f.get("Code")),
+                )
+            self.metrics["acked"] += len(batch) - len(failed)
+            with self.lock:
+                for m in batch:
+                    self.held.pop(m["ReceiptHandle"], None)
+
+    def extend_expiring(self):
+        """Extend the visibility of held messages halfway through their timeout."""
+        now = time.time()
+        with self.lock:
+            expiring = [entry for entry in self.held.values() if entry[1] <= now]
+            for entry in expiring:
+                entry[1] = now + self.visibility_timeout / 2
+        if expiring:
+            self.extend_visibility([m for m, _ in expiring], self.visibility_timeout)
+
+    def extend_visibility(self, messages, timeout):
+        """Extend the visibility timeout of messages still being processed."""
+        for idx in range(0, len(messages), self.batch_size):
+            batch = messages[idx : idx + self.batch_size]
+            response = self.aws_sqs.change_message_visibility_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {
+                        "Id": str(i),
+                        "ReceiptHandle": m["ReceiptHandle"],
+                        "VisibilityTimeout": timeout,
+                    }
+                    for i, m in enumerate(batch)
+                ],
+            )
+            for f in response.get("Failed", ()):
+                self.logger.warning(
+                    "Unable to extend visibility of message:%s error:%s",
+                    batch[int(f["Id"])]["MessageId"],
+                    f.get("Message", f.get("Code")),
+                )
+            self.metrics["extended"] += len(batch)
 
 
 class MailerSqsQueueProcessor(MessageTargetMixin):
@@ -89,38 +251,98 @@ class MailerSqsQueueProcessor(MessageTargetMixin):
     def run(self, parallel=False):
         self.logger.info("Downloading messages from the SQS queue.")
         aws_sqs = self.session.client("sqs", endpoint_url=self.endpoint_url)
-        sqs_messages = MailerSqsQueueIterator(aws_sqs, self.receive_queue, self.logger)
+        sqs_messages = MailerSqsQueueIterator(aws_sqs, self.receive_queue, self.logger, prefetch=1)
+        sqs_messages.get_visibility_timeout()
 
         sqs_messages.msg_attributes = ["mtype", "recipient"]
+        self.metrics = sqs_messages.metrics
+        started = time.time()
         # lambda doesn't support multiprocessing, so we don't instantiate any mp stuff
         # unless it's being run from CLI on a normal system with SHM
-        if parallel:
-            import multiprocessing
-
-            process_pool = multiprocessing.Pool(processes=self.max_num_processes)
-        for sqs_message in sqs_messages:
-            self.logger.debug(
-                "Message id: %s received %s"
-                % (sqs_message["MessageId"], sqs_message.get("MessageAttributes", ""))
-            )
-            msg_kind = sqs_message.get("MessageAttributes", {}).get("mtype")
-            if msg_kind:
-                msg_kind = msg_kind["StringValue"]
-            if not msg_kind == DATA_MESSAGE:
-                warning_msg = "Unknown sqs_message or sns format %s" % (sqs_message["Body"][:50])
-                self.logger.warning(warning_msg)
+        try:
             if parallel:
-                process_pool.apply_async(self.process_sqs_message, args=sqs_message)
+                self.run_parallel(sqs_messages)
             else:
-                self.process_sqs_message(sqs_message)
-            self.logger.debug("Processed sqs_message")
-            sqs_messages.ack(sqs_message)
-        if parallel:
-            process_pool.close()
-            process_pool.join()
+                for sqs_message in sqs_messages:
+                    self.check_message(sqs_message)
+                    try:
+                        self.process_sqs_message(sqs_message)
+                    except Exception:
+                        self.logger.exception(
+                            "Error processing message:%s", sqs_message["MessageId"]
+                        )
+                        self.on_processed(sqs_messages, sqs_message, False)
+                    else:
+                        self.on_processed(sqs_messages, sqs_message, True)
+        finally:
+            sqs_messages.flush()
+        elapsed = time.time() - started
+        self.logger.info(
+            "Delivered %d of %d sqs_messages (%d failed) in %0.2fs, %0.1f messages/s",
+            self.metrics["delivered"],
+            self.metrics["received"],
+            self.metrics["failed"],
+            elapsed,
+            self.metrics["delivered"] / elapsed if elapsed else 0,
+        )
         self.logger.info("No sqs_messages left on the queue, exiting c7n_mailer.")
         return
 
+    def run_parallel(self, sqs_messages):
+        in_flight = {}
+        max_in_flight = self.max_num_processes * 2
+        with ProcessPoolExecutor(
+            self.max_num_processes,
+            initializer=_init_worker,
+            initargs=(self.config, self.logger.name),
+        ) as executor:
+            for sqs_message in sqs_messages:
+                self.check_message(sqs_message)
+                in_flight[executor.submit(_process_message, sqs_message)] = sqs_message
+                while len(in_flight) >= max_in_flight:
+                    self.wait_in_flight(sqs_messages, in_flight)
+            while in_flight:
+                self.wait_in_flight(sqs_messages, in_flight)
+
+    def wait_in_flight(self, sqs_messages, in_flight):
+        """Wait on in flight messages, acking delivered and extending held ones."""
+        done, _ = wait(
+            in_flight,
+            timeout=sqs_messages.get_visibility_timeout() / 4,
+            return_when=FIRST_COMPLETED,
+        )
+        for f in done:
+            sqs_message = in_flight.pop(f)
+            error = f.exception()
+            if error is not None:
+                self.logger.error(
+                    "Error processing message:%s error:%s", sqs_message["MessageId"], error
+                )
+            self.on_processed(sqs_messages, sqs_message, error is None)
+        sqs_messages.extend_expiring()
+
+    def check_message(self, sqs_message):
+        self.logger.debug(
+            "Message id: %s received %s"
+            % (sqs_message["MessageId"], sqs_message.get("MessageAttributes", ""))
+        )
+        msg_kind = sqs_message.get("MessageAttributes", {}).get("mtype")
+        if msg_kind:
+            msg_kind = msg_kind["StringValue"]
+        if not msg_kind == DATA_MESSAGE:
+            warning_msg = "Unknown sqs_message or sns format %s" % (sqs_message["Body"][:50])
+            self.logger.warning(warning_msg)
+
+    def on_processed(self, sqs_messages, sqs_message, delivered):
+        if not delivered:
+            # left on the queue to be retried once its visibility timeout expires
+            self.metrics["failed"] += 1
+            sqs_messages.release(sqs_message)
+            return
+        self.logger.debug("Processed sqs_message")
+        self.metrics["delivered"] += 1
+        sqs_messages.ack(sqs_message)
+
     # This function when processing sqs messages will only deliver messages over email or sns
     # If you explicitly declare which tags are aws_usernames (synonymous with ldap uids)
     # in the ldap_uid_tags section of your mailer.yml, we'll do a lookup of those emails
@@ -151,3 +373,22 @@ class MailerSqsQueueProcessor(MessageTargetMixin):
             email_delivery=True,
             sns_delivery=True,
         )
+
+
+# the queue processor of a parallel run's worker process
+_worker_processor = None
+
+
+def _init_worker(config, logger_name):
+    global _worker_processor
+    from c7n_mailer.utils import get_jinja_env, session_factory
+
+    # load templates compiled at startup rather than compiling them per worker
+    get_jinja_env(config["templates_folders"], config.get("templates_cache_dir"))
+    _worker_processor = MailerSqsQueueProcessor(
+        config, session_factory(config), logging.getLogger(logger_name)
+    )
+
+
+def _process_message(sqs_message):
+    _worker_processor.process_sqs_message(sqs_message)
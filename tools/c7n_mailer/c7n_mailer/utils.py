@@ -11,6 +11,7 @@ import yaml
 import jmespath
 
 import jinja2
+import jinja2.meta
 from dateutil import parser
 from dateutil.tz import gettz, tzutc
 
@@ -60,7 +61,31 @@ def get_processor(mailer_config, logger):
     return processor
 
 
-def get_jinja_env(template_folders):
+# jinja environments by template folders, shared for the life of the process
+_jinja_envs = {}
+# template variables by environment and template name
+_template_variables = {}
+
+
+def get_jinja_env(template_folders, cache_dir=None):
+    """Get the jinja environment for a set of template folders.
+
+    Environments are shared across renders, so templates are compiled
+    once and recompiled only when their file's mtime changes. With a
+    cache_dir compiled templates are also persisted as bytecode, which
+    other mailer processes load instead of compiling the sources.
+    """
+    key = tuple(template_folders)
+    env = _jinja_envs.get(key)
+    if env is None:
+        env = _jinja_envs[key] = create_jinja_env(template_folders)
+    if cache_dir and env.bytecode_cache is None:
+        os.makedirs(cache_dir, exist_ok=True)
+        env.bytecode_cache = jinja2.FileSystemBytecodeCache(cache_dir)
+    return env
+
+
+def create_jinja_env(template_folders):
     env = jinja2.Environment(trim_blocks=True, autoescape=False)  # nosec nosemgrep
     env.filters["yaml_safe"] = functools.partial(yaml.safe_dump, default_flow_style=False)
     env.filters["date_time_format"] = date_time_format
@@ -76,9 +101,63 @@ def get_jinja_env(template_folders):
     return env
 
 
+def compile_templates(template_folders, logger, cache_dir=None):
+    """Compile the templates in the template folders ahead of rendering.
+
+    Returns the number of templates compiled, templates which fail to
+    compile are logged and reported again when rendered.
+    """
+    env = get_jinja_env(template_folders, cache_dir)
+    compiled = set()
+    for d in template_folders:
+        if not d or not os.path.isdir(d):
+            continue
+        for t in sorted(f for f in os.listdir(d) if os.path.splitext(f)[1] == ".j2"):
+            if t in compiled:
+                continue
+            try:
+                env.get_template(t)
+            except jinja2.TemplateError as e:
+                logger.warning("Invalid template %s\n%s" % (os.path.join(d, t), e))
+                continue
+            compiled.add(t)
+    return len(compiled)
+
+
+def get_template_variables(env, template):
+    """Get the context variables a template references.
+
+    Returns None when they can't be determined, ie. when the template
+    includes, imports or extends other templates.
+    """
+    key = (id(env), template.name)
+    cached = _template_variables.get(key)
+    if cached and cached[0] is template:
+        return cached[1]
+    ast = env.parse(env.loader.get_source(env, template.name)[0])
+    variables = None
+    if not list(jinja2.meta.find_referenced_templates(ast)):
+        variables = jinja2.meta.find_undeclared_variables(ast)
+    _template_variables[key] = (template, variables)
+    return variables
+
+
 def get_rendered_jinja(
-    target, sqs_message, resources, logger, specified_template, default_template, template_folders
+    target,
+    sqs_message,
+    resources,
+    logger,
+    specified_template,
+    default_template,
+    template_folders,
+    rendered=None,
 ):
+    """Render a message template for a target.
+
+    Callers delivering a message to several targets may pass a rendered
+    dict, which is used to render templates not referencing the recipient
+    once per set of resources. It should not outlive the message.
+    """
     env = get_jinja_env(template_folders)
     mail_template = sqs_message["action"].get(specified_template, default_template)
     if not os.path.isabs(mail_template):
@@ -89,6 +168,14 @@ def get_rendered_jinja(
         logger.error("Invalid template reference %s\n%s" % (mail_template, error_msg))
         return
 
+    render_key = None
+    if rendered is not None:
+        variables = get_template_variables(env, template)
+        if variables is not None and "recipient" not in variables:
+            render_key = (mail_template, id(resources))
+            if render_key in rendered:
+                return rendered[render_key][1]
+
     # recast seconds since epoch as utc iso datestring, template
     # authors can use date_time_format helper func to convert local
     # tz. if no execution start time was passed use current time.
@@ -109,6 +196,9 @@ def get_rendered_jinja(
         execution_start=execution_start,
         region=sqs_message.get("region", ""),
     )
+    if render_key:
+        # keep the resources referenced so their id isn't reused
+        rendered[render_key] = (resources, rendered_jinja)
     return rendered_jinja
 
 
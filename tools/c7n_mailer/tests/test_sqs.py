@@ -0,0 +1,142 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+from concurrent.futures import Future
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from botocore.exceptions import ClientError
+from c7n_mailer.sqs_queue_processor import MailerSqsQueueIterator, MailerSqsQueueProcessor
+from common import MAILER_CONFIG, logger
+
+
+class FakeSqs:
+    def __init__(self, count, visibility_timeout=30):
+        self.visibility_timeout = visibility_timeout
+        self.messages = [
+            {"MessageId": str(i), "ReceiptHandle": "handle-%d" % i, "Body": "{}"}
+            for i in range(count)
+        ]
+        self.receives = []
+        self.deletes = []
+        self.extends = []
+
+    def get_queue_attributes(self, QueueUrl, AttributeNames):
+        return {"Attributes": {"VisibilityTimeout": str(self.visibility_timeout)}}
+
+    def receive_message(self, **kw):
+        self.receives.append(kw)
+        batch = self.messages[: kw["MaxNumberOfMessages"]]
+        self.messages = self.messages[len(batch) :]
+        return {"Messages": batch}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        self.deletes.append([e["ReceiptHandle"] for e in Entries])
+        return {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+    def change_message_visibility_batch(self, QueueUrl, Entries):
+        self.extends.append([(e["ReceiptHandle"], e["VisibilityTimeout"]) for e in Entries])
+        return {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+
+class SqsQueueIteratorTest(unittest.TestCase):
+    def test_iterator_batches(self):
+        sqs = FakeSqs(23)
+        messages = MailerSqsQueueIterator(sqs, "queue", logger, prefetch=1)
+        received = []
+        for m in messages:
+            received.append(m["MessageId"])
+            messages.ack(m)
+        messages.flush()
+
+        self.assertEqual(received, [str(i) for i in range(23)])
+        self.assertEqual([r["MaxNumberOfMessages"] for r in sqs.receives], [10, 10, 10, 10])
+        self.assertEqual([len(d) for d in sqs.deletes], [10, 10, 3])
+        self.assertEqual(messages.metrics, {"received": 23, "acked": 23})
+        self.assertEqual(messages.held, {})
+        self.assertRaises(StopIteration, next, messages)
+
+    def test_prefetch_depth(self):
+        sqs = FakeSqs(50)
+        messages = MailerSqsQueueIterator(sqs, "queue", logger, prefetch=1)
+        next(messages)
+        # wait on the prefetching thread to block
+        for _ in range(100):
+            if len(messages.held) >= 20:
+                break
+            time.sleep(0.01)
+        time.sleep(0.05)
+        # the batch being processed and one batch ahead
+        self.assertEqual(messages.metrics["received"], 20)
+        self.assertEqual(messages.get_visibility_timeout(), 30)
+
+    def test_visibility_timeout_denied(self):
+        sqs = FakeSqs(1)
+        sqs.get_queue_attributes = Mock(
+            side_effect=ClientError({"Error": {"Code": "AccessDenied"}}, "GetQueueAttributes")
+        )
+        messages = MailerSqsQueueIterator(sqs, "queue", logger)
+        self.assertEqual(messages.get_visibility_timeout(), 30)
+        self.assertEqual(messages.get_visibility_timeout(), 30)
+        self.assertEqual(sqs.get_queue_attributes.call_count, 1)
+
+    def test_extend_visibility(self):
+        sqs = FakeSqs(12)
+        messages = MailerSqsQueueIterator(sqs, "queue", logger)
+        messages.extend_visibility(sqs.messages, 300)
+        self.assertEqual([len(e) for e in sqs.extends], [10, 2])
+        self.assertEqual(sqs.extends[0][0], ("handle-0", 300))
+
+
+class SqsQueueProcessorTest(unittest.TestCase):
+    def get_processor(self, sqs):
+        return MailerSqsQueueProcessor(MAILER_CONFIG, Mock(client=Mock(return_value=sqs)), logger)
+
+    def test_run_acks_delivered(self):
+        sqs = FakeSqs(12)
+        processor = self.get_processor(sqs)
+
+        def process(message):
+            if message["MessageId"] == "3":
+                raise ValueError("undeliverable")
+
+        with patch.object(processor, "process_sqs_message", side_effect=process):
+            processor.run()
+
+        deleted = [h for batch in sqs.deletes for h in batch]
+        self.assertEqual(len(deleted), 11)
+        self.assertNotIn("handle-3", deleted)
+        self.assertEqual(processor.metrics["delivered"], 11)
+        self.assertEqual(processor.metrics["failed"], 1)
+
+    def test_run_extends_held(self):
+        sqs = FakeSqs(12, visibility_timeout=0)
+        processor = self.get_processor(sqs)
+        with patch.object(processor, "process_sqs_message"):
+            processor.run()
+        extended = {h for batch in sqs.extends for h, _ in batch}
+        # prefetched messages are extended while waiting to be processed
+        self.assertIn("handle-11", extended)
+        self.assertEqual(processor.metrics["delivered"], 12)
+
+    def test_wait_in_flight_extends_visibility(self):
+        sqs = FakeSqs(3, visibility_timeout=120)
+        processor = self.get_processor(sqs)
+        messages = MailerSqsQueueIterator(sqs, "queue", logger)
+        processor.metrics = messages.metrics
+        delivered, slow, queued = messages.receive()
+        messages.held["handle-1"][1] = messages.held["handle-2"][1] = time.time() - 1
+
+        done = Future()
+        done.set_result(None)
+        in_flight = {done: delivered, Future(): slow}
+        processor.wait_in_flight(messages, in_flight)
+        messages.flush()
+
+        self.assertEqual(len(in_flight), 1)
+        self.assertEqual(sqs.deletes, [["handle-0"]])
+        # messages in flight and those not yet submitted are extended
+        self.assertEqual(sqs.extends, [[("handle-1", 120), ("handle-2", 120)]])
+        # the next extension is due halfway through the extended timeout
+        self.assertGreater(messages.held["handle-1"][1], time.time() + 50)
+        self.assertNotIn("handle-0", messages.held)
@@ -6,6 +6,7 @@ import builtins
 from datetime import datetime
 from importlib import reload
 import os
+import tempfile
 from time import sleep
 import unittest
 import jinja2
@@ -386,6 +387,68 @@ class OtherTests(unittest.TestCase):
         )
         self.assertIsNotNone(body)
 
+    def test_get_jinja_env_reloads_templates(self):
+        with tempfile.TemporaryDirectory() as d:
+            template_path = os.path.join(d, "notice.j2")
+            with open(template_path, "w") as fh:
+                fh.write("one")
+            env = utils.get_jinja_env([d])
+            self.assertIs(env, utils.get_jinja_env([d]))
+            self.assertEqual(env.get_template("notice.j2").render(), "one")
+
+            with open(template_path, "w") as fh:
+                fh.write("two")
+            mtime = os.path.getmtime(template_path) + 10
+            os.utime(template_path, (mtime, mtime))
+            self.assertEqual(env.get_template("notice.j2").render(), "two")
+
+    def test_compile_templates(self):
+        with tempfile.TemporaryDirectory() as d:
+            for name, source in (
+                ("a.j2", "{{ policy.name }}"),
+                ("b.html.j2", "<p>{{ account }}</p>"),
+                ("invalid.j2", "{% if %}"),
+                ("notes.txt", "not a template"),
+            ):
+                with open(os.path.join(d, name), "w") as fh:
+                    fh.write(source)
+            cache_dir = os.path.join(d, "cache")
+            log = Mock()
+            self.assertEqual(utils.compile_templates([d, ""], log, cache_dir), 2)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+            log.warning.assert_called_once()
+
+    def test_get_rendered_jinja_reuse(self):
+        with tempfile.TemporaryDirectory() as d:
+            for name, source in (
+                ("shared.j2", "{{ resources|length }} {{ policy.name }}"),
+                ("personal.j2", "{{ recipient }} {{ resources|length }}"),
+            ):
+                with open(os.path.join(d, name), "w") as fh:
+                    fh.write(source)
+            message = {"action": {"template": "shared"}, "policy": {"name": "test"}}
+            rendered = {}
+            resources = [RESOURCE_1]
+            bodies = [
+                utils.get_rendered_jinja(
+                    target, message, resources, Mock(), "template", "default", [d], rendered
+                )
+                for target in ("a@example.com", "b@example.com")
+            ]
+            self.assertEqual(bodies, ["1 test", "1 test"])
+            self.assertEqual(len(rendered), 1)
+
+            message["action"]["template"] = "personal"
+            rendered = {}
+            bodies = [
+                utils.get_rendered_jinja(
+                    target, message, resources, Mock(), "template", "default", [d], rendered
+                )
+                for target in ("a@example.com", "b@example.com")
+            ]
+            self.assertEqual(bodies, ["a@example.com 1", "b@example.com 1"])
+            self.assertEqual(rendered, {})
+
     def test_get_date_age(self):
         now = datetime.utcnow().isoformat() + "Z"
         sleep(1.0)
@@ -14,6 +14,7 @@ import sys
 import shlex
 import re
 import copy
+import shutil
 
 import multiprocessing
 from concurrent.futures import (
@@ -44,10 +45,13 @@ from c7n.reports.csvout import (
 from c7n.resources import load_available, load_resources
 from c7n.schema import StructureParser
 from c7n.utils import (
-    CONN_CACHE, dumps, filter_empty, format_string_values, get_policy_provider, join_output_path)
+    CONN_CACHE, dumps, filter_empty, format_string_values, get_policy_provider, join_output_path,
+    reset_session_cache)
 
 from c7n_org.utils import environ, account_tags
 from c7n_org import orgaccounts
+from c7n_org.supervisor import (
+    CredentialBroker, Journal, Progress, UnitHistory, brokered_expiring, schedule)
 
 log = logging.getLogger('c7n_org')
 
@@ -508,8 +512,7 @@ def validate_basic(custodian_config, policy_file, fmt, check_mode, verbose):
 
     # Schema validation
     log.debug("Running schema validation")
-    schm = schema.generate()
-    errors = schema.validate(custodian_config, schm)
+    errors = schema.PolicyValidator().validate(custodian_config)
 
     # Check for duplicate policy names
     log.debug("Checking for duplicate policy names")
@@ -1197,9 +1200,27 @@ def _update(old, new):
     return old
 
 
+def reset_policy_output(output_path, policy_name):
+    """Remove a policy's partial local output from an interrupted run."""
+    if output_path.startswith('file://'):
+        output_path = output_path[len('file://'):]
+    if '://' in output_path or '{' in output_path:
+        return
+    shutil.rmtree(os.path.join(output_path, policy_name), ignore_errors=True)
+
+
 def run_account(account, region, policies_config, output_path,
-                cache_period, cache_path, metrics, dryrun, debug):
+                cache_period, cache_path, metrics, dryrun, debug, credentials=None,
+                journal=None, completed=None):
     """Execute a set of policies on an account.
+
+    Credentials brokered by the supervising process, if given, are used
+    instead of assuming the account's role, until they near expiry.
+
+    Completed policies are recorded in the journal if given. When
+    resuming, policies in completed (a mapping of policy name to
+    resource count) are skipped and the output of the others is reset
+    before they run.
     """
     logging.getLogger('custodian.output').setLevel(logging.ERROR + 1)
     CONN_CACHE.session = None
@@ -1218,7 +1239,9 @@ def run_account(account, region, policies_config, output_path,
 
     env_vars = account_tags(account)
 
-    if account.get('role'):
+    if credentials:
+        env_vars.update(credentials)
+    elif account.get('role'):
         if isinstance(account['role'], str):
             config['assume_role'] = account['role']
             config['external_id'] = account.get('external_id')
@@ -1239,17 +1262,26 @@ def run_account(account, region, policies_config, output_path,
 
     with environ(**env_vars):
         for p in policies:
+            if completed is not None:
+                if p.name in completed:
+                    policy_counts[p.name] = completed[p.name]
+                    continue
+                reset_policy_output(output_path, p.name)
             # Extend policy execution conditions with account information
             p.conditions.env_vars['account'] = account
             # Variable expansion and non schema validation (not optional)
             p.expand_variables(p.get_variables(account.get('vars', {})))
             p.validate()
+            if brokered_expiring(credentials):
+                credentials = renew_credentials(account, region, policies)
             log.debug(
                 "Running policy:%s account:%s region:%s",
                 p.name, account['name'], region)
             try:
                 resources = p.run()
                 policy_counts[p.name] = resources and len(resources) or 0
+                if journal is not None:
+                    journal.record(account, region, p.name, policy_counts[p.name])
                 if not resources:
                     continue
                 if not config.dryrun and p.execution_mode != 'pull':
@@ -1285,6 +1317,27 @@ def run_account(account, region, policies_config, output_path,
     return policy_counts, success
 
 
+def renew_credentials(account, region, policies):
+    """Stop using brokered credentials for the remaining policies.
+
+    Workers can't renew brokered credentials, so they assume the account
+    role themselves, with an auto refreshing session for a single role.
+    """
+    log.debug("Brokered credentials expiring account:%s region:%s", account['name'], region)
+    for k in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN',
+              'AWS_CREDENTIAL_EXPIRATION'):
+        os.environ.pop(k, None)
+    if isinstance(account['role'], str):
+        for p in policies:
+            p.session_factory.assume_role = account['role']
+            p.session_factory.external_id = account.get('external_id')
+    else:
+        os.environ.update(
+            _get_env_creds(account, get_session(account, 'custodian', region), region))
+    reset_session_cache()
+    return None
+
+
 def initialize_provider_output(policies_config, output_dir, regions):
     """allow the provider an opportunity to initialize the output config.
     """
@@ -1325,11 +1378,16 @@ def initialize_provider_output(policies_config, output_dir, regions):
 @click.option("--metrics", default=False, is_flag=True)
 @click.option("--metrics-uri", default=None, help="Configure provider metrics target")
 @click.option("--dryrun", default=False, is_flag=True)
+@click.option('--broker-credentials', default=False, is_flag=True,
+              help="Assume account roles once in the supervising process "
+              "and share the credentials with the account's region workers")
+@click.option('--resume', default=False, is_flag=True,
+              help="Skip policies completed by a previous interrupted run")
 @click.option('--debug', default=False, is_flag=True)
 @click.option('-v', '--verbose', default=False, help="Verbose", is_flag=True)
 def run(config, use, output_dir, accounts, not_accounts, tags, region,
         policy, policy_tags, cache_period, cache_path, metrics,
-        dryrun, debug, verbose, metrics_uri):
+        dryrun, debug, verbose, metrics_uri, broker_credentials, resume):
     """run a custodian policy across accounts"""
     accounts_config, custodian_config, executor = init(
         config, use, debug, verbose, accounts, tags, policy, policy_tags=policy_tags,
@@ -1352,25 +1410,70 @@ def run(config, use, output_dir, accounts, not_accounts, tags, region,
         if not os.path.exists(cache_path):
             os.makedirs(cache_path)
 
-    output_dir = initialize_provider_output(custodian_config, output_dir, region)
+    # share value documents (value_from, skip-days-from) between workers
+    value_cache_dir = os.environ.get(
+        'C7N_VALUE_CACHE_DIR', os.path.join(cache_path, 'values'))
 
-    with executor(max_workers=WORKER_COUNT) as w:
-        futures = {}
-        for a in accounts_config['accounts']:
-            for r in resolve_regions(region or a.get('regions', ()), a):
-                futures[w.submit(
-                    run_account,
-                    a, r,
-                    custodian_config,
-                    output_dir,
-                    cache_period,
-                    cache_path,
-                    metrics,
-                    dryrun,
-                    debug)] = (a, r)
+    output_dir = initialize_provider_output(custodian_config, output_dir, region)
 
-        for f in as_completed(futures):
-            a, r = futures[f]
+    units = [(a, r) for a in accounts_config['accounts']
+             for r in resolve_regions(region or a.get('regions', ()), a)]
+
+    journal = Journal.from_output(output_dir, cache_path)
+    completed = None
+    if resume:
+        completed = journal.load()
+        policy_names = {p['name'] for p in custodian_config['policies']}
+        remaining = []
+        for a, r in units:
+            unit_completed = completed.get((a['account_id'], r), {})
+            if not policy_names.issubset(unit_completed):
+                remaining.append((a, r))
+                continue
+            for p in policy_names:
+                policy_counts[p] += unit_completed[p]
+        log.info(
+            "Resuming run, %d of %d account regions completed",
+            len(units) - len(remaining), len(units))
+        units = remaining
+    else:
+        journal.reset()
+
+    history = UnitHistory(cache_path).load()
+    progress = Progress(len(units))
+    broker = broker_credentials and CredentialBroker(get_session) or None
+
+    def submit(w, unit):
+        a, r = unit
+        kw = {'journal': journal}
+        if completed is not None:
+            kw['completed'] = completed.get((a['account_id'], r), {})
+        if broker is not None:
+            try:
+                kw['credentials'] = broker.get_credentials(
+                    a, r, history.times.get(UnitHistory.get_key(a, r)))
+            except ClientError as e:
+                # the worker's own role assumption reports the failure
+                log.warning(
+                    "unable to broker credentials for account:%s error:%s", a['name'], e)
+        return w.submit(
+            run_account,
+            a, r,
+            custodian_config,
+            output_dir,
+            cache_period,
+            cache_path,
+            metrics,
+            dryrun,
+            debug,
+            **kw)
+
+    with environ(C7N_VALUE_CACHE_DIR=value_cache_dir), \
+            executor(max_workers=WORKER_COUNT) as w:
+        for f, (a, r), duration in schedule(
+                w, history.order(units), submit, WORKER_COUNT):
+            progress.update()
+            history.record(a, r, duration)
             if f.exception():
                 if debug:
                     raise
@@ -1386,6 +1489,9 @@ def run(config, use, output_dir, accounts, not_accounts, tags, region,
             if not account_region_success:
                 success = False
 
+    history.save()
+    if broker is not None:
+        log.debug("Brokered credentials with %d role assumptions", broker.assumed)
     log.info("Policy resource counts %s" % policy_counts)
 
     if not success:
@@ -0,0 +1,235 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""Scheduling of account region units of work for c7n-org runs.
+
+The supervising process orders units longest first using the run times
+recorded by previous runs, keeps just enough units in flight to occupy
+the worker pool, optionally brokers assumed role credentials for the
+workers, and reports progress and throughput as units complete.
+
+Workers record each completed policy in a checkpoint journal, which
+lets an interrupted run be resumed without repeating completed work.
+"""
+from concurrent.futures import FIRST_COMPLETED, wait
+from datetime import datetime, timedelta, timezone
+import hashlib
+import json
+import logging
+import os
+import time
+
+log = logging.getLogger('c7n_org')
+
+
+class CredentialBroker:
+    """Assume account roles in the supervising process on behalf of workers.
+
+    Credentials are shared by all of an account's regions and renewed
+    once less than ``refresh_ahead`` of their lifetime, beyond a unit's
+    expected run time, remains, so an account costs one role assumption
+    per renewal rather than one per region. Workers receive them as
+    environment credentials along with their expiration, and assume the
+    role themselves when a unit outlives them, see
+    :func:`brokered_expiring`.
+    """
+
+    refresh_ahead = timedelta(minutes=30)
+
+    def __init__(self, get_session, session_name='custodian'):
+        self.get_session = get_session
+        self.session_name = session_name
+        self.credentials = {}
+        self.assumed = 0
+
+    def get_credentials(self, account, region, runtime=None):
+        if account.get('provider') != 'aws' or not account.get('role'):
+            return None
+        roles = account['role']
+        key = (account['account_id'], isinstance(roles, str) and roles or tuple(roles))
+        cached = self.credentials.get(key)
+        lifetime = self.refresh_ahead + timedelta(seconds=runtime or 0)
+        if cached is None or cached[0] - datetime.now(timezone.utc) < lifetime:
+            session = self.get_session(account, self.session_name, region)
+            creds = session._session.get_credentials()
+            # botocore only exposes expiry on its refreshable credentials
+            expiry = getattr(creds, '_expiry_time', None) or (
+                datetime.now(timezone.utc) + self.refresh_ahead * 2)
+            frozen = creds.get_frozen_credentials()
+            cached = self.credentials[key] = (expiry, {
+                'AWS_ACCESS_KEY_ID': frozen.access_key,
+                'AWS_SECRET_ACCESS_KEY': frozen.secret_key,
+                'AWS_SESSION_TOKEN': frozen.token,
+                'AWS_CREDENTIAL_EXPIRATION': expiry.isoformat()})
+            self.assumed += 1
+        env = dict(cached[1])
+        env['AWS_DEFAULT_REGION'] = env['AWS_REGION'] = region
+        env['AWS_ACCOUNT_ID'] = account['account_id']
+        return env
+
+
+def brokered_expiring(credentials, ahead=CredentialBroker.refresh_ahead):
+    """Whether brokered credentials expire within ``ahead``.
+
+    Brokered credentials are static in the worker, which can't renew
+    them, so it checks before each policy whether to stop using them.
+    """
+    expiration = credentials and credentials.get('AWS_CREDENTIAL_EXPIRATION')
+    if not expiration:
+        return False
+    return datetime.fromisoformat(expiration) - datetime.now(timezone.utc) < ahead
+
+
+class UnitHistory:
+    """Run times of account region units recorded across runs."""
+
+    file_name = 'unit-times.json'
+
+    def __init__(self, cache_path):
+        self.path = os.path.join(cache_path, self.file_name)
+        self.times = {}
+
+    @staticmethod
+    def get_key(account, region):
+        return "%s:%s" % (account['account_id'], region)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path) as fh:
+                self.times = json.load(fh)
+        except ValueError:
+            log.warning("ignoring invalid unit history %s", self.path)
+        return self
+
+    def save(self):
+        tmp = "%s.%d" % (self.path, os.getpid())
+        with open(tmp, 'w') as fh:
+            json.dump(self.times, fh)
+        os.replace(tmp, self.path)
+
+    def record(self, account, region, duration):
+        self.times[self.get_key(account, region)] = round(duration, 2)
+
+    def order(self, units):
+        """Order units longest first, units without history first of all.
+
+        Starting the longest units first keeps the pool busy through the
+        tail of the run instead of waiting on a few large accounts.
+        """
+        return sorted(
+            units,
+            key=lambda u: -self.times.get(self.get_key(*u), float('inf')))
+
+
+class Journal:
+    """Checkpoint journal of completed (account, region, policy) units.
+
+    Entries are appended by workers as json lines, one per completed
+    policy, each small enough to be written atomically by concurrent
+    processes.
+    """
+
+    file_name = 'c7n-org-journal.jsonl'
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def from_output(cls, output_dir, cache_path):
+        """Journal in the output directory, or the cache path for remote outputs."""
+        if output_dir.startswith('file://'):
+            output_dir = output_dir[len('file://'):]
+        if '://' not in output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            return cls(os.path.join(output_dir, cls.file_name))
+        digest = hashlib.sha256(output_dir.encode('utf8')).hexdigest()[:16]
+        return cls(os.path.join(cache_path, "journal-%s.jsonl" % digest))
+
+    def reset(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def load(self):
+        """Map of (account id, region) to completed policy resource counts."""
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path) as fh:
+            lines = fh.readlines()
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # a partially written entry from an interrupted worker
+                continue
+            completed.setdefault(
+                (entry['account_id'], entry['region']), {})[entry['policy']] = entry['count']
+        if lines and not lines[-1].endswith('\n'):
+            # terminate the partial entry so new entries start on their own line
+            with open(self.path, 'a') as fh:
+                fh.write('\n')
+        return completed
+
+    def record(self, account, region, policy, count):
+        line = json.dumps({
+            'account_id': account['account_id'], 'region': region,
+            'policy': policy, 'count': count}) + "\n"
+        with open(self.path, 'a') as fh:
+            fh.write(line)
+
+
+class Progress:
+    """Periodic progress and throughput reporting."""
+
+    interval = 30
+
+    def __init__(self, total):
+        self.total = total
+        self.completed = 0
+        self.start = self.last = time.time()
+
+    def update(self, count=1):
+        self.completed += count
+        now = time.time()
+        if now - self.last < self.interval or self.completed >= self.total:
+            return
+        self.last = now
+        log.info(self.format(now))
+
+    def format(self, now):
+        elapsed = now - self.start
+        rate = self.completed / elapsed if elapsed else 0
+        remaining = rate and (self.total - self.completed) / rate or 0
+        return "Progress %d/%d units (%0.1f%%) %0.1f units/min eta:%s" % (
+            self.completed, self.total, self.completed * 100.0 / self.total,
+            rate * 60, timedelta(seconds=int(remaining)))
+
+
+def schedule(executor, units, submit, max_in_flight):
+    """Submit units as workers free up, yielding (future, unit, seconds)
+    as they complete.
+
+    Units are submitted lazily so anything resolved at submission, like
+    brokered credentials, is fresh when the unit starts.
+    """
+    units = iter(units)
+    pending = {}
+
+    def fill():
+        for unit in units:
+            started = time.time()
+            pending[submit(executor, unit)] = (unit, started)
+            if len(pending) >= max_in_flight:
+                break
+
+    fill()
+    while pending:
+        # the debug main thread executor's futures are complete on submission
+        done = [f for f in pending if f.done()]
+        if not done:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for f in done:
+            unit, started = pending.pop(f)
+            yield f, unit, time.time() - started
+        fill()
@@ -26,6 +26,6 @@ def environ(**kw):
         yield os.environ
     finally:
         for k in kw.keys():
-            del os.environ[k]
+            os.environ.pop(k, None)
         os.environ.update(current_env)
         reset_session_cache()
@@ -1,16 +1,20 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import copy
+from datetime import datetime, timedelta, timezone
 from unittest import mock
 import os
 
 import pytest
 import yaml
 
+from c7n.executor import MainThreadExecutor
 from c7n.testing import TestUtils
 from click.testing import CliRunner
 
 from c7n_org import cli as org
+from c7n_org.supervisor import (
+    CredentialBroker, Journal, UnitHistory, brokered_expiring, schedule)
 
 
 ACCOUNTS_AWS_DEFAULT = yaml.safe_dump({
@@ -346,6 +350,142 @@ class OrgTest(TestUtils):
             "Targeting accounts: 0, policies: 2. Nothing to do.",
         )
 
+    def test_cli_run_unit_history(self):
+        run_dir = self.setup_run_dir()
+        run_account = mock.MagicMock()
+        run_account.return_value = ({'compute': 1}, True)
+        self.patch(org, 'logging', mock.MagicMock())
+        self.patch(org, 'run_account', run_account)
+        self.change_cwd(run_dir)
+
+        history = UnitHistory('cache')
+        history.record({'account_id': '002244668899'}, 'us-west-2', 300)
+        history.save()
+
+        result = CliRunner().invoke(
+            org.cli,
+            ['run', '-c', 'accounts.yml', '-u', 'policies.yml',
+             '--debug', '-s', 'output', '--cache-path', 'cache'],
+            catch_exceptions=False)
+        self.assertEqual(result.exit_code, 0)
+        units = [(c.args[0]['name'], c.args[1]) for c in run_account.call_args_list]
+        # units without history go first, then longest first
+        self.assertEqual(units[-1], ('qa', 'us-west-2'))
+        self.assertEqual(len(units), 4)
+        self.assertEqual(len(UnitHistory('cache').load().times), 4)
+
+    def test_cli_run_resume(self):
+        run_dir = self.setup_run_dir()
+        run_account = mock.MagicMock()
+        run_account.return_value = ({'compute': 1, 'serverless': 2}, True)
+        self.patch(org, 'logging', mock.MagicMock())
+        self.patch(org, 'run_account', run_account)
+        self.change_cwd(run_dir)
+
+        journal = Journal.from_output('output', 'cache')
+        dev = {'account_id': '112233445566'}
+        journal.record(dev, 'us-east-1', 'compute', 5)
+        journal.record(dev, 'us-east-1', 'serverless', 7)
+        journal.record(dev, 'us-west-2', 'compute', 3)
+        with open(journal.path, 'a') as fh:
+            fh.write('{"account_id": "1122')
+
+        log_output = self.capture_logging('c7n_org')
+        result = CliRunner().invoke(
+            org.cli,
+            ['run', '-c', 'accounts.yml', '-u', 'policies.yml', '--resume',
+             '--debug', '-s', 'output', '--cache-path', 'cache'],
+            catch_exceptions=False)
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Resuming run, 1 of 4 account regions completed", log_output.getvalue())
+        self.assertIn(
+            "Policy resource counts Counter({'serverless': 13, 'compute': 8})",
+            log_output.getvalue())
+        units = {(c.args[0]['name'], c.args[1]): c.kwargs['completed']
+                 for c in run_account.call_args_list}
+        self.assertEqual(units, {
+            ('dev', 'us-west-2'): {'compute': 3},
+            ('qa', 'us-east-1'): {},
+            ('qa', 'us-west-2'): {}})
+
+        # a fresh run starts a new journal
+        result = CliRunner().invoke(
+            org.cli,
+            ['run', '-c', 'accounts.yml', '-u', 'policies.yml',
+             '--debug', '-s', 'output', '--cache-path', 'cache'],
+            catch_exceptions=False)
+        self.assertEqual(journal.load(), {})
+
+    def test_reset_policy_output(self):
+        output = self.get_temp_dir()
+        os.makedirs(os.path.join(output, 'compute'))
+        org.reset_policy_output(output, 'compute')
+        self.assertFalse(os.path.exists(os.path.join(output, 'compute')))
+        org.reset_policy_output('s3://bucket/prefix', 'compute')
+
+    def test_credential_broker(self):
+        sessions = []
+
+        def get_session(account, session_name, region):
+            session = mock.MagicMock()
+            creds = session._session.get_credentials.return_value
+            creds._expiry_time = datetime.now(timezone.utc) + timedelta(hours=1)
+            creds.get_frozen_credentials.return_value = mock.MagicMock(
+                access_key='AKI', secret_key='secret', token=str(len(sessions)))
+            sessions.append(session)
+            return session
+
+        broker = CredentialBroker(get_session)
+        account = {'provider': 'aws', 'account_id': '112233445566', 'role': 'arn:role'}
+        env = broker.get_credentials(account, 'us-east-1')
+        self.assertEqual(env['AWS_SESSION_TOKEN'], '0')
+        self.assertEqual(env['AWS_REGION'], 'us-east-1')
+        env = broker.get_credentials(account, 'us-west-2')
+        self.assertEqual(env['AWS_REGION'], 'us-west-2')
+        self.assertEqual(broker.assumed, 1)
+        self.assertFalse(brokered_expiring(env))
+
+        # units expected to outlive the credentials get fresh ones
+        env = broker.get_credentials(account, 'us-west-2', runtime=3600)
+        self.assertEqual(env['AWS_SESSION_TOKEN'], '1')
+        self.assertTrue(brokered_expiring(env, timedelta(hours=2)))
+        broker.get_credentials(account, 'us-west-2', runtime=60)
+        self.assertEqual(broker.assumed, 2)
+
+        # refreshed ahead of expiry
+        broker.refresh_ahead = timedelta(hours=2)
+        env = broker.get_credentials(account, 'us-west-2')
+        self.assertEqual(env['AWS_SESSION_TOKEN'], '2')
+        self.assertEqual(broker.assumed, 3)
+
+        self.assertIsNone(broker.get_credentials(
+            {'provider': 'aws', 'account_id': '1', 'profile': 'x'}, 'us-east-1'))
+
+    def test_renew_credentials(self):
+        account = {'name': 'dev', 'account_id': '112233445566', 'role': 'arn:role',
+                   'external_id': 'xyz'}
+        policies = [mock.MagicMock(), mock.MagicMock()]
+        with org.environ(AWS_ACCESS_KEY_ID='AKI', AWS_SESSION_TOKEN='token',
+                         AWS_CREDENTIAL_EXPIRATION=datetime.now(timezone.utc).isoformat()):
+            self.assertIsNone(org.renew_credentials(account, 'us-east-1', policies))
+            self.assertNotIn('AWS_SESSION_TOKEN', os.environ)
+        # workers fall back to auto refreshing assumed role sessions
+        self.assertEqual(
+            [(p.session_factory.assume_role, p.session_factory.external_id) for p in policies],
+            [('arn:role', 'xyz'), ('arn:role', 'xyz')])
+
+    def test_schedule_bounded(self):
+        in_flight = []
+
+        def submit(executor, unit):
+            in_flight.append(unit)
+            return executor.submit(lambda: unit)
+
+        results = [f.result() for f, unit, _ in schedule(
+            MainThreadExecutor(), range(5), submit, 2)]
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+        self.assertEqual(in_flight, [0, 1, 2, 3, 4])
+
     def test_validate_oci_provider(self):
         run_dir = self.setup_run_dir(
             accounts=ACCOUNTS_OCI,